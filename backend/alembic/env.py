@@ -0,0 +1,41 @@
+"""Alembic environment: migrates the database in DATABASE_URL using the app's sync engine."""
+
+import os
+import sys
+from logging.config import fileConfig
+
+from alembic import context
+
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from app.core.config import settings  # noqa: E402
+from app.db.database import Base, engine  # noqa: E402
+import app.db.models  # noqa: E402,F401  (registers the tables on Base)
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    """Emit the SQL to stdout (alembic upgrade head --sql)."""
+    context.configure(url=settings.DATABASE_URL, target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,138 @@
+"""Baseline: the schema as of the switch to Alembic (what init_db.py's create_all produced).
+
+Databases created before this revision (by init_db.py or supabase_schema.sql)
+are stamped at this revision by init_db.py instead of running it.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Same variants as app/db/models.py, frozen here so later model changes don't rewrite history
+UUID = postgresql.UUID(as_uuid=True).with_variant(sa.Uuid(), "sqlite")
+BigIntegerPK = sa.BigInteger().with_variant(sa.Integer(), "sqlite")
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("supabase_id", UUID, nullable=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_supabase_id", "users", ["supabase_id"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "profiles",
+        sa.Column("id", UUID, primary_key=True),
+        sa.Column("first_name", sa.String(), nullable=True),
+        sa.Column("last_name", sa.String(), nullable=True),
+        sa.Column("resume_path", sa.String(), nullable=True),
+        sa.Column("desired_roles", sa.String(), nullable=True),
+        sa.Column("desired_locations", sa.String(), nullable=True),
+        sa.Column("min_salary", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_profiles_id", "profiles", ["id"])
+
+    op.create_table(
+        "skills",
+        sa.Column("id", BigIntegerPK, primary_key=True),
+        sa.Column("profile_id", UUID, sa.ForeignKey("profiles.id"), nullable=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("level", sa.String(), nullable=True),
+    )
+    op.create_index("ix_skills_id", "skills", ["id"])
+    op.create_index("uq_skills_profile_lower_name", "skills", ["profile_id", sa.text("lower(name)")], unique=True)
+
+    op.create_table(
+        "experiences",
+        sa.Column("id", BigIntegerPK, primary_key=True),
+        sa.Column("profile_id", UUID, sa.ForeignKey("profiles.id"), nullable=True),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("company", sa.String(), nullable=False),
+        sa.Column("location", sa.String(), nullable=True),
+        sa.Column("start_date", sa.DateTime(), nullable=True),
+        sa.Column("end_date", sa.DateTime(), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_experiences_id", "experiences", ["id"])
+
+    op.create_table(
+        "jobs",
+        sa.Column("id", BigIntegerPK, primary_key=True),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("company", sa.String(), nullable=False),
+        sa.Column("location", sa.String(), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("url", sa.String(), nullable=True),
+        sa.Column("source", sa.String(), nullable=True),
+        sa.Column("posted_date", sa.DateTime(), nullable=True),
+        sa.Column("scraped_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_jobs_id", "jobs", ["id"])
+    op.create_index("ix_jobs_url", "jobs", ["url"], unique=True)
+    op.create_index("ix_jobs_source", "jobs", ["source"])
+
+    op.create_table(
+        "user_job_matches",
+        sa.Column("id", BigIntegerPK, primary_key=True),
+        sa.Column("user_id", UUID, sa.ForeignKey("users.supabase_id"), nullable=True),
+        sa.Column("job_id", sa.BigInteger(), sa.ForeignKey("jobs.id"), nullable=True),
+        sa.Column("relevance_score", sa.Float(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_user_job_matches_id", "user_job_matches", ["id"])
+    op.create_index("idx_user_job_matches_user_status", "user_job_matches", ["user_id", "status"])
+
+    op.create_table(
+        "task_queue",
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("user_id", UUID, nullable=True),
+        sa.Column("payload", sa.JSON(), nullable=True),
+        sa.Column("state", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("message", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("run_after", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("locked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_task_queue_kind", "task_queue", ["kind"])
+    op.create_index("ix_task_queue_user_id", "task_queue", ["user_id"])
+    op.create_index("idx_task_queue_state_run_after", "task_queue", ["state", "run_after"])
+
+    op.create_table(
+        "scheduler_runs",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("owner", sa.String(), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("status", sa.String(), nullable=True),
+    )
+
+
+def downgrade():
+    for table in ("scheduler_runs", "task_queue", "user_job_matches", "jobs", "experiences", "skills", "profiles", "users"):
+        op.drop_table(table)
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import FileResponse
+from typing import Optional
+import hmac
+
+from app.core.config import settings
+from app.core.schemas import ProfilingArmRequest
+from app.services import profiling
+
+router = APIRouter()
+
+async def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Admin endpoints are off unless ADMIN_TOKEN is set; then the X-Admin-Token header must match it."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin token")
+
+@router.post("/profiling/arm", dependencies=[Depends(require_admin_token)])
+async def arm_profiling(request: ProfilingArmRequest):
+    """Profile the next run(s) of a scrape, match or API request, in whichever process runs it."""
+    try:
+        return profiling.arm(request.target, runs=request.runs, mode=request.mode, memory=request.memory, match=request.match)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/profiling/armed", dependencies=[Depends(require_admin_token)])
+async def get_armed_profiling():
+    return profiling.armed()
+
+@router.delete("/profiling/armed", dependencies=[Depends(require_admin_token)])
+async def disarm_profiling(target: Optional[str] = None):
+    profiling.disarm(target)
+    return {"disarmed": target or "all"}
+
+@router.get("/profiling/runs", dependencies=[Depends(require_admin_token)])
+async def list_profiling_runs():
+    return profiling.list_runs()
+
+@router.get("/profiling/runs/{run_id}/{filename}", dependencies=[Depends(require_admin_token)])
+async def get_profiling_report(run_id: str, filename: str):
+    path = profiling.report_path(run_id, filename)
+    if not path:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found")
+    media_type = "application/octet-stream" if filename.endswith(".pstats") else "text/plain"
+    return FileResponse(path, media_type=media_type, filename=filename)
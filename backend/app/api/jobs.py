@@ -1,36 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict
-import uuid # For generating task IDs
+import asyncio
+import json
 import logging # For logging
 
+from app.core.cache import response_cache, build_response, cached_json_response
 from app.core.schemas import JobWithMatch, UserJobMatchUpdate
 from app.core.supabase_auth import get_current_active_user
-from app.db.database import get_db
+from app.db.database import get_db, AsyncSessionLocal
 from app.db.models import User, Job, UserJobMatch, JobStatus
-from app.services.job_scraper import trigger_job_scraping # This will need to accept task_id and update status
-from app.services.job_matcher import match_jobs_for_user # This will also need task_id and update status
+from app.services.task_events import task_event_hub
+from app.services.task_queue import enqueue_task, get_task_status, QueueFullError, TERMINAL_STATUSES
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# In-memory store for task statuses. For production, use Redis or a DB table.
-task_statuses: Dict[str, Dict[str, str]] = {}
-
 @router.get("/matched", response_model=List[JobWithMatch])
-async def get_matched_jobs(current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
+async def get_matched_jobs(request: Request, current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)):
+    cached, generation = await response_cache.get(current_user.supabase_id, "jobs:matched")
+    if cached:
+        return build_response(request, cached)
     try:
         # Get all jobs with their match data for the current user
-        matches = db.query(
-            Job, UserJobMatch.relevance_score, UserJobMatch.status
-        ).join(
-            UserJobMatch, Job.id == UserJobMatch.job_id
-        ).filter(
-            UserJobMatch.user_id == current_user.supabase_id # Filter by Supabase UUID
-        ).order_by(
-            UserJobMatch.relevance_score.desc()
-        ).all()
+        matches = (await db.execute(
+            select(
+                Job, UserJobMatch.relevance_score, UserJobMatch.status
+            ).join(
+                UserJobMatch, Job.id == UserJobMatch.job_id
+            ).where(
+                UserJobMatch.user_id == current_user.supabase_id # Filter by Supabase UUID
+            ).order_by(
+                UserJobMatch.relevance_score.desc()
+            )
+        )).all()
 
         # Format response
         result = []
@@ -42,7 +48,7 @@ async def get_matched_jobs(current_user: User = Depends(get_current_active_user)
             result.append(job_dict)
 
         print(f"Returning {len(result)} matched jobs for user {current_user.supabase_id}")
-        return result
+        return await cached_json_response(request, current_user.supabase_id, "jobs:matched", result, List[JobWithMatch], generation)
     except Exception as e:
         print(f"Error in get_matched_jobs: {str(e)}")
         raise HTTPException(
@@ -55,73 +61,142 @@ async def update_job_status(
     job_id: int,
     status_update: UserJobMatchUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Find the user-job match using supabase_id
-    match = db.query(UserJobMatch).filter(
-        UserJobMatch.user_id == current_user.supabase_id,
-        UserJobMatch.job_id == job_id
-    ).first()
+    match = (await db.execute(
+        select(UserJobMatch).where(
+            UserJobMatch.user_id == current_user.supabase_id,
+            UserJobMatch.job_id == job_id
+        )
+    )).scalars().first()
 
     if not match:
         raise HTTPException(status_code=404, detail="Job match not found")
 
     # Update status (status_update.status should be 'pending', 'interested', etc.)
-    match.status = status_update.status
-    db.commit()
+    match.status = status_update.status.value
+    await db.commit()
+    await response_cache.invalidate_user(current_user.supabase_id)
 
     return {"success": True}
 
     return {"success": True}
 
-async def perform_job_refresh(user_id: str, task_id: str, task_statuses_ref: dict):
-    try:
-        # Run scraper first
-        await trigger_job_scraping(task_id=task_id, task_statuses_ref=task_statuses_ref)
-        # Verify scraping didn't explicitly fail
-        if task_statuses_ref.get(task_id, {}).get("status") == "failed":
-            return
-        # Run matcher for this specific user
-        await match_jobs_for_user(user_id=user_id, task_id=task_id, task_statuses_ref=task_statuses_ref)
-    except Exception as e:
-        logger.error(f"Error in perform_job_refresh: {e}")
-        task_statuses_ref[task_id] = {"status": "failed", "message": f"An unexpected error occurred: {str(e)}"}
-
 @router.post("/refresh", status_code=status.HTTP_202_ACCEPTED, response_model=Dict[str, str])
-async def refresh_jobs_and_matches_api(background_tasks: BackgroundTasks, current_user: User = Depends(get_current_active_user)):
-    task_id = uuid.uuid4().hex
-    task_statuses[task_id] = {"status": "pending", "message": "Job refresh process initiated."}
+async def refresh_jobs_and_matches_api(current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)):
+    # Heavy scrape + match runs in a task worker, not in the API process
+    try:
+        task_id = await enqueue_task(db, "refresh", user_id=current_user.supabase_id, message="Job refresh process initiated.")
+    except QueueFullError as e:
+        logger.warning(f"Refresh rejected for {current_user.email}: task queue full ({e})")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many refresh requests in progress. Please try again shortly.",
+            headers={"Retry-After": "30"},
+        )
     
     logger.info(f"User {current_user.email} triggered job refresh. Task ID: {task_id}")
 
-    # Use orchestrator to run sequentially
-    background_tasks.add_task(perform_job_refresh, user_id=current_user.supabase_id, task_id=task_id, task_statuses_ref=task_statuses)
-
     return {"task_id": task_id, "message": "Job refresh process started. Poll status endpoint for updates."}
 
 @router.get("/refresh/status/{task_id}", response_model=Dict[str, str])
-async def get_refresh_status(task_id: str):
-    status_info = task_statuses.get(task_id)
+async def get_refresh_status(task_id: str, db: AsyncSession = Depends(get_db)):
+    status_info = await get_task_status(db, task_id)
     if not status_info:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task ID not found.")
     
-    # Optional: Clean up old tasks after some time or if status is 'completed'/'failed'
-    # For simplicity, not adding cleanup logic here yet.
+    # Finished tasks are cleaned up by the task worker after TASK_RETENTION_HOURS.
     return {"task_id": task_id, **status_info}
 
+STREAM_KEEPALIVE_SECONDS = 15
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.get("/refresh/stream/{task_id}")
+async def stream_refresh_status(task_id: str, request: Request):
+    """
+    Server-Sent Events stream of a refresh task's progress: the current status,
+    then every status change and match batch as it happens. The stream closes
+    once the task completes or fails. Like /refresh/status, it is keyed by the
+    unguessable task id (EventSource can't send an Authorization header).
+    """
+    # Subscribe before reading the snapshot so no event can fall between the two.
+    # A short-lived session is used instead of get_db so the stream doesn't pin
+    # a pooled connection for its whole lifetime.
+    queue = await task_event_hub.subscribe(task_id)
+    try:
+        async with AsyncSessionLocal() as db:
+            status_info = await get_task_status(db, task_id)
+    except Exception:
+        task_event_hub.unsubscribe(task_id, queue)
+        raise
+    if not status_info:
+        task_event_hub.unsubscribe(task_id, queue)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task ID not found.")
+
+    async def events():
+        try:
+            yield _sse("status", {"task_id": task_id, **status_info})
+            if status_info["status"] in TERMINAL_STATUSES:
+                return
+            last_status = status_info
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Events can be lost (listener reconnecting, a failed NOTIFY, a crashed
+                    # worker), so fall back to the task row on every quiet interval.
+                    async with AsyncSessionLocal() as db:
+                        current = await get_task_status(db, task_id)
+                    if current is None:
+                        yield _sse("status", {"task_id": task_id, "status": "failed", "message": "Task no longer exists.", "final": True})
+                        return
+                    if current["status"] in TERMINAL_STATUSES:
+                        yield _sse("status", {"task_id": task_id, **current, "final": True})
+                        return
+                    if current != last_status:
+                        last_status = current
+                        yield _sse("status", {"task_id": task_id, **current})
+                    else:
+                        yield ": keepalive\n\n"
+                    continue
+                yield _sse(message["event"], {"task_id": task_id, **message["data"]})
+                if message["event"] == "status" and message["data"].get("final"):
+                    return
+        finally:
+            task_event_hub.unsubscribe(task_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/counts", response_model=dict) # Changed path to /counts (plural)
-async def get_job_count(current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
-    # Count jobs by status using supabase_id and string status values
-    counts = {}
-    # Use the string values directly for querying
-    for status_value in [s.value for s in JobStatus]:
-        count = db.query(UserJobMatch).filter(
-            UserJobMatch.user_id == current_user.supabase_id,
-            UserJobMatch.status == status_value
-        ).count()
-        counts[status_value] = count
+async def get_job_count(request: Request, current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)):
+    cached, generation = await response_cache.get(current_user.supabase_id, "jobs:counts")
+    if cached:
+        return build_response(request, cached)
+
+    # Count jobs by status in a single grouped aggregate (one round trip, served
+    # from the (user_id, status) index) instead of one COUNT(*) per status value.
+    counts = {s.value: 0 for s in JobStatus}
+    rows = (await db.execute(
+        select(
+            UserJobMatch.status, func.count(UserJobMatch.id)
+        ).where(
+            UserJobMatch.user_id == current_user.supabase_id
+        ).group_by(
+            UserJobMatch.status
+        )
+    )).all()
+    for status_value, count in rows:
+        if status_value in counts:
+            counts[status_value] = count
 
     # Get total count
     total = sum(counts.values())
 
-    return {"total": total, "by_status": counts}
+    return await cached_json_response(request, current_user.supabase_id, "jobs:counts", {"total": total, "by_status": counts}, dict, generation)
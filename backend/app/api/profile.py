@@ -1,31 +1,49 @@
 import os
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, BackgroundTasks, Response
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, BackgroundTasks, Response, Request
+from sqlalchemy import select, delete, insert, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import logging
 
 # Setup logger for this module
 logger = logging.getLogger(__name__)
 
+from app.core.cache import response_cache, build_response, cached_json_response
 from app.core.config import settings
 from app.core.schemas import Profile, ProfileCreate, ProfileUpdate, Skill, SkillCreate, Experience, ExperienceCreate, ResumeUploadResponse
 from app.core.supabase_auth import get_current_active_user
 from app.db.database import get_db
 from app.db.models import User, Profile as ProfileModel, Skill as SkillModel, Experience as ExperienceModel
+from app.services.db_utils import load_profile_aggregate
 from app.services.resume_parser import parse_resume
+from app.services.tasks import schedule_rematch
 
 router = APIRouter()
 
+async def _get_profile(db: AsyncSession, profile_id, with_relations: bool = False):
+    """
+    Load a profile. Relationships can't be lazy-loaded on an AsyncSession, so
+    endpoints that return the full Profile schema load the whole aggregate up
+    front (a fixed number of queries, see load_profile_aggregate).
+    """
+    if with_relations:
+        return await load_profile_aggregate(db, profile_id, refresh=True)
+    return (await db.execute(select(ProfileModel).where(ProfileModel.id == profile_id))).scalars().first()
+
 @router.get("", response_model=Profile)
-async def get_profile(current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
+async def get_profile(request: Request, current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)):
+    cached, generation = await response_cache.get(current_user.supabase_id, "profile")
+    if cached:
+        return build_response(request, cached)
     try:
         logger.info(f"Attempting to get profile for user id: {current_user.supabase_id}")
-        profile = db.query(ProfileModel).filter(ProfileModel.id == current_user.supabase_id).first()
+        profile = await _get_profile(db, current_user.supabase_id, with_relations=True)
         if not profile:
             logger.warning(f"Profile not found for user id: {current_user.supabase_id}")
             raise HTTPException(status_code=404, detail="Profile not found")
         logger.info(f"Profile found for user id: {current_user.supabase_id}")
-        return profile
+        return await cached_json_response(request, current_user.supabase_id, "profile", profile, Profile, generation)
     except HTTPException:
         raise
     except Exception as e:
@@ -33,20 +51,22 @@ async def get_profile(current_user: User = Depends(get_current_active_user), db:
         raise HTTPException(status_code=500, detail="Internal server error fetching profile")
 
 @router.put("/preferences", response_model=Profile)
-async def update_preferences(profile_data: ProfileUpdate, current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
-    profile = db.query(ProfileModel).filter(ProfileModel.id == current_user.supabase_id).first()
+async def update_preferences(profile_data: ProfileUpdate, current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)):
+    profile = await _get_profile(db, current_user.supabase_id)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
     for key, value in profile_data.dict(exclude_unset=True).items():
         setattr(profile, key, value)
 
-    db.commit()
-    db.refresh(profile)
+    await db.commit()
+    profile = await _get_profile(db, current_user.supabase_id, with_relations=True)
+    await response_cache.invalidate_user(current_user.supabase_id)
+    await schedule_rematch(current_user.supabase_id)
     return profile
 
 @router.post("/resume", response_model=ResumeUploadResponse)
-async def upload_resume(background_tasks: BackgroundTasks, file: UploadFile = File(...), current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
+async def upload_resume(background_tasks: BackgroundTasks, file: UploadFile = File(...), current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)):
     # Check if file is a valid type
     file_extension = file.filename.split('.')[-1].lower()
     if file_extension not in settings.ALLOWED_EXTENSIONS:
@@ -60,13 +80,13 @@ async def upload_resume(background_tasks: BackgroundTasks, file: UploadFile = Fi
     logger.info(f"Resume uploaded: {file.filename} ({len(file_bytes)} bytes) for user {current_user.supabase_id}")
 
     # Update the profile's resume_path with just the filename (for reference)
-    profile = db.query(ProfileModel).filter(ProfileModel.id == current_user.supabase_id).first()
+    profile = await _get_profile(db, current_user.supabase_id)
     if not profile:
          raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found for authenticated user")
 
     profile.resume_path = f"uploaded/{file.filename}"  # Just a reference, not a real storage path
-    db.commit()
-    db.refresh(profile)
+    await db.commit()
+    await response_cache.invalidate_user(current_user.supabase_id)
 
     # Trigger resume parsing in the background — pass bytes directly, no cloud storage
     background_tasks.add_task(parse_resume, file_bytes, file_extension, profile.id)
@@ -74,100 +94,111 @@ async def upload_resume(background_tasks: BackgroundTasks, file: UploadFile = Fi
     return {"success": True, "message": "Resume uploaded and processing started"}
 
 @router.post("/skills", response_model=List[Skill])
-async def add_skills(skills: List[SkillCreate], current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
-    profile = db.query(ProfileModel).filter(ProfileModel.id == current_user.supabase_id).first()
+async def add_skills(skills: List[SkillCreate], current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)):
+    profile = await _get_profile(db, current_user.supabase_id)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
-    new_skills = []
+    # One multi-row upsert keyed on (profile_id, lower(name)) instead of a
+    # SELECT per skill plus a refresh per row. Later duplicates in the request win.
+    rows = {}
     for skill_data in skills:
-        existing_skill = db.query(SkillModel).filter(
-            SkillModel.profile_id == profile.id,
-            SkillModel.name == skill_data.name
-        ).first()
-
-        if existing_skill:
-            for key, value in skill_data.dict().items():
-                setattr(existing_skill, key, value)
-            new_skills.append(existing_skill)
-        else:
-            skill = SkillModel(**skill_data.dict(), profile_id=profile.id)
-            db.add(skill)
-            new_skills.append(skill)
-
-    db.commit()
-    for skill in new_skills:
-        db.refresh(skill)
+        name = skill_data.name.strip() # Stored as keyed, so " Python" can't sit beside "python"
+        rows[name.lower()] = {**skill_data.dict(), "name": name, "profile_id": profile.id}
+    new_skills = []
+    if rows:
+        stmt = pg_insert(SkillModel).values(list(rows.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SkillModel.profile_id, func.lower(SkillModel.name)],
+            set_={"name": stmt.excluded.name, "level": stmt.excluded.level},
+        ).returning(SkillModel)
+        new_skills = (await db.scalars(stmt, execution_options={"populate_existing": True})).all()
+    await db.commit()
+    await response_cache.invalidate_user(current_user.supabase_id)
+    await schedule_rematch(current_user.supabase_id)
 
     return new_skills
 
 @router.delete("/skills/all", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_all_skills(current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
-    profile = db.query(ProfileModel).filter(ProfileModel.id == current_user.supabase_id).first()
+async def delete_all_skills(current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)):
+    profile = await _get_profile(db, current_user.supabase_id)
     if not profile:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
 
     try:
-        num_deleted = db.query(SkillModel).filter(SkillModel.profile_id == profile.id).delete(synchronize_session=False)
-        db.commit()
+        result = await db.execute(
+            delete(SkillModel).where(SkillModel.profile_id == profile.id).execution_options(synchronize_session=False)
+        )
+        num_deleted = result.rowcount
+        await db.commit()
+        await response_cache.invalidate_user(current_user.supabase_id)
+        await schedule_rematch(current_user.supabase_id)
         logger.info(f"Deleted {num_deleted} skills for profile_id: {profile.id}")
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error deleting all skills for profile_id {profile.id}: {e}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not delete all skills")
     
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 @router.delete("/skills/{skill_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_skill(skill_id: int, current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
-    profile = db.query(ProfileModel).filter(ProfileModel.id == current_user.supabase_id).first()
+async def delete_skill(skill_id: int, current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)):
+    profile = await _get_profile(db, current_user.supabase_id)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
-    skill = db.query(SkillModel).filter(SkillModel.id == skill_id, SkillModel.profile_id == profile.id).first()
+    skill = (await db.execute(
+        select(SkillModel).where(SkillModel.id == skill_id, SkillModel.profile_id == profile.id)
+    )).scalars().first()
     if not skill:
         raise HTTPException(status_code=404, detail="Skill not found")
 
-    db.delete(skill)
-    db.commit()
+    await db.delete(skill)
+    await db.commit()
+    await response_cache.invalidate_user(current_user.supabase_id)
+    await schedule_rematch(current_user.supabase_id)
 
     return None
 
 @router.post("/experiences", response_model=List[Experience])
-async def add_experiences(experiences: List[ExperienceCreate], current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
-    profile = db.query(ProfileModel).filter(ProfileModel.id == current_user.supabase_id).first()
+async def add_experiences(experiences: List[ExperienceCreate], current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)):
+    profile = await _get_profile(db, current_user.supabase_id)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
+    # Single multi-row INSERT ... RETURNING instead of a refresh per row
     new_experiences = []
-    for exp_data in experiences:
-        experience = ExperienceModel(**exp_data.dict(), profile_id=profile.id)
-        db.add(experience)
-        new_experiences.append(experience)
-
-    db.commit()
-    for exp in new_experiences:
-        db.refresh(exp)
+    if experiences:
+        new_experiences = (await db.scalars(
+            insert(ExperienceModel).values([{**exp_data.dict(), "profile_id": profile.id} for exp_data in experiences]).returning(ExperienceModel)
+        )).all()
+    await db.commit()
+    await response_cache.invalidate_user(current_user.supabase_id)
+    await schedule_rematch(current_user.supabase_id)
 
     return new_experiences
 
 @router.delete("/experiences/{experience_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_experience(experience_id: int, current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
-    profile = db.query(ProfileModel).filter(ProfileModel.id == current_user.supabase_id).first()
+async def delete_experience(experience_id: int, current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)):
+    profile = await _get_profile(db, current_user.supabase_id)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
-    experience = db.query(ExperienceModel).filter(
-        ExperienceModel.id == experience_id,
-        ExperienceModel.profile_id == profile.id
-    ).first()
+    experience = (await db.execute(
+        select(ExperienceModel).where(
+            ExperienceModel.id == experience_id,
+            ExperienceModel.profile_id == profile.id
+        )
+    )).scalars().first()
 
     if not experience:
         raise HTTPException(status_code=404, detail="Experience not found")
 
-    db.delete(experience)
-    db.commit()
+    await db.delete(experience)
+    await db.commit()
+    await response_cache.invalidate_user(current_user.supabase_id)
+    await schedule_rematch(current_user.supabase_id)
 
     return None
@@ -0,0 +1,287 @@
+"""
+Per-user response cache for read-heavy dashboard endpoints.
+
+`/api/jobs/matched`, `/api/jobs/counts` and `/api/profile` are read on every
+dashboard render but only change when matching runs, a job status changes or
+the profile is edited. Responses are cached per user as serialized JSON along
+with an ETag, so repeat reads skip Postgres and clients sending
+`If-None-Match` get a 304.
+
+Invalidation is explicit: writers call `response_cache.invalidate_user(user_id)`.
+Each user has a generation number that is part of every cache key, so
+invalidating is O(1) — old entries simply stop being addressable and age out.
+`get` returns the generation it looked up and `set` stores under that
+generation, so a response computed before an invalidation can never be stored
+as the current one.
+
+Backends:
+  - in-process LRU with TTL (default, per worker process). Invalidations are
+    broadcast over the task_events NOTIFY channel, so a write in the task
+    worker, a script or another uvicorn worker reaches every API process;
+    each process drops its whole cache if its listener reconnects, since
+    notifications sent while it was down are lost
+  - Redis, when REDIS_URL is set and the `redis` package is installed
+    (shared across workers, so invalidation from background jobs is seen
+    by every API process)
+"""
+
+import hashlib
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.core.metrics import register_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+
+
+def compute_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison: W/"x" matches "x"
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class TTLCache:
+    """
+    Small bounded LRU mapping with a per-entry expiry, for hot in-process
+    lookups (verified JWT claims, local user records).
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Any) -> Any:
+        item = self._entries.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Any, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Any) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class InMemoryResponseCache:
+    """
+    Bounded LRU with a per-entry TTL. Not shared between processes; invalidations are broadcast instead.
+
+    A user's generation is only remembered for one TTL after their last
+    invalidation: by then every entry and every lookup from before it has
+    expired, so the user can fall back to generation 0 without anything stale
+    becoming addressable again.
+    """
+
+    shared = False
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, int, str], Tuple[float, CachedResponse]]" = OrderedDict()
+        # user -> (generation, invalidated at), oldest invalidation first
+        self._generations: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._generation_counter = itertools.count(1)
+        self.hits = 0
+        self.misses = 0
+
+    def _generation(self, user_key: str) -> int:
+        item = self._generations.get(user_key)
+        return item[0] if item else 0
+
+    async def get(self, user_id: Any, name: str) -> Tuple[Optional[CachedResponse], Tuple[int, float]]:
+        """(entry or None, generation to pass to `set`)."""
+        user_key = str(user_id)
+        now = time.monotonic()
+        generation = self._generation(user_key)
+        key = (user_key, generation, name)
+        item = self._entries.get(key)
+        if item is None:
+            self.misses += 1
+            return None, (generation, now)
+        expires_at, entry = item
+        if expires_at < now:
+            del self._entries[key]
+            self.misses += 1
+            return None, (generation, now)
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry, (generation, now)
+
+    async def set(self, user_id: Any, name: str, entry: CachedResponse, generation: Tuple[int, float]) -> None:
+        user_key = str(user_id)
+        looked_up, looked_up_at = generation
+        now = time.monotonic()
+        # Invalidated since the caller's lookup (or too long ago to tell): the data may predate the write
+        if looked_up != self._generation(user_key) or now - looked_up_at > self.ttl_seconds:
+            return
+        key = (user_key, looked_up, name)
+        self._entries[key] = (now + self.ttl_seconds, entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def invalidate_user(self, user_id: Any) -> None:
+        user_key = str(user_id)
+        self.apply_invalidation(user_key)
+        # Other processes (API workers, or the API when this is the task worker) hear it via NOTIFY
+        from app.services.task_events import publish_cache_invalidation
+
+        await publish_cache_invalidation(user_key)
+
+    def apply_invalidation(self, user_key: str) -> None:
+        now = time.monotonic()
+        self._generations[user_key] = (next(self._generation_counter), now)
+        self._generations.move_to_end(user_key)
+        while self._generations:
+            _oldest, (_generation, invalidated_at) = next(iter(self._generations.items()))
+            if now - invalidated_at <= self.ttl_seconds:
+                break
+            self._generations.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class RedisResponseCache:
+    """Redis-backed cache shared by all worker processes."""
+
+    shared = True
+
+    def __init__(self, client, ttl_seconds: int, prefix: str = "intelliapply:resp"):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    async def _generation(self, user_key: str) -> int:
+        value = await self.client.get(f"{self.prefix}:gen:{user_key}")
+        return int(value) if value else 0
+
+    async def get(self, user_id: Any, name: str) -> Tuple[Optional[CachedResponse], Optional[int]]:
+        """(entry or None, generation to pass to `set`)."""
+        user_key = str(user_id)
+        try:
+            generation = await self._generation(user_key)
+            raw = await self.client.get(f"{self.prefix}:{user_key}:{generation}:{name}")
+        except Exception as e:
+            logger.warning(f"Response cache read failed, serving uncached: {e}")
+            return None, None
+        if raw is None:
+            self.misses += 1
+            return None, generation
+        self.hits += 1
+        etag, _, body = raw.partition(b"\n")
+        return CachedResponse(body=body, etag=etag.decode()), generation
+
+    async def set(self, user_id: Any, name: str, entry: CachedResponse, generation: Optional[int]) -> None:
+        # Stored under the generation the caller looked up: if it was invalidated
+        # meanwhile, the entry is written under a key nobody reads any more
+        if generation is None:
+            return
+        user_key = str(user_id)
+        try:
+            await self.client.set(
+                f"{self.prefix}:{user_key}:{generation}:{name}",
+                entry.etag.encode() + b"\n" + entry.body,
+                ex=self.ttl_seconds,
+            )
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    async def invalidate_user(self, user_id: Any) -> None:
+        try:
+            await self.client.incr(f"{self.prefix}:gen:{user_id}")
+        except Exception as e:
+            logger.error(f"Response cache invalidation failed for user {user_id}: {e}")
+
+
+def _create_response_cache():
+    if settings.REDIS_URL:
+        try:
+            import redis.asyncio as aioredis
+
+            client = aioredis.from_url(settings.REDIS_URL)
+            logger.info("Response cache using Redis backend.")
+            return RedisResponseCache(client, ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS)
+        except ImportError:
+            logger.warning("REDIS_URL is set but the 'redis' package is not installed. Using in-process response cache.")
+    return InMemoryResponseCache(
+        max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    )
+
+
+response_cache = _create_response_cache()
+register_cache("response", lambda: (response_cache.hits, response_cache.misses))
+
+_adapters: Dict[Any, TypeAdapter] = {}
+
+
+def build_response(request: Request, entry: CachedResponse) -> Response:
+    """Return 304 if the client already has this representation, else the cached body."""
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+async def cached_json_response(request: Request, user_id: Any, name: str, data: Any, response_type: Any, generation: Any) -> Response:
+    """
+    Serialize `data` through the route's response model, store it in the cache
+    under `generation` (from the `response_cache.get` that missed) and return
+    it with an ETag.
+    """
+    adapter = _adapters.get(response_type)
+    if adapter is None:
+        adapter = _adapters[response_type] = TypeAdapter(response_type)
+    body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+    entry = CachedResponse(body=body, etag=compute_etag(body))
+    await response_cache.set(user_id, name, entry, generation)
+    return build_response(request, entry)
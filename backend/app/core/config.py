@@ -43,6 +43,18 @@ class Settings(BaseSettings):
 
     # File storage (for resumes)
     UPLOAD_DIRECTORY: str = os.getenv("UPLOAD_DIRECTORY", "./uploads")
+    # Resume text extraction pool (see app/services/text_extraction.py)
+    RESUME_EXTRACT_WORKERS: int = int(os.getenv("RESUME_EXTRACT_WORKERS", "2"))
+    RESUME_EXTRACT_TIMEOUT_SECONDS: float = float(os.getenv("RESUME_EXTRACT_TIMEOUT_SECONDS", "30"))
+    RESUME_MAX_PAGES: int = int(os.getenv("RESUME_MAX_PAGES", "20"))
+    # Local rule-based resume parse saved as a fast first pass (see app/services/local_resume_parser.py),
+    # optionally refined by Gemini afterwards
+    RESUME_LOCAL_PARSER: bool = os.getenv("RESUME_LOCAL_PARSER", "true").lower() == "true"
+    RESUME_LLM_REFINE: bool = os.getenv("RESUME_LLM_REFINE", "true").lower() == "true"
+    # Parsed resume cache (see app/services/resume_cache.py)
+    RESUME_CACHE_DIR: str = os.getenv("RESUME_CACHE_DIR", "./resume_cache")
+    RESUME_CACHE_MAX_ENTRIES: int = int(os.getenv("RESUME_CACHE_MAX_ENTRIES", "1000"))
+    RESUME_CACHE_TTL_DAYS: float = float(os.getenv("RESUME_CACHE_TTL_DAYS", "30"))
     ALLOWED_EXTENSIONS: List[str] = ["pdf", "docx"]
 
     # Scraping settings
@@ -52,6 +64,8 @@ class Settings(BaseSettings):
 
     # Neon Auth settings
     NEON_AUTH_URL: Optional[str] = os.getenv("NEON_AUTH_URL")
+    JWKS_FILE: Optional[str] = os.getenv("JWKS_FILE")  # Local JWKS document instead of the Neon Auth endpoint (offline tests)
+    JWKS_REFRESH_SECONDS: int = int(os.getenv("JWKS_REFRESH_SECONDS", "3600"))
 
 
     # Additional scraper settings
@@ -60,6 +74,36 @@ class Settings(BaseSettings):
     SCRAPER_SOURCES: Optional[str] = os.getenv("SCRAPER_SOURCES", "hackernews")
     SCRAPER_SCHEDULE_HOURS: Optional[int] = int(os.getenv("SCRAPER_SCHEDULE_HOURS", "4")) # New setting for APScheduler
     MATCHER_SCHEDULE_HOURS: Optional[int] = int(os.getenv("MATCHER_SCHEDULE_HOURS", "6")) # New setting for APScheduler
+    MATCH_CHUNKED: bool = os.getenv("MATCH_CHUNKED", "false").lower() == "true" # Score against on-disk job vectors in blocks (see job_vectors.py)
+    MATCH_CHUNKED_JOB_LIMIT: int = int(os.getenv("MATCH_CHUNKED_JOB_LIMIT", "0")) # Newest jobs in the vector snapshot (0 = all)
+    MATCH_MEMORY_BUDGET_MB: int = int(os.getenv("MATCH_MEMORY_BUDGET_MB", "32")) # Per-block budget for building and scoring job vectors
+    JOB_VECTOR_DIR: str = os.getenv("JOB_VECTOR_DIR", "./job_vectors")
+    MATCH_SHARDS: int = int(os.getenv("MATCH_SHARDS", "1")) # >1: scheduled matching runs in this many processes (0 = one per CPU)
+    SCHEDULER_ENABLED: bool = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true" # Runs are deduplicated across replicas, but it can be turned off per process
+    SCHEDULER_JITTER_SECONDS: int = int(os.getenv("SCHEDULER_JITTER_SECONDS", "300")) # Random delay added to each scheduled run
+    REMATCH_DEBOUNCE_SECONDS: float = float(os.getenv("REMATCH_DEBOUNCE_SECONDS", "10")) # Profile edits within this window trigger a single rematch
+    SCRAPE_FRESHNESS_MINUTES: int = int(os.getenv("SCRAPE_FRESHNESS_MINUTES", "15")) # Refreshes reuse a scrape this recent instead of scraping again
+    SCRAPE_WAIT_TIMEOUT_SECONDS: int = int(os.getenv("SCRAPE_WAIT_TIMEOUT_SECONDS", "1800")) # Callers waiting on a shared scrape give up after this long
+    ADMIN_TOKEN: Optional[str] = os.getenv("ADMIN_TOKEN") # Enables /api/admin (X-Admin-Token header); unset = disabled
+    PROFILING_DIR: str = os.getenv("PROFILING_DIR", "./profiling_reports")
+    PROFILING_TRACEMALLOC_FRAMES: int = int(os.getenv("PROFILING_TRACEMALLOC_FRAMES", "10"))
+    AUTO_CREATE_SCHEMA: bool = os.getenv("AUTO_CREATE_SCHEMA", "false").lower() == "true" # Run create_all on API startup (local dev); otherwise run init_db.py (Alembic migrations)
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVELS: str = os.getenv("LOG_LEVELS", "") # Per-module overrides, e.g. "app.services.job_scraper=DEBUG,httpx=WARNING"
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json").lower() # "json" or "text"
+    LOG_RATE_LIMITED: str = os.getenv("LOG_RATE_LIMITED", "app.core.supabase_auth,app.services.db_utils,app.services.job_matcher") # Add uvicorn.access to sample access logs (opt-in)
+    LOG_RATE_LIMIT_PER_MINUTE: int = int(os.getenv("LOG_RATE_LIMIT_PER_MINUTE", "60")) # Per message template, INFO and below
+    TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "").lower() # "", "file" or "otlp" (see app/core/tracing.py)
+    TRACING_FILE: str = os.getenv("TRACING_FILE", "./traces.jsonl")
+    TRACING_OTLP_ENDPOINT: str = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    TRACING_SAMPLE_RATIO: float = float(os.getenv("TRACING_SAMPLE_RATIO", "1.0"))
+    TRACING_SERVICE_NAME: str = os.getenv("TRACING_SERVICE_NAME", "intelliapply-backend")
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "false").lower() == "true" # Serve Prometheus metrics at /metrics
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "") # If set, /metrics requires "Authorization: Bearer <token>"
+    SCRAPER_FIXTURE_MODE: str = os.getenv("SCRAPER_FIXTURE_MODE", "").lower() # "", "record" or "replay" (see scrape_fixtures.py)
+    SCRAPER_FIXTURE_DIR: str = os.getenv("SCRAPER_FIXTURE_DIR", "./scrape_fixtures")
+    SCRAPER_REPLAY_LATENCY_MS: float = float(os.getenv("SCRAPER_REPLAY_LATENCY_MS", "0")) # Simulated fetch latency when replaying
+    SCRAPER_REPLAY_JITTER_MS: float = float(os.getenv("SCRAPER_REPLAY_JITTER_MS", "0"))
 
     # Eden AI API Key
     EDEN_AI_API_KEY: Optional[str] = os.getenv("EDEN_AI_API_KEY")
@@ -76,6 +120,30 @@ class Settings(BaseSettings):
     # Gemini API Key
     GEMINI_API_KEY: Optional[str] = os.getenv("GEMINI_API_KEY")
 
+    # Redis (optional). Shared backend for caches when running several workers.
+    REDIS_URL: Optional[str] = os.getenv("REDIS_URL")
+
+    # Response cache for dashboard endpoints
+    RESPONSE_CACHE_TTL_SECONDS: int = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000"))
+
+    # Background task queue (see app/services/task_queue.py)
+    TASK_QUEUE_MAX_PENDING: int = int(os.getenv("TASK_QUEUE_MAX_PENDING", "100")) # Backpressure: refuse new tasks beyond this
+    TASK_WORKER_CONCURRENCY: int = int(os.getenv("TASK_WORKER_CONCURRENCY", "2"))
+    TASK_POLL_INTERVAL_SECONDS: float = float(os.getenv("TASK_POLL_INTERVAL_SECONDS", "2"))
+    TASK_RETENTION_HOURS: int = int(os.getenv("TASK_RETENTION_HOURS", "24"))
+    TASK_STALE_SECONDS: int = int(os.getenv("TASK_STALE_SECONDS", "600")) # Running tasks without a heartbeat for this long are requeued
+    TASK_MAX_ATTEMPTS: int = int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+    # Run a worker inside the API process (single-process deployments). Set to false
+    # when running dedicated workers via run_task_worker.py.
+    TASK_QUEUE_EMBEDDED_WORKER: bool = os.getenv("TASK_QUEUE_EMBEDDED_WORKER", "true").lower() == "true"
+
+    # Auth caches (verified token claims and local user records)
+    AUTH_CLAIMS_CACHE_TTL_SECONDS: int = int(os.getenv("AUTH_CLAIMS_CACHE_TTL_SECONDS", "300"))
+    # Nothing in the app edits users; deactivations are made in the database and take effect within this TTL
+    AUTH_USER_CACHE_TTL_SECONDS: int = int(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "30"))
+    AUTH_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,151 @@
+"""
+Async JWKS key store for verifying Neon Auth JWTs.
+
+PyJWKClient fetches the JWKS with a blocking HTTP call on a cache miss, which
+stalls the event loop (and every concurrent request) while it waits. This store
+instead:
+  - fetches the key set at startup with an async HTTP client,
+  - refreshes it in the background before it goes stale (honouring
+    Cache-Control max-age when the endpoint sends one),
+  - on an unknown `kid` (key rotation) triggers a single refresh that all
+    concurrent callers share, rate-limited so bogus kids can't hammer the
+    endpoint,
+  - can be pointed at a local JWKS file (JWKS_FILE) for offline tests.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import time
+from typing import Dict, Optional
+
+import httpx
+import jwt
+from jwt import PyJWK, PyJWKSet
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSKeyNotFound(Exception):
+    pass
+
+
+class JWKSKeyStore:
+    def __init__(
+        self,
+        url: str,
+        file_path: Optional[str] = None,
+        refresh_interval: float = 3600,
+        unknown_kid_cooldown: float = 30,
+        http_timeout: float = 10,
+    ):
+        self.url = url
+        self.file_path = file_path
+        self.refresh_interval = refresh_interval
+        self.unknown_kid_cooldown = unknown_kid_cooldown
+        self.http_timeout = http_timeout
+
+        self._keys: Dict[Optional[str], PyJWK] = {}
+        self._fetched_at: float = 0.0
+        self._next_refresh_in: float = refresh_interval
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._background_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Fetch keys now and keep them fresh in the background."""
+        try:
+            await self.refresh()
+        except Exception as e:
+            # Don't block startup; the first request will retry the fetch.
+            logger.error(f"[JWKS] Initial key fetch failed: {e}")
+        if self._background_task is None:
+            self._background_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._background_task:
+            self._background_task.cancel()
+            try:
+                await self._background_task
+            except asyncio.CancelledError:
+                pass
+            self._background_task = None
+
+    async def refresh(self):
+        """Reload the key set. Concurrent callers share one in-flight fetch."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._fetch())
+        await asyncio.shield(self._refresh_task)
+
+    async def get_signing_key(self, token: str) -> PyJWK:
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except jwt.PyJWTError as e:
+            raise JWKSKeyNotFound(f"Malformed token header: {e}")
+
+        key = self._find_key(kid)
+        if key is not None:
+            return key
+
+        # Unknown kid: either keys were never loaded or the issuer rotated them.
+        if not self._keys or time.monotonic() - self._fetched_at >= self.unknown_kid_cooldown:
+            logger.info(f"[JWKS] Unknown kid={kid}; refreshing key set.")
+            await self.refresh()
+            key = self._find_key(kid)
+            if key is not None:
+                return key
+        raise JWKSKeyNotFound(f"No signing key found for kid={kid}")
+
+    def _find_key(self, kid: Optional[str]) -> Optional[PyJWK]:
+        key = self._keys.get(kid)
+        if key is None and kid is None and len(self._keys) == 1:
+            # Tokens without a kid are accepted when the set has exactly one key
+            key = next(iter(self._keys.values()))
+        return key
+
+    async def _fetch(self):
+        max_age = None
+        if self.file_path:
+            data = await asyncio.to_thread(self._read_file)
+        else:
+            async with httpx.AsyncClient(timeout=self.http_timeout) as client:
+                response = await client.get(self.url)
+                response.raise_for_status()
+                data = response.json()
+                max_age = _parse_max_age(response.headers.get("cache-control"))
+
+        key_set = PyJWKSet.from_dict(data)
+        self._keys = {key.key_id: key for key in key_set.keys}
+        self._fetched_at = time.monotonic()
+        self._next_refresh_in = min(self.refresh_interval, max_age) if max_age else self.refresh_interval
+        logger.info(f"[JWKS] Loaded {len(self._keys)} signing keys from {self.file_path or self.url}")
+
+    def _read_file(self) -> dict:
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    async def _refresh_loop(self):
+        retry_delay = 5.0
+        delay = self._refresh_delay() if self._keys else retry_delay
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.refresh()
+                retry_delay = 5.0
+                delay = self._refresh_delay()
+            except Exception as e:
+                # Keep serving the previous keys; retry with backoff
+                logger.warning(f"[JWKS] Background refresh failed: {e}")
+                retry_delay = min(retry_delay * 2, 300.0)
+                delay = retry_delay
+
+    def _refresh_delay(self) -> float:
+        # Refresh a little before the advertised lifetime runs out
+        return max(self._next_refresh_in * 0.8, 1.0)
+
+
+def _parse_max_age(cache_control: Optional[str]) -> Optional[float]:
+    if not cache_control:
+        return None
+    match = re.search(r"max-age=(\d+)", cache_control)
+    return float(match.group(1)) if match else None
@@ -0,0 +1,185 @@
+"""
+Process-wide logging setup: JSON lines (or plain text) on stdout, per-module
+levels, rate limiting for chatty per-request/per-item messages, and a
+queue-based handler so formatting and writes happen on a listener thread
+instead of the event loop.
+
+Call configure_logging() once at process start (main.py, run_task_worker.py,
+the other CLI scripts, shard processes); modules only ever do
+`logger = logging.getLogger(__name__)` and log with lazy %-style arguments, so
+disabled levels cost a level check.
+
+Settings:
+  LOG_LEVEL                root level (INFO)
+  LOG_LEVELS               per-module overrides, "app.services.job_scraper=DEBUG,httpx=WARNING"
+  LOG_FORMAT               "json" or "text"
+  LOG_RATE_LIMITED         loggers whose DEBUG/INFO records are rate limited per message template
+                           (uvicorn.access is not limited unless listed: all access lines share a template)
+  LOG_RATE_LIMIT_PER_MINUTE  records allowed per template per minute before suppression
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.tracing import current_span
+
+# Attributes every LogRecord has; anything else came in through `extra=` and is emitted as a field
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; `extra=` fields (and trace_id/span_id inside a span) become keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per (logger, message template, level) for records at INFO and
+    below. Because callers pass arguments lazily, every "Skipping duplicate job
+    %s" shares one bucket regardless of the URL. The number of suppressed
+    records is reported on the next record that gets through.
+    """
+
+    def __init__(self, per_minute: int):
+        super().__init__()
+        self.capacity = max(1, per_minute)
+        self.refill_per_second = self.capacity / 60.0
+        self._buckets: Dict[Tuple[str, str, int], list] = {} # key -> [tokens, last_refill, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        key = (record.name, str(record.msg), record.levelno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.capacity), now, 0]
+            bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.refill_per_second)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{text} ({suppressed} similar suppressed)" if suppressed else text
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Snapshot the message (and trace context) on the caller's thread; formatting and I/O happen on the listener."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        active = current_span.get()
+        if active is not None:
+            record.trace_id, record.span_id = active.trace_id, active.span_id
+        return record
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(force: bool = False):
+    """Install the queue handler on the root logger (idempotent unless force=True)."""
+    global _listener
+    with _lock:
+        if _listener is not None and not force:
+            return
+        if _listener is not None:
+            _listener.stop()
+        else:
+            atexit.register(shutdown_logging)
+            if hasattr(os, "register_at_fork"):
+                os.register_at_fork(after_in_child=_restart_in_child)
+
+        stream = logging.StreamHandler(sys.stdout)
+        if settings.LOG_FORMAT == "json":
+            stream.setFormatter(JsonFormatter())
+        else:
+            stream.setFormatter(_TextFormatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_DeferredQueueHandler(log_queue))
+        root.setLevel(settings.LOG_LEVEL.upper())
+
+        # uvicorn installs its own stream handlers before importing the app; route them through ours
+        for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+            uvicorn_logger = logging.getLogger(name)
+            uvicorn_logger.handlers.clear()
+            uvicorn_logger.propagate = True
+
+        for name, level in _parse_levels(settings.LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(level)
+
+        rate_limit = RateLimitFilter(settings.LOG_RATE_LIMIT_PER_MINUTE)
+        for name in filter(None, (name.strip() for name in settings.LOG_RATE_LIMITED.split(","))):
+            target = logging.getLogger(name)
+            for existing in [f for f in target.filters if isinstance(f, RateLimitFilter)]:
+                target.removeFilter(existing)
+            target.addFilter(rate_limit)
+
+        _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+        _listener.start()
+
+
+def _restart_in_child():
+    """A forked child (e.g. the resume extraction pool) inherits the queue handler but not the listener thread."""
+    global _listener, _lock
+    if _listener is not None:
+        _listener, _lock = None, threading.Lock()
+        configure_logging()
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
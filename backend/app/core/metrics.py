@@ -0,0 +1,280 @@
+"""
+In-process metrics in the Prometheus text exposition format, served at /metrics.
+
+A deliberately small implementation (counters, gauges, histograms with labels)
+so the backend doesn't need prometheus_client. Metrics are per process; with
+several uvicorn workers, scrape each one or run a single worker behind the
+scraper. Values that already live elsewhere (cache hit counters, queue
+depths) are reported through collectors that are evaluated at scrape time.
+
+Database statements are counted with engine events (see instrument_engine),
+and attributed to the API request they ran in through a context variable
+set by the HTTP middleware in main.py.
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers sub-millisecond cache hits up to multi-minute scrapes
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+Collector = Callable[[], Union[Iterable["MetricFamily"], Awaitable[Iterable["MetricFamily"]]]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricFamily:
+    """One metric as rendered: name, type, help and its samples."""
+
+    def __init__(self, name: str, metric_type: str, help_text: str, samples: List[Tuple[str, Dict[str, str], float]]):
+        self.name = name
+        self.type = metric_type
+        self.help = help_text
+        self.samples = samples
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for name, labels, value in self.samples)
+        return "\n".join(lines)
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock() # Matching and parsing record from worker threads
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            items = list(self._values.items())
+        return MetricFamily(self.name, self.type, self.help, [(self.name, self._labels(k), v) for k, v in items])
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][index] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of the block (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            items = [(key, list(state["buckets"]), state["sum"], state["count"]) for key, state in self._values.items()]
+        samples = []
+        for key, buckets, total, count in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, buckets):
+                cumulative += bucket_count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_bucket", {**labels, "le": "+Inf"}, count))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return MetricFamily(self.name, self.type, self.help, samples)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, collector: Collector):
+        """Register a callable (sync or async) returning MetricFamily objects, evaluated at scrape time."""
+        self._collectors.append(collector)
+
+    async def render(self) -> str:
+        families = [metric.collect() for metric in self._metrics.values()]
+        for collector in self._collectors:
+            try:
+                result = collector()
+                if asyncio.iscoroutine(result):
+                    result = await result
+                families.extend(result)
+            except Exception as e:
+                logger.warning(f"[Metrics] Collector {getattr(collector, '__name__', collector)} failed: {e}")
+        return "\n".join(family.render() for family in families if family.samples) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help_text, labelnames))
+
+
+def gauge(name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, help_text, labelnames))
+
+
+def histogram(name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, help_text, labelnames, buckets))
+
+
+# --- Metrics shared across modules ---------------------------------------------
+
+HTTP_REQUEST_SECONDS = histogram("http_request_duration_seconds", "API request latency (to response headers)", ["method", "route", "status"])
+DB_QUERIES_PER_REQUEST = histogram("db_queries_per_request", "SQL statements issued per API request", ["route"], COUNT_BUCKETS)
+DB_QUERY_TIME_PER_REQUEST = histogram("db_query_seconds_per_request", "Total SQL time per API request", ["route"])
+DB_QUERY_SECONDS = histogram("db_query_duration_seconds", "SQL statement latency", ["operation"])
+SCRAPE_SECONDS = histogram("scrape_duration_seconds", "Duration of one scrape of a source", ["source"])
+SCRAPE_ITEMS = histogram("scrape_items", "Jobs returned by one scrape of a source", ["source"], COUNT_BUCKETS)
+JOBS_SAVED = counter("jobs_saved_total", "Scraped jobs written by save_jobs_to_db", ["result"])
+JOB_SAVE_SECONDS = histogram("job_save_duration_seconds", "Duration of one save_jobs_to_db call")
+VECTORIZER_TRANSFORM_SECONDS = histogram("vectorizer_transform_seconds", "TF-IDF transform time", ["target"])
+MATCH_STAGE_SECONDS = histogram("match_stage_duration_seconds", "Per-user matching stage time", ["stage"])
+RESUME_STAGE_SECONDS = histogram("resume_parse_stage_duration_seconds", "Resume parsing stage time", ["stage"])
+
+
+# --- Per-request SQL accounting ----------------------------------------------
+
+class RequestQueryStats:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Mutable holder so statements run in copied contexts (greenlets, threads) still land on the request
+current_request_queries: contextvars.ContextVar[Optional[RequestQueryStats]] = contextvars.ContextVar(
+    "current_request_queries", default=None
+)
+
+
+def _operation(statement: str) -> str:
+    verb = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+    return verb if verb in ("select", "insert", "update", "delete", "with") else "other"
+
+
+def instrument_engine(engine):
+    """Time every statement on a (sync) Engine; pass async_engine.sync_engine for the async one."""
+    from sqlalchemy import event
+
+    if getattr(engine, "_intelliapply_instrumented", False):
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, _cursor, _statement, _parameters, _context, _executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, _cursor, statement, _parameters, _context, _executemany):
+        started = conn.info["query_started"].pop()
+        elapsed = time.perf_counter() - started
+        DB_QUERY_SECONDS.observe(elapsed, operation=_operation(statement))
+        stats = current_request_queries.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        if context.connection is not None and context.connection.info.get("query_started"):
+            context.connection.info["query_started"].pop()
+
+    engine._intelliapply_instrumented = True
+
+
+# --- Scrape-time collectors ---------------------------------------------------
+
+_caches: Dict[str, Callable[[], Tuple[float, float]]] = {}
+
+
+def register_cache(name: str, stats: Callable[[], Tuple[float, float]]):
+    """Report a cache's (hits, misses) counters as cache_requests_total{cache=name}."""
+    _caches[name] = stats
+
+
+def _collect_caches() -> List[MetricFamily]:
+    samples = []
+    for name, stats in _caches.items():
+        hits, misses = stats()
+        samples.append(("cache_requests_total", {"cache": name, "result": "hit"}, hits))
+        samples.append(("cache_requests_total", {"cache": name, "result": "miss"}, misses))
+    return [MetricFamily("cache_requests_total", "counter", "Cache lookups by result", samples)]
+
+
+REGISTRY.add_collector(_collect_caches)
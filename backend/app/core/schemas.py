@@ -151,3 +151,11 @@ class JobWithMatch(Job):
 class ResumeUploadResponse(BaseModel):
     success: bool
     message: str
+
+# Admin profiling schemas
+class ProfilingArmRequest(BaseModel):
+    target: str = Field(..., description="scrape, match or request")
+    runs: int = Field(1, ge=1, le=20)
+    mode: str = Field("cprofile", description="cprofile or sampling")
+    memory: bool = True
+    match: Optional[str] = Field(None, description="Only runs whose label starts with this (user id, request path)")
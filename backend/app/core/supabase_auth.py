@@ -7,21 +7,24 @@ and manages the local user/profile records in our PostgreSQL database.
 """
 
 import os
+import time
+import hashlib
 import logging
 import uuid
 
-import httpx
 import jwt
-from jwt import PyJWKClient
 from fastapi import Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 
-from app.db.database import get_db, SessionLocal
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.jwks import JWKSKeyStore
+from app.core.metrics import register_cache
+from app.db.database import get_db, AsyncSessionLocal
 from app.db.models import User as UserModel, Profile as ProfileModel
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # --- Neon Auth Configuration ---
@@ -31,23 +34,55 @@ NEON_AUTH_URL = os.getenv(
 )
 JWKS_URL = f"{NEON_AUTH_URL}/.well-known/jwks.json"
 
-# PyJWKClient handles fetching and caching JWKS keys automatically
-_jwks_client: PyJWKClient | None = None
+# Async key store: prefetched on startup and refreshed in the background, so
+# verification never blocks the event loop on a JWKS HTTP fetch.
+# Point JWKS_FILE at a local JWKS document for offline tests.
+jwks_store = JWKSKeyStore(
+    JWKS_URL,
+    file_path=settings.JWKS_FILE,
+    refresh_interval=settings.JWKS_REFRESH_SECONDS,
+)
+
+# Verified claims keyed by SHA-256 of the raw token. Entries never outlive the
+# token's own `exp`, so a cached token can't be accepted after it expires.
+_claims_cache = TTLCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_CLAIMS_CACHE_TTL_SECONDS,
+)
+
+# supabase_id (UUID) -> detached local User record. Users are only changed
+# outside the app (e.g. deactivated in the database), so the short TTL is what
+# bounds how long a stale is_active is honoured, in every worker process.
+_user_cache = TTLCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS,
+)
+
+
+register_cache("auth_claims", lambda: (_claims_cache.hits, _claims_cache.misses))
+register_cache("auth_user", lambda: (_user_cache.hits, _user_cache.misses))
+
+
+def _token_cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
 
-def _get_jwks_client() -> PyJWKClient:
-    global _jwks_client
-    if _jwks_client is None:
-        _jwks_client = PyJWKClient(JWKS_URL, cache_keys=True)
-    return _jwks_client
 
 async def _verify_neon_auth_token(token: str) -> dict:
     """
     Verify a JWT issued by Neon Auth using the JWKS endpoint.
     Returns the decoded token payload (claims).
+
+    Successful verifications are cached until the token expires (bounded by
+    AUTH_CLAIMS_CACHE_TTL_SECONDS), so repeated requests with the same token
+    skip the key lookup and signature check.
     """
-    client = _get_jwks_client()
+    token_key = _token_cache_key(token)
+    cached_payload = _claims_cache.get(token_key)
+    if cached_payload is not None:
+        return cached_payload
+
     try:
-        signing_key = client.get_signing_key_from_jwt(token)
+        signing_key = await jwks_store.get_signing_key(token)
         payload = jwt.decode(
             token,
             signing_key.key,
@@ -57,10 +92,12 @@ async def _verify_neon_auth_token(token: str) -> dict:
                 "verify_iss": False,  # Flexible issuer checking
             },
         )
-        logger.info(f"[NeonAuth] Token verified for sub={payload.get('sub')}")
+        exp = payload.get("exp")
+        ttl = float(exp) - time.time() if exp else None
+        _claims_cache.set(token_key, payload, ttl)
         return payload
     except Exception as e:
-        logger.warning(f"[NeonAuth] Token verification failed: {e}")
+        logger.warning("[NeonAuth] Token verification failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired authentication token.",
@@ -74,15 +111,13 @@ async def get_token_from_request(request: Request) -> str | None:
     """
     auth_header = request.headers.get("Authorization")
     if auth_header and auth_header.startswith("Bearer "):
-        token = auth_header[7:]  # Strip "Bearer "
-        logger.debug(f"[NeonAuth] Token extracted: {token[:10]}...")
-        return token
+        return auth_header[7:]  # Strip "Bearer "
 
     logger.warning("[NeonAuth] No Bearer token found in Authorization header.")
     return None
 
 
-async def get_current_user(request: Request, db: Session = Depends(get_db)):
+async def get_current_user(request: Request, db: AsyncSession = Depends(get_db)):
     """
     Validate the Neon Auth JWT and return the current user from the database.
     If the user doesn't exist locally, create a record + profile.
@@ -116,27 +151,31 @@ async def get_current_user(request: Request, db: Session = Depends(get_db)):
     try:
         neon_user_uuid = uuid.UUID(neon_user_id_str)
     except ValueError:
-        logger.error(f"[NeonAuth] Invalid UUID in 'sub' claim: {neon_user_id_str}")
+        logger.error("[NeonAuth] Invalid UUID in 'sub' claim: %s", neon_user_id_str)
         raise HTTPException(status_code=400, detail="Invalid user ID format.")
 
-    logger.info(f"[NeonAuth] Verified user: {neon_user_email} (ID: {neon_user_uuid})")
+    cached_user = _user_cache.get(neon_user_uuid)
+    if cached_user is not None:
+        return cached_user
 
     # Look up user in our local database
-    user = db.query(UserModel).filter(UserModel.supabase_id == neon_user_uuid).first()
+    user = (await db.execute(
+        select(UserModel).where(UserModel.supabase_id == neon_user_uuid)
+    )).scalars().first()
 
     if not user:
-        logger.info(f"[NeonAuth] User {neon_user_email} not found locally. Creating...")
+        logger.info("[NeonAuth] User %s not found locally. Creating...", neon_user_uuid)
         local_db = None
         try:
-            local_db = SessionLocal()
+            local_db = AsyncSessionLocal()
 
             # Double-check (race condition guard)
-            existing = local_db.query(UserModel).filter(
-                UserModel.supabase_id == neon_user_uuid
-            ).first()
+            existing = (await local_db.execute(
+                select(UserModel).where(UserModel.supabase_id == neon_user_uuid)
+            )).scalars().first()
             if existing:
                 user = existing
-                logger.info(f"[NeonAuth] User was created by concurrent request.")
+                logger.info("[NeonAuth] User was created by concurrent request.")
             else:
                 # Create user record
                 new_user = UserModel(
@@ -145,38 +184,38 @@ async def get_current_user(request: Request, db: Session = Depends(get_db)):
                     is_active=True,
                 )
                 local_db.add(new_user)
-                local_db.flush()
+                await local_db.flush()
 
                 # Create empty profile linked to the same UUID
                 new_profile = ProfileModel(id=neon_user_uuid)
                 local_db.add(new_profile)
 
-                local_db.commit()
-                local_db.refresh(new_user)
+                await local_db.commit()
+                await local_db.refresh(new_user)
                 user = new_user
-                logger.info(
-                    f"[NeonAuth] Created user + profile: local_id={user.id}, "
-                    f"neon_id={neon_user_uuid}"
-                )
+                logger.info("[NeonAuth] Created user + profile: local_id=%s, neon_id=%s", user.id, neon_user_uuid)
 
         except SQLAlchemyError as e:
             if local_db:
-                local_db.rollback()
-            logger.error(f"[NeonAuth] DB error creating user: {e}")
+                await local_db.rollback()
+            logger.error("[NeonAuth] DB error creating user: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Database error during user creation: {e}",
             )
         finally:
             if local_db:
-                local_db.close()
+                await local_db.close()
     else:
-        logger.info(f"[NeonAuth] Found existing user: local_id={user.id}")
+        logger.debug("[NeonAuth] Loaded user local_id=%s (user cache miss)", user.id)
+        # Detach so the cached instance isn't expired by this request's commits
+        db.expunge(user)
 
     if not user:
-        logger.error(f"[NeonAuth] User is unexpectedly None after get/create for {neon_user_uuid}")
+        logger.error("[NeonAuth] User is unexpectedly None after get/create for %s", neon_user_uuid)
         raise HTTPException(status_code=500, detail="Failed to retrieve or create user.")
 
+    _user_cache.set(neon_user_uuid, user)
     return user
 
 
@@ -185,7 +224,7 @@ async def get_current_active_user(current_user: UserModel = Depends(get_current_
     Check if the current user is active.
     """
     if not current_user.is_active:
-        logger.warning(f"[NeonAuth] User {current_user.id} is inactive.")
+        logger.warning("[NeonAuth] User %s is inactive.", current_user.id)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User account is inactive.",
@@ -0,0 +1,310 @@
+"""
+Lightweight distributed tracing, OpenTelemetry-compatible on the wire.
+
+Spans live in a context variable, so they follow the request through awaits,
+asyncio.create_task and asyncio.to_thread. Across process boundaries the
+context travels as a W3C `traceparent`: incoming HTTP requests are read by the
+middleware in main.py, and enqueue_task stores the current one in the task
+payload so the worker that runs the task (scrape, save, match) continues the
+same trace as the /refresh request that queued it.
+
+Finished spans are batched on a background thread and exported, per
+TRACING_EXPORTER, to:
+  - "file": JSON lines (one OTLP-style span per line) appended to TRACING_FILE
+  - "otlp": OTLP/HTTP JSON POSTed to TRACING_OTLP_ENDPOINT (a local
+            OpenTelemetry Collector, Jaeger or Tempo)
+With TRACING_EXPORTER unset nothing is recorded and `span()` is a no-op.
+Root spans are sampled at TRACING_SAMPLE_RATIO; children follow their root.
+"""
+
+import asyncio
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_BATCH_SIZE = 256
+_FLUSH_INTERVAL = 2.0
+_MAX_QUEUED = 10000
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "status", "sampled")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], sampled: bool, kind: str = "internal",
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = "unset"
+        self.sampled = sampled
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        kinds = {"internal": 1, "server": 2, "client": 3, "producer": 4, "consumer": 5}
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": kinds.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": 2 if self.status == "error" else 0},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class RemoteParent:
+    """Span context received from another process (traceparent header or task payload)."""
+    __slots__ = ("trace_id", "span_id", "sampled")
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+def tracing_enabled() -> bool:
+    return bool(settings.TRACING_EXPORTER)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[RemoteParent]:
+    parts = (value or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 1)
+    except ValueError:
+        return None
+    return RemoteParent(parts[1], parts[2], sampled)
+
+
+def inject(carrier: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Add the current span's traceparent to `carrier` (a task payload or header dict)."""
+    carrier = dict(carrier or {})
+    active = current_span.get()
+    if active is not None:
+        carrier["traceparent"] = active.traceparent
+    return carrier
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", parent: Optional[RemoteParent] = None, **attributes):
+    """
+    Record a span around the block, as a child of `parent` or of the current span
+    (a new trace if neither). Yields the Span, or None when tracing is off.
+    """
+    if not tracing_enabled():
+        yield None
+        return
+    parent = parent or current_span.get()
+    if parent is not None:
+        new_span = Span(name, parent.trace_id, parent.span_id, parent.sampled, kind, attributes)
+    else:
+        sampled = random.random() < settings.TRACING_SAMPLE_RATIO
+        new_span = Span(name, os.urandom(16).hex(), None, sampled, kind, attributes)
+    token = current_span.set(new_span)
+    try:
+        yield new_span
+    except BaseException as e:
+        if not isinstance(e, (asyncio.CancelledError, GeneratorExit)):
+            new_span.status = "error"
+            new_span.attributes["exception.type"] = type(e).__name__
+            new_span.attributes["exception.message"] = str(e)[:500]
+        raise
+    finally:
+        current_span.reset(token)
+        finish(new_span)
+
+
+def finish(finished: Span):
+    finished.end_ns = time.time_ns()
+    if finished.sampled:
+        _processor().submit(finished)
+
+
+def traced(name: Optional[str] = None, kind: str = "internal"):
+    """Decorator: run the (sync or async) function inside a span."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- Export -------------------------------------------------------------------
+
+class _BatchProcessor:
+    def __init__(self):
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=_MAX_QUEUED)
+        self._dropped = 0
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._stop = threading.Event()
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def submit(self, finished: Span):
+        try:
+            self._queue.put_nowait(finished)
+        except queue.Full:
+            self._dropped += 1
+
+    def _drain(self) -> List[Span]:
+        batch = []
+        while len(batch) < _BATCH_SIZE:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.wait(_FLUSH_INTERVAL):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        while True:
+            batch = self._drain()
+            if not batch:
+                break
+            try:
+                _export(batch)
+            except Exception as e:
+                logger.warning(f"[Tracing] Failed to export {len(batch)} spans: {e}")
+        if self._dropped:
+            logger.warning(f"[Tracing] Dropped {self._dropped} spans (export queue full).")
+            self._dropped = 0
+
+    def shutdown(self):
+        if not self._stop.is_set():
+            self._stop.set()
+            self._thread.join(timeout=5)
+
+
+_processor_instance: Optional[_BatchProcessor] = None
+_processor_lock = threading.Lock()
+
+
+def _processor() -> _BatchProcessor:
+    global _processor_instance
+    if _processor_instance is None:
+        with _processor_lock:
+            if _processor_instance is None:
+                _processor_instance = _BatchProcessor()
+    return _processor_instance
+
+
+def _export(batch: List[Span]):
+    resource = {"attributes": [
+        {"key": "service.name", "value": {"stringValue": settings.TRACING_SERVICE_NAME}},
+        {"key": "process.pid", "value": {"intValue": str(os.getpid())}},
+    ]}
+    if settings.TRACING_EXPORTER == "file":
+        with open(settings.TRACING_FILE, "a", encoding="utf-8") as f:
+            for finished in batch:
+                f.write(json.dumps({"resource": settings.TRACING_SERVICE_NAME, **finished.to_otlp()}) + "\n")
+    elif settings.TRACING_EXPORTER == "otlp":
+        import httpx
+
+        body = {"resourceSpans": [{
+            "resource": resource,
+            "scopeSpans": [{"scope": {"name": "intelliapply"}, "spans": [finished.to_otlp() for finished in batch]}],
+        }]}
+        httpx.post(settings.TRACING_OTLP_ENDPOINT, json=body, timeout=5).raise_for_status()
+
+
+def shutdown_tracing():
+    """Flush queued spans (call on shutdown; also runs at interpreter exit)."""
+    if _processor_instance is not None:
+        _processor_instance.shutdown()
+
+
+# --- SQLAlchemy ---------------------------------------------------------------
+
+def instrument_engine_tracing(engine):
+    """Child spans for every statement run inside a trace; pass async_engine.sync_engine for the async engine."""
+    if not tracing_enabled() or getattr(engine, "_intelliapply_traced", False):
+        return
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, _cursor, statement, _parameters, _context, executemany):
+        parent = current_span.get()
+        stack = conn.info.setdefault("trace_spans", [])
+        if parent is None or not parent.sampled:
+            stack.append(None)
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+        stack.append(Span(f"db.{operation.lower()}", parent.trace_id, parent.span_id, True, "client", {
+            "db.system": engine.dialect.name,
+            "db.statement": statement[:1000],
+            "db.executemany": bool(executemany),
+        }))
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, _cursor, _statement, _parameters, _context, _executemany):
+        pending = conn.info["trace_spans"].pop()
+        if pending is not None:
+            finish(pending)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        stack = context.connection.info.get("trace_spans") if context.connection is not None else None
+        if stack:
+            pending = stack.pop()
+            if pending is not None:
+                pending.status = "error"
+                pending.attributes["exception.message"] = str(context.original_exception)[:500]
+                finish(pending)
+
+    engine._intelliapply_traced = True
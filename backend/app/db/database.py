@@ -1,4 +1,8 @@
+import ssl
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool # Import QueuePool
@@ -6,6 +10,7 @@ from sqlalchemy.pool import QueuePool # Import QueuePool
 from app.core.config import settings
 
 # Configure engine with connection pooling options
+# Synchronous engine: used by standalone scripts and worker processes.
 engine = create_engine(
     settings.DATABASE_URL,
     poolclass=QueuePool, # Use QueuePool
@@ -16,12 +21,60 @@ engine = create_engine(
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _to_async_url(url: str):
+    """
+    Convert a libpq-style DATABASE_URL to an asyncpg one.
+    asyncpg doesn't understand libpq query params like sslmode/channel_binding,
+    so those are stripped and translated into connect_args. Only the driver
+    name is rewritten, so host-less URLs like sqlite:////abs/path survive.
+    """
+    parsed = make_url(url)
+    drivername = parsed.drivername
+    if drivername in ("postgres", "postgresql", "postgresql+psycopg2"):
+        drivername = "postgresql+asyncpg"
+    elif drivername == "sqlite":
+        drivername = "sqlite+aiosqlite"
+
+    connect_args = {}
+    query = dict(parsed.query)
+    sslmode = query.pop("sslmode", None)
+    sslrootcert = query.pop("sslrootcert", None)
+    if sslmode in ("verify-ca", "verify-full") and sslrootcert:
+        # Verify against the given CA; verify-full also checks the hostname
+        context = ssl.create_default_context(cafile=sslrootcert)
+        context.check_hostname = sslmode == "verify-full"
+        connect_args["ssl"] = context
+    elif sslmode in ("disable", "allow", "prefer", "require", "verify-ca", "verify-full"):
+        # asyncpg accepts the libpq mode names and verifies certificates for the verify-* modes
+        connect_args["ssl"] = sslmode
+    query.pop("channel_binding", None)
+
+    return parsed.set(drivername=drivername, query=query), connect_args
+
+
+def create_app_async_engine(url: str):
+    """Async engine with the app's pool settings (SQLite's aiosqlite pool takes no size limits)."""
+    async_url, connect_args = _to_async_url(url)
+    pool_args = {} if async_url.get_backend_name() == "sqlite" else {"pool_size": 10, "max_overflow": 5}
+    return create_async_engine(
+        async_url,
+        connect_args=connect_args,
+        pool_recycle=1800,
+        pool_pre_ping=True,
+        **pool_args,
+    )
+
+# Async engine: used by the API routes and background services running on the
+# event loop, so queries don't block other requests.
+async_engine = create_app_async_engine(settings.DATABASE_URL)
+# expire_on_commit=False: attributes stay readable after commit without an
+# implicit (and, under asyncio, illegal) lazy refresh.
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
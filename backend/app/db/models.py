@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Integer, String, Text, Float, BigInteger, JSON
+from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Integer, String, Text, Float, BigInteger, JSON, Index, Uuid
 from sqlalchemy.dialects.postgresql import UUID # Import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -7,6 +7,12 @@ import uuid # Import uuid for default generation if needed, though Supabase hand
 
 from app.db.database import Base
 
+# BIGSERIAL in Postgres; SQLite only autoincrements an INTEGER PRIMARY KEY, so the
+# variant keeps the models usable on SQLite (benchmarks, local experiments)
+BigIntegerPK = BigInteger().with_variant(Integer, "sqlite")
+# Native UUID on Postgres; SQLAlchemy's generic Uuid (CHAR(32)) elsewhere, e.g. the SQLite benchmark database
+UUIDType = UUID(as_uuid=True).with_variant(Uuid(), "sqlite")
+
 class JobStatus(enum.Enum):
     PENDING = "pending"
     INTERESTED = "interested"
@@ -18,7 +24,7 @@ class User(Base):
 
     id = Column(Integer, primary_key=True, index=True) # Local DB ID
     # Change supabase_id to UUID type to match Supabase auth.users.id and allow proper joins
-    supabase_id = Column(UUID(as_uuid=True), unique=True, index=True, nullable=True)
+    supabase_id = Column(UUIDType, unique=True, index=True, nullable=True)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=True) # Kept nullable
     is_active = Column(Boolean, default=True)
@@ -35,7 +41,7 @@ class Profile(Base):
     __tablename__ = "profiles"
 
     # ID is the Supabase User UUID and the primary key
-    id = Column(UUID(as_uuid=True), primary_key=True, index=True)
+    id = Column(UUIDType, primary_key=True, index=True)
     # user_id column removed, id serves as the link to auth.users
 
     first_name = Column(String, nullable=True)
@@ -56,21 +62,25 @@ class Skill(Base):
     __tablename__ = "skills"
 
     # Use BigInteger for ID as per Supabase schema (BIGSERIAL)
-    id = Column(BigInteger, primary_key=True, index=True)
+    id = Column(BigIntegerPK, primary_key=True, index=True)
     # profile_id links to Profile's UUID primary key
-    profile_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id"))
+    profile_id = Column(UUIDType, ForeignKey("profiles.id"))
     name = Column(String, nullable=False)
     level = Column(String, nullable=True)
 
     profile = relationship("Profile", back_populates="skills")
 
+# One row per skill name per profile (case-insensitive); lets skill writes use
+# INSERT ... ON CONFLICT instead of a lookup per skill
+Index("uq_skills_profile_lower_name", Skill.profile_id, func.lower(Skill.name), unique=True)
+
 class Experience(Base):
     __tablename__ = "experiences"
 
     # Use BigInteger for ID
-    id = Column(BigInteger, primary_key=True, index=True)
+    id = Column(BigIntegerPK, primary_key=True, index=True)
     # profile_id links to Profile's UUID primary key
-    profile_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id"))
+    profile_id = Column(UUIDType, ForeignKey("profiles.id"))
     title = Column(String, nullable=False)
     company = Column(String, nullable=False)
     location = Column(String, nullable=True)
@@ -84,7 +94,7 @@ class Job(Base):
     __tablename__ = "jobs"
 
     # Use BigInteger for ID
-    id = Column(BigInteger, primary_key=True, index=True)
+    id = Column(BigIntegerPK, primary_key=True, index=True)
     title = Column(String, nullable=False)
     company = Column(String, nullable=False)
     location = Column(String, nullable=True)
@@ -101,9 +111,9 @@ class UserJobMatch(Base):
     __tablename__ = "user_job_matches"
 
     # Use BigInteger for ID
-    id = Column(BigInteger, primary_key=True, index=True)
+    id = Column(BigIntegerPK, primary_key=True, index=True)
     # user_id links to the User's Supabase UUID (via User.supabase_id)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.supabase_id"))
+    user_id = Column(UUIDType, ForeignKey("users.supabase_id"))
     # job_id links to Job's BigInteger ID
     job_id = Column(BigInteger, ForeignKey("jobs.id"))
     relevance_score = Column(Float)
@@ -115,3 +125,46 @@ class UserJobMatch(Base):
     # Relationship back to User model (local cache)
     user = relationship("User", back_populates="job_matches", foreign_keys=[user_id], primaryjoin="UserJobMatch.user_id == User.supabase_id")
     job = relationship("Job", back_populates="user_matches")
+
+    # Covers the per-user status breakdown on the dashboard (GROUP BY status)
+    __table_args__ = (
+        Index("idx_user_job_matches_user_status", "user_id", "status"),
+    )
+
+class TaskRecord(Base):
+    """
+    Durable background task (job refresh, rematch, ...). Rows are claimed by
+    worker processes with SELECT ... FOR UPDATE SKIP LOCKED, so the queue is
+    shared across API workers and survives restarts.
+    """
+    __tablename__ = "task_queue"
+
+    id = Column(String(32), primary_key=True) # uuid4 hex, doubles as the public task_id
+    kind = Column(String, nullable=False, index=True)
+    user_id = Column(UUIDType, nullable=True, index=True)
+    payload = Column(JSON, nullable=True)
+    # Queue lifecycle: queued -> running -> done
+    state = Column(String, nullable=False, default="queued")
+    # Progress reported by the task itself (pending, scraping, matching, completed, failed, ...)
+    status = Column(String, nullable=False, default="pending")
+    message = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    run_after = Column(DateTime(timezone=True), server_default=func.now())
+    locked_at = Column(DateTime(timezone=True), nullable=True) # Heartbeat while running
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("idx_task_queue_state_run_after", "state", "run_after"),
+    )
+
+class SchedulerRun(Base):
+    """Last run of each periodic job, shared by every replica running the scheduler."""
+    __tablename__ = "scheduler_runs"
+
+    name = Column(String, primary_key=True) # Scheduler job id
+    owner = Column(String, nullable=True) # host:pid of the replica that ran it
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    status = Column(String, nullable=True) # running, completed, failed
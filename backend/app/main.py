@@ -1,24 +1,41 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from datetime import datetime # Import datetime for start_date
+from datetime import datetime, timedelta # Import datetime for start_date
+
+# Before the app modules, so anything they log at import goes through the configured handlers
+from app.core.logging_config import configure_logging, shutdown_logging
+configure_logging()
 
 # Import all routers
-from app.api import profile, jobs, auth
+from app.api import profile, jobs, auth, admin
+from app.core.cache import response_cache
 from app.core.config import settings
-from app.db.database import engine, Base
+from app.core.metrics import (
+    DB_QUERIES_PER_REQUEST, DB_QUERY_TIME_PER_REQUEST, HTTP_REQUEST_SECONDS, REGISTRY,
+    RequestQueryStats, current_request_queries, instrument_engine,
+)
+from app.core.supabase_auth import jwks_store
+from app.core.tracing import instrument_engine_tracing, parse_traceparent, shutdown_tracing, span
+from app.db.database import engine, async_engine, Base
 from app.services.job_scraper import trigger_job_scraping
 from app.services.job_matcher import match_jobs_for_all_users # Import the new function
 from app.services.data_maintenance import delete_old_job_postings # Import the new maintenance function
+from app.services.scheduler_lock import run_exclusive
+from app.services.profiling import profile_run
+from app.services.scrape_coordinator import ensure_fresh_scrape
+from app.services.task_queue import TaskWorker
+from app.services.task_events import task_event_hub
+from app.services.tasks import TASK_HANDLERS
+from app.services.text_extraction import shutdown_extraction_pool
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 # from apscheduler.triggers.cron import CronTrigger # Import if using CronTrigger
 import asyncio
+import hmac
 from app.services.vectorizer import load_global_vectorizer, fit_vectorizer_globally, VECTORIZER_PATH # Import vectorizer functions
 from app.db.models import Job # To fetch jobs for corpus
 import os # To check VECTORIZER_PATH existence
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
+import time
 
 app = FastAPI(
     title="IntelliApply API",
@@ -35,70 +52,173 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-statement SQL timing; per-request counts come from the middleware below
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+instrument_engine_tracing(engine)
+instrument_engine_tracing(async_engine.sync_engine)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    query_stats = RequestQueryStats()
+    token = current_request_queries.set(query_stats)
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        current_request_queries.reset(token)
+        # Label by route template (/api/jobs/{job_id}), not the raw path, to keep cardinality bounded
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method=request.method, route=route, status=status_code)
+        DB_QUERIES_PER_REQUEST.observe(query_stats.count, route=route)
+        DB_QUERY_TIME_PER_REQUEST.observe(query_stats.seconds, route=route)
+
+# Profiles the next request(s) when an admin has armed the "request" target
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    async with profile_run("request", request.url.path):
+        return await call_next(request)
+
+# Server span per request, continuing the caller's trace when it sends a traceparent
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    with span(f"{request.method} {request.url.path}", kind="server",
+              parent=parse_traceparent(request.headers.get("traceparent")),
+              **{"http.method": request.method, "http.target": request.url.path}) as server_span:
+        response = await call_next(request)
+        if server_span is not None:
+            route = getattr(request.scope.get("route"), "path", None)
+            if route:
+                server_span.name = f"{request.method} {route}"
+                server_span.set_attribute("http.route", route)
+            server_span.set_attribute("http.status_code", response.status_code)
+            response.headers["traceparent"] = server_span.traceparent
+        return response
+
 # Scheduler setup
 scheduler = AsyncIOScheduler()
 
+# Embedded task worker (only when TASK_QUEUE_EMBEDDED_WORKER is true)
+task_worker = None
+
+SCRAPE_INTERVAL = timedelta(hours=settings.SCRAPER_SCHEDULE_HOURS or 4)
+MATCH_INTERVAL = timedelta(hours=settings.MATCHER_SCHEDULE_HOURS or 6)
+MAINTENANCE_INTERVAL = timedelta(days=1)
+
+# Replicas skip a firing if any replica started the same job within half its
+# interval (tolerates clock skew and jitter between replicas).
 async def scheduled_job_scraping():
+    await run_exclusive("job_scraping_task", _scrape_jobs, SCRAPE_INTERVAL / 2)
+
+async def scheduled_job_matching():
+    await run_exclusive("job_matching_task", _match_jobs, MATCH_INTERVAL / 2)
+
+async def scheduled_data_maintenance():
+    await run_exclusive("data_maintenance_task", _run_data_maintenance, MAINTENANCE_INTERVAL / 2)
+
+async def _scrape_jobs():
     print("Scheduler: Starting scheduled job scraping...")
-    await trigger_job_scraping()
+    # Always scrape, but attach to a scrape a refresh request already started
+    await ensure_fresh_scrape(max_age_minutes=0)
     print("Scheduler: Finished scheduled job scraping.")
 
-async def scheduled_job_matching():
+async def _match_jobs():
+    # Match only against a finished scrape: waits for one in progress, reuses
+    # one from the last scrape interval, or scrapes first if none is that recent.
+    scrape_status = await ensure_fresh_scrape(max_age_minutes=SCRAPE_INTERVAL.total_seconds() / 60)
+    if scrape_status == "failed":
+        print("Scheduler: Latest scrape failed; matching against existing jobs.")
     print("Scheduler: Starting scheduled job matching for all users...")
-    await match_jobs_for_all_users() # Use the imported function
+    if settings.MATCH_SHARDS != 1:
+        from app.services.sharded_matcher import match_jobs_for_all_users_sharded # numpy/scipy only when sharding
+
+        await match_jobs_for_all_users_sharded()
+    else:
+        await match_jobs_for_all_users() # Use the imported function
     print("Scheduler: Finished scheduled job matching for all users.")
 
-async def scheduled_data_maintenance():
+async def _run_data_maintenance():
     print("Scheduler: Starting data maintenance (deleting old jobs)...")
     await delete_old_job_postings()
     print("Scheduler: Finished data maintenance.")
 
 @app.on_event("startup")
 async def startup_event():
+    global task_worker
+    # Schema is migrated by init_db.py (Alembic) at deploy time; this is for local development
+    if settings.AUTO_CREATE_SCHEMA:
+        await asyncio.to_thread(Base.metadata.create_all, bind=engine)
+
+    # Prefetch JWKS signing keys so the first authenticated request doesn't wait on them
+    await jwks_store.start()
+
+    # The in-process response cache learns about writes made by other processes over NOTIFY
+    if not response_cache.shared:
+        await task_event_hub.start()
+
+    if settings.TASK_QUEUE_EMBEDDED_WORKER:
+        task_worker = TaskWorker(TASK_HANDLERS)
+        asyncio.create_task(task_worker.run())
+        print("Embedded task worker started.")
+
+    if settings.SCHEDULER_ENABLED:
+        start_scheduler()
+    else:
+        print("Scheduler disabled (SCHEDULER_ENABLED=false).")
+    # Run once on startup after a short delay - COMMENTED OUT TO PREVENT STARTUP SCRAPE/MATCH
+    # asyncio.create_task(initial_tasks()) 
+    print("Initial tasks on startup (scraping/matching) are DISABLED.")
+    
+    # Load or fit the global TF-IDF vectorizer
+    asyncio.create_task(initialize_vectorizer())
+
+def start_scheduler():
+    # Jitter spreads replicas' firings apart; max_instances/coalesce stop runs
+    # piling up in one process, and run_exclusive dedupes across processes.
+    job_defaults = dict(max_instances=1, coalesce=True, misfire_grace_time=300, replace_existing=True)
+    jitter = settings.SCHEDULER_JITTER_SECONDS or None
     # Schedule job scraping (e.g., every X hours from settings)
     scheduler.add_job(
         scheduled_job_scraping,
-        trigger=IntervalTrigger(hours=settings.SCRAPER_SCHEDULE_HOURS or 4),
+        trigger=IntervalTrigger(seconds=SCRAPE_INTERVAL.total_seconds(), jitter=jitter),
         id="job_scraping_task",
         name="Periodic Job Scraping",
-        replace_existing=True,
+        **job_defaults,
     )
-    # Schedule job matching (e.g., every Y hours from settings)
+    # Schedule job matching (e.g., every Y hours from settings); waits for a fresh scrape
     scheduler.add_job(
         scheduled_job_matching,
-        trigger=IntervalTrigger(hours=settings.MATCHER_SCHEDULE_HOURS or 6),
+        trigger=IntervalTrigger(seconds=MATCH_INTERVAL.total_seconds(), jitter=jitter),
         id="job_matching_task",
         name="Periodic Job Matching",
-        replace_existing=True,
+        **job_defaults,
     )
     # Schedule data maintenance (e.g., daily)
-    # Runs 24 hours after the first run (which is on startup after initial_tasks delay)
     # Or, to run at a specific time like 3 AM:
     # trigger=CronTrigger(hour=3, minute=0, timezone='UTC') # Example for UTC
     scheduler.add_job(
         scheduled_data_maintenance,
-        trigger=IntervalTrigger(days=1), 
+        trigger=IntervalTrigger(seconds=MAINTENANCE_INTERVAL.total_seconds(), jitter=jitter),
         id="data_maintenance_task",
         name="Periodic Data Maintenance",
-        replace_existing=True,
+        **job_defaults,
     )
     scheduler.start()
     print("Scheduler started.")
-    # Run once on startup after a short delay - COMMENTED OUT TO PREVENT STARTUP SCRAPE/MATCH
-    # asyncio.create_task(initial_tasks()) 
-    print("Initial tasks on startup (scraping/matching) are DISABLED.")
-    
-    # Load or fit the global TF-IDF vectorizer
-    asyncio.create_task(initialize_vectorizer())
 
 async def initialize_vectorizer():
     await asyncio.sleep(2) # Short delay to let app settle
+    if os.path.exists(VECTORIZER_PATH):
+        return # Loaded on first match, so the API process doesn't import scikit-learn until it needs it
     if not load_global_vectorizer(): # Tries to load, returns False if file not found or error
         print(f"Vectorizer pickle file not found or failed to load. Attempting to fit a new one.")
         # Need a corpus to fit. Let's do an initial scrape if no vectorizer exists.
         # This is a one-time setup cost if the pickle isn't there.
-        from app.db.database import SessionLocal # Local import for DB session
-        db = SessionLocal()
+        from app.db.database import AsyncSessionLocal # Local import for DB session
+        from sqlalchemy import select
         try:
             print("Running a one-time scrape to build initial corpus for TF-IDF vectorizer...")
             # We need to ensure trigger_job_scraping can be called without task_id for this.
@@ -106,11 +226,9 @@ async def initialize_vectorizer():
             await trigger_job_scraping() # This will use its own db session and close it.
             
             # Fetch all job descriptions to create a corpus
-            # Re-open session as trigger_job_scraping closes its own.
-            db_for_corpus = SessionLocal()
-            all_jobs_for_corpus = db_for_corpus.query(Job.title, Job.description, Job.company, Job.location).all()
+            async with AsyncSessionLocal() as db_for_corpus:
+                all_jobs_for_corpus = (await db_for_corpus.execute(select(Job.title, Job.description, Job.company, Job.location))).all()
             corpus = [f"{j.title or ''} {j.description or ''} {j.company or ''} {j.location or ''}" for j in all_jobs_for_corpus]
-            db_for_corpus.close()
 
             if corpus:
                 fit_vectorizer_globally(corpus)
@@ -118,11 +236,6 @@ async def initialize_vectorizer():
                 print("No jobs found after initial scrape to build corpus. Vectorizer remains unfitted.")
         except Exception as e:
             print(f"Error during initial vectorizer fitting: {e}")
-        finally:
-            if db.is_active:
-                db.close()
-            if 'db_for_corpus' in locals() and db_for_corpus.is_active:
-                db_for_corpus.close()
 
 
 async def initial_tasks(): # This function is currently not called on startup
@@ -135,13 +248,22 @@ async def initial_tasks(): # This function is currently not called on startup
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    scheduler.shutdown()
+    if scheduler.running:
+        scheduler.shutdown()
+    if task_worker:
+        task_worker.stop()
+    await jwks_store.stop()
+    await task_event_hub.close()
+    shutdown_extraction_pool()
+    shutdown_tracing()
     print("Scheduler shut down.")
+    shutdown_logging()
 
 # Include routers
 app.include_router(auth.router, prefix='/api/auth', tags=['Authentication']) # Add auth router
 app.include_router(profile.router, prefix='/api/profile', tags=['User Profile'])
 app.include_router(jobs.router, prefix='/api/jobs', tags=['Jobs'])
+app.include_router(admin.router, prefix='/api/admin', tags=['Admin'], include_in_schema=False)
 
 @app.get("/")
 async def root():
@@ -150,3 +272,13 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+    if settings.METRICS_TOKEN:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(token, settings.METRICS_TOKEN):
+            return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    return Response(await REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
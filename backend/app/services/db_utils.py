@@ -1,23 +1,54 @@
 import logging
-from sqlalchemy.orm import Session
+import time
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy.exc import IntegrityError # Import IntegrityError
-from app.db.models import Job
+from app.core.metrics import JOB_SAVE_SECONDS, JOBS_SAVED
+from app.core.tracing import traced
+from app.db.models import Job, Profile
 from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
 
 logger = logging.getLogger(__name__)
 
+# Statements issued by load_profile_aggregate: the profile, then one IN query
+# per collection (selectinload), regardless of how many skills/experiences exist.
+PROFILE_AGGREGATE_STATEMENTS = 3
+
+def profile_aggregate_stmt(profile_id, refresh: bool = False):
+    """
+    SELECT for a profile with its skills and experiences loaded up front.
+    Shared by the profile API and the matchers (async and sync sessions) so no
+    code path lazy-loads the collections one query at a time. `refresh`
+    re-populates an already-loaded instance (e.g. server defaults after a commit).
+    """
+    stmt = select(Profile).where(Profile.id == profile_id).options(
+        selectinload(Profile.skills),
+        selectinload(Profile.experiences),
+    )
+    if refresh:
+        stmt = stmt.execution_options(populate_existing=True)
+    return stmt
+
+async def load_profile_aggregate(db, profile_id, refresh: bool = False):
+    """Load a profile with skills and experiences in PROFILE_AGGREGATE_STATEMENTS queries."""
+    return (await db.execute(profile_aggregate_stmt(profile_id, refresh=refresh))).scalars().first()
+
+@traced("save_jobs_to_db")
 async def save_jobs_to_db(jobs: list, db: Session = None): # db parameter kept for backward compatibility but ignored
     """Save scraped jobs to the database, handling duplicates based on canonical URL."""
-    from app.db.database import SessionLocal
-    local_db = SessionLocal()
+    from app.db.database import AsyncSessionLocal
+    started = time.perf_counter()
+    local_db = AsyncSessionLocal()
     try:
         new_jobs_count = 0
+        skipped_count = 0
         processed_urls_in_batch = set()
 
         for job_data in jobs:
             raw_url = job_data.get("url")
             if not raw_url:
-                logger.warning(f"Skipping job due to missing URL: {job_data.get('title', 'N/A')}")
+                logger.debug("Skipping job due to missing URL: %s", job_data.get('title', 'N/A'))
+                skipped_count += 1
                 continue
 
             parsed_url = urlparse(raw_url)
@@ -29,18 +60,20 @@ async def save_jobs_to_db(jobs: list, db: Session = None): # db parameter kept f
             canonical_url = urlunparse(parsed_url._replace(query=urlencode(filtered_query_params, doseq=True)))
             
             if not canonical_url:
-                logger.warning(f"Skipping job due to invalid canonical URL for raw URL: {raw_url}")
+                logger.debug("Skipping job due to invalid canonical URL for raw URL: %s", raw_url)
+                skipped_count += 1
                 continue
 
             job_data["url"] = canonical_url
 
             if canonical_url in processed_urls_in_batch:
-                logger.info(f"Skipping duplicate job (already processed in this batch) for URL: {canonical_url}")
+                logger.debug("Skipping duplicate job (already processed in this batch) for URL: %s", canonical_url)
+                skipped_count += 1
                 continue
             
             processed_urls_in_batch.add(canonical_url)
 
-            existing_job = local_db.query(Job).filter(Job.url == canonical_url).first()
+            existing_job = (await local_db.execute(select(Job.id).where(Job.url == canonical_url))).first()
             if not existing_job:
                 job = Job(**job_data)
                 local_db.add(job)
@@ -48,16 +81,23 @@ async def save_jobs_to_db(jobs: list, db: Session = None): # db parameter kept f
     
         if new_jobs_count > 0:
             try:
-                local_db.commit() # Commit after processing all jobs in the batch
-                logger.info(f"Added {new_jobs_count} new jobs to the database.")
+                await local_db.commit() # Commit after processing all jobs in the batch
+                JOBS_SAVED.inc(new_jobs_count, result="new")
+                logger.info("Added %d new jobs to the database (%d already stored, %d skipped).",
+                            new_jobs_count, len(processed_urls_in_batch) - new_jobs_count, skipped_count)
             except IntegrityError as e: 
-                local_db.rollback()
-                logger.warning(f"Database integrity error during batch save: {e}")
+                await local_db.rollback()
+                JOBS_SAVED.inc(new_jobs_count, result="failed")
+                logger.warning("Database integrity error during batch save: %s", e)
             except Exception as e:
-                local_db.rollback()
-                logger.error(f"Unexpected error during batch save of jobs: {e}", exc_info=True)
+                await local_db.rollback()
+                JOBS_SAVED.inc(new_jobs_count, result="failed")
+                logger.error("Unexpected error during batch save of jobs: %s", e, exc_info=True)
                 raise
         else:
-            logger.info("No new jobs to add to the database from this batch.")
+            logger.info("No new jobs to add to the database from this batch (%d already stored, %d skipped).",
+                        len(processed_urls_in_batch), skipped_count)
+        JOBS_SAVED.inc(len(processed_urls_in_batch) - new_jobs_count, result="existing")
     finally:
-        local_db.close()
+        await local_db.close()
+        JOB_SAVE_SECONDS.observe(time.perf_counter() - started)
@@ -1,8 +1,5 @@
-import requests
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
-import time
 import random
 from typing import List, Dict, Any
 import logging
@@ -11,9 +8,8 @@ from sqlalchemy.orm import Session
 # from app.db.models import Job 
 # Import the centralized save_jobs_to_db from db_utils
 from app.services.db_utils import save_jobs_to_db
+from app.services.scrape_fixtures import http_get, polite_delay
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Constants
@@ -67,10 +63,12 @@ async def scrape_hackernews_jobs(max_jobs_param: int = 30) -> List[Dict[str, Any
     jobs = []
     try:
         headers = {"User-Agent": get_random_user_agent(), "Accept-Language": "en-US,en;q=0.9"}
-        response = requests.get(HN_JOBS_URL, headers=headers)
+        response = http_get(HN_JOBS_URL, headers=headers)
         if response.status_code != 200:
             logger.error(f"Failed to fetch HN jobs page: {response.status_code}")
             return jobs
+        from bs4 import BeautifulSoup # Deferred: only scraping processes pay for bs4
+
         soup = BeautifulSoup(response.text, "html.parser")
         job_tables = soup.find_all("tr", {"class": "athing"})
         for i, job_table in enumerate(job_tables):
@@ -93,9 +91,9 @@ async def scrape_hackernews_jobs(max_jobs_param: int = 30) -> List[Dict[str, Any
                     "description": description, "url": job_url, "source": "hackernews",
                     "posted_date": datetime.now() # HN doesn't provide easily parsable dates for main listings
                 })
-                logger.info(f"Scraped job: {title} at {company}")
-                time.sleep(random.uniform(0.5, 1.0))
-            except Exception as e: logger.error(f"Error parsing job item: {str(e)}")
+                logger.debug("Scraped job: %s at %s", title, company)
+                polite_delay(0.5, 1.0)
+            except Exception as e: logger.error("Error parsing job item: %s", e)
     except Exception as e: logger.error(f"Error scraping Hacker News jobs: {str(e)}")
     logger.info(f"Finished scraping, found {len(jobs)} jobs")
     return jobs
@@ -104,15 +102,17 @@ def get_job_details(job_url: str, headers: Dict[str, str]) -> Dict[str, Any]:
     try:
         if "news.ycombinator.com" not in job_url:
             return {"description": f"See full details at {job_url}", "location": "Not specified"}
-        response = requests.get(job_url, headers=headers)
+        response = http_get(job_url, headers=headers)
         if response.status_code != 200: return {}
+        from bs4 import BeautifulSoup
+
         soup = BeautifulSoup(response.text, "html.parser")
         job_text = soup.get_text()
         location = extract_location(job_text)
         description = clean_text(job_text)
         return {"description": description[:1000], "location": location}
     except Exception as e:
-        logger.error(f"Error fetching job details: {str(e)}")
+        logger.error("Error fetching job details: %s", e)
         return {}
 
 async def run_hackernews_scraper(db: Session, max_jobs: int = 30) -> List[Dict[str, Any]]:
@@ -1,15 +1,32 @@
-from sklearn.metrics.pairwise import cosine_similarity
 import asyncio
-from sqlalchemy.orm import Session
+import time
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging 
-from typing import Dict, Optional, Any 
+from typing import TYPE_CHECKING, Dict, Optional, Any 
 
-from app.db.database import SessionLocal
-from app.db.models import User, Profile, Skill, Experience, Job, UserJobMatch
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.metrics import MATCH_STAGE_SECONDS, VECTORIZER_TRANSFORM_SECONDS
+from app.core.tracing import traced
+from app.db.database import AsyncSessionLocal
+from app.db.models import User, Job, UserJobMatch
+from app.services.db_utils import load_profile_aggregate
+from app.services.profiling import profiled
+from app.services.task_events import publish_task_event
 from app.services.vectorizer import get_global_vectorizer # Import the global vectorizer
 
+if TYPE_CHECKING:
+    from app.services.job_vectors import JobVectorSnapshot
+
 logger = logging.getLogger(__name__) 
 
+# Most recently scraped jobs considered for matching
+MATCH_JOB_LIMIT = 500
+
+# Top matches included in the "matches" progress event (NOTIFY payloads are size-limited)
+MATCH_EVENT_LIMIT = 20
+
 def prepare_profile_text(profile, skills, experiences):
     profile_text = ""
     if profile.desired_roles:
@@ -27,6 +44,24 @@ def prepare_profile_text(profile, skills, experiences):
             profile_text += f"{exp.description} "
     return profile_text.strip()
 
+# Vectorized job set from the last match, reused until the jobs or the
+# vectorizer change, so a rematch only has to transform the profile text.
+_job_vector_cache: Dict[str, Any] = {"key": None, "vectors": None}
+
+def get_job_vectors(jobs: list, vectorizer):
+    global _job_vector_cache
+    key = (id(vectorizer), tuple((job.id, job.scraped_at) for job in jobs))
+    cached = _job_vector_cache
+    if cached["key"] == key:
+        return cached["vectors"]
+    job_texts = [f"{job.title or ''} {job.company or ''} {job.location or ''} {job.description or ''}" for job in jobs]
+    with VECTORIZER_TRANSFORM_SECONDS.time(target="jobs"):
+        vectors = vectorizer.transform(job_texts)
+    # Swap the whole dict at once; matches run in worker threads
+    _job_vector_cache = {"key": key, "vectors": vectors}
+    return vectors
+
+@traced("calculate_job_matches")
 def calculate_job_matches(profile_text: str, jobs: list[Job], top_n=50):
     if not jobs or not profile_text:
         return []
@@ -36,29 +71,62 @@ def calculate_job_matches(profile_text: str, jobs: list[Job], top_n=50):
         logger.error("Global TF-IDF vectorizer is not fitted. Cannot calculate job matches. Please ensure it's fitted on startup or via admin action.")
         return []
 
-    job_texts = [f"{job.title or ''} {job.company or ''} {job.location or ''} {job.description or ''}" for job in jobs]
-    
     try:
         # Transform profile and job texts using the globally fitted vectorizer
-        profile_vector = vectorizer.transform([profile_text])
-        job_vectors = vectorizer.transform(job_texts)
+        with MATCH_STAGE_SECONDS.time(stage="vectorize"):
+            with VECTORIZER_TRANSFORM_SECONDS.time(target="profile"):
+                profile_vector = vectorizer.transform([profile_text])
+            job_vectors = get_job_vectors(jobs, vectorizer)
     except Exception as e:
-        logger.error(f"Error transforming texts with global vectorizer: {e}", exc_info=True)
+        logger.error("Error transforming texts with global vectorizer: %s", e, exc_info=True)
         # This might happen if the vectorizer was loaded but is incompatible, or texts are problematic
         # Fallback or re-fitting might be needed in a more robust system.
         return []
 
-    similarities = cosine_similarity(profile_vector, job_vectors).flatten()
-    
-    job_matches = []
-    for i in range(len(jobs)):
-        # Ensure relevance_score is a standard Python float
-        score = float(similarities[i]) if similarities[i] is not None else 0.0
-        job_matches.append((jobs[i].id, score))
+    from sklearn.metrics.pairwise import cosine_similarity # Deferred: keeps scikit-learn out of startup
+
+    with MATCH_STAGE_SECONDS.time(stage="score"):
+        similarities = cosine_similarity(profile_vector, job_vectors).flatten()
         
-    job_matches.sort(key=lambda x: x[1], reverse=True)
+        job_matches = []
+        for i in range(len(jobs)):
+            # Ensure relevance_score is a standard Python float
+            score = float(similarities[i]) if similarities[i] is not None else 0.0
+            job_matches.append((jobs[i].id, score))
+            
+        job_matches.sort(key=lambda x: x[1], reverse=True)
     return job_matches[:top_n]
 
+@traced("calculate_job_matches_chunked")
+def calculate_job_matches_chunked(profile_text: str, snapshot: "JobVectorSnapshot", top_n=50):
+    """Like calculate_job_matches, but against the memory-mapped job vectors, one block at a time."""
+    from app.services.job_vectors import top_k
+
+    if not profile_text or snapshot.rows == 0:
+        return []
+    vectorizer = get_global_vectorizer()
+    with MATCH_STAGE_SECONDS.time(stage="vectorize"):
+        with VECTORIZER_TRANSFORM_SECONDS.time(target="profile"):
+            profile_vector = vectorizer.transform([profile_text])
+    with MATCH_STAGE_SECONDS.time(stage="score"):
+        return top_k(snapshot, profile_vector, top_n)
+
+def apply_role_boost(matches: list, desired_roles: Optional[str], titles_by_id: Dict[int, str]) -> list:
+    """Boost jobs whose title contains one of the desired roles, re-sorted by score."""
+    if not desired_roles:
+        return matches
+    desired_roles_keywords = [role.strip().lower() for role in desired_roles.split(',')]
+    boosted = []
+    for job_id_val, score in matches:
+        job_title_lower = (titles_by_id.get(job_id_val) or "").lower()
+        if job_title_lower and any(role_keyword in job_title_lower for role_keyword in desired_roles_keywords):
+            score = min(score + 0.1, 1.0)
+        boosted.append((job_id_val, score))
+    boosted.sort(key=lambda x: x[1], reverse=True)
+    return boosted
+
+@traced("match_jobs_for_user")
+@profiled("match", label_kwarg="user_id")
 async def match_jobs_for_user(user_id: str, **kwargs: Any): 
     task_id: Optional[str] = kwargs.get("task_id")
     task_statuses_ref: Optional[Dict[str, Dict[str, str]]] = kwargs.get("task_statuses_ref")
@@ -66,76 +134,86 @@ async def match_jobs_for_user(user_id: str, **kwargs: Any):
     def _update_status(status_message: str, current_status_verb: str = "matching"):
         if task_id and task_statuses_ref is not None:
             task_statuses_ref[task_id] = {"status": current_status_verb, "message": status_message}
-            logger.info(f"Task ID {task_id}, User {user_id}: Status updated - {status_message}")
+            logger.debug("Task ID %s, User %s: Status updated - %s", task_id, user_id, status_message)
 
-    db: Optional[Session] = None
+    db: Optional[AsyncSession] = None
     try:
-        _update_status("Matching process started after delay.")
-        await asyncio.sleep(3) 
-        logger.info(f"User {user_id} - Starting match_jobs_for_user after delay (Task ID: {task_id}).")
+        _update_status("Matching process started.")
+        logger.info("User %s - Starting match_jobs_for_user (Task ID: %s).", user_id, task_id)
 
-        db = SessionLocal()
+        db = AsyncSessionLocal()
         _update_status("Fetching profile data.")
-        profile = db.query(Profile).filter(Profile.id == user_id).first()
+        load_started = time.perf_counter()
+        profile = await load_profile_aggregate(db, user_id)
         if not profile:
-            logger.warning(f"User {user_id} - No profile found.")
+            logger.warning("User %s - No profile found.", user_id)
             _update_status("No profile found.", current_status_verb="failed")
             return
         
-        skills = db.query(Skill).filter(Skill.profile_id == profile.id).all()
-        experiences = db.query(Experience).filter(Experience.profile_id == profile.id).all()
-        
-        profile_text = prepare_profile_text(profile, skills, experiences)
-        logger.info(f"User {user_id} - Profile text (first 300 chars): {profile_text[:300]}")
+        profile_text = prepare_profile_text(profile, profile.skills, profile.experiences)
+        logger.debug("User %s - Profile text is %d chars.", user_id, len(profile_text))
         if not profile_text.strip():
-            logger.warning(f"User {user_id} - Empty profile text, cannot match jobs.")
+            logger.warning("User %s - Empty profile text, cannot match jobs.", user_id)
             _update_status("Profile text is empty.", current_status_verb="failed")
             return
         
-        _update_status("Fetching jobs from database.")
-        jobs = db.query(Job).order_by(Job.scraped_at.desc()).limit(500).all() # Consider if 500 is too many for every run
-        logger.info(f"User {user_id} - Found {len(jobs)} jobs in DB to match against.")
-        if not jobs:
-            logger.warning(f"User {user_id} - No jobs found in database for matching.")
-            _update_status("No jobs in DB to match against.", current_status_verb="completed") 
-            return 
-        
-        _update_status("Calculating TF-IDF and cosine similarities using global vectorizer.")
-        raw_job_matches = calculate_job_matches(profile_text, jobs)
-        if not raw_job_matches and jobs: # If vectorizer failed or returned empty
+        if settings.MATCH_CHUNKED:
+            # Score against the on-disk job vectors; no Job rows or descriptions are loaded
+            from app.services.job_vectors import current_snapshot
+
+            _update_status("Loading job vectors.")
+            snapshot = await current_snapshot(db)
+            MATCH_STAGE_SECONDS.observe(time.perf_counter() - load_started, stage="load")
+            if snapshot is None:
+                _update_status("Failed to build job vectors with global vectorizer.", current_status_verb="failed")
+                return
+            if snapshot.rows == 0:
+                logger.warning("User %s - No jobs found in database for matching.", user_id)
+                _update_status("No jobs in DB to match against.", current_status_verb="completed")
+                return
+
+            _update_status("Calculating cosine similarities over job vector blocks.")
+            raw_job_matches = await asyncio.to_thread(calculate_job_matches_chunked, profile_text, snapshot)
+            titles = dict((await db.execute(
+                select(Job.id, Job.title).where(Job.id.in_([job_id_val for job_id_val, _ in raw_job_matches]))
+            )).all())
+        else:
+            _update_status("Fetching jobs from database.")
+            jobs = (await db.execute(select(Job).order_by(Job.scraped_at.desc()).limit(MATCH_JOB_LIMIT))).scalars().all()
+            MATCH_STAGE_SECONDS.observe(time.perf_counter() - load_started, stage="load")
+            logger.debug("User %s - Found %d jobs in DB to match against.", user_id, len(jobs))
+            if not jobs:
+                logger.warning("User %s - No jobs found in database for matching.", user_id)
+                _update_status("No jobs in DB to match against.", current_status_verb="completed") 
+                return 
+
+            _update_status("Calculating TF-IDF and cosine similarities using global vectorizer.")
+            # CPU-bound TF-IDF transform runs off the event loop
+            raw_job_matches = await asyncio.to_thread(calculate_job_matches, profile_text, jobs)
+            titles = {job.id: job.title for job in jobs}
+        if not raw_job_matches: # If vectorizer failed or returned empty
              _update_status("Failed to calculate similarities with global vectorizer.", current_status_verb="failed")
              return
 
-        logger.info(f"User {user_id} - Calculated {len(raw_job_matches)} raw matches (before boost/filter). Top 5: {raw_job_matches[:5]}")
+        logger.debug("User %s - Calculated %d raw matches (before boost/filter). Top 5: %s", user_id, len(raw_job_matches), raw_job_matches[:5])
         
-        job_matches_with_boost = []
         if profile.desired_roles:
             _update_status("Applying boost for desired roles.")
-            desired_roles_keywords = [role.strip().lower() for role in profile.desired_roles.split(',')]
-            for job_id_val, score in raw_job_matches:
-                job_for_boost_check = next((job for job in jobs if job.id == job_id_val), None)
-                if job_for_boost_check and job_for_boost_check.title:
-                    job_title_lower = job_for_boost_check.title.lower()
-                    for role_keyword in desired_roles_keywords:
-                        if role_keyword in job_title_lower:
-                            score += 0.1 
-                            score = min(score, 1.0) 
-                            break 
-                job_matches_with_boost.append((job_id_val, score))
-            job_matches_with_boost.sort(key=lambda x: x[1], reverse=True)
-            job_matches_to_save = job_matches_with_boost
-        else:
-            job_matches_to_save = raw_job_matches
+        with MATCH_STAGE_SECONDS.time(stage="boost"):
+            job_matches_to_save = apply_role_boost(raw_job_matches, profile.desired_roles, titles)
 
         _update_status("Saving relevant matches to database.")
+        save_started = time.perf_counter()
         saved_matches_count = 0
         for job_id_val, relevance_score in job_matches_to_save:
             if relevance_score <= 0.01: 
                 continue
-            existing_match = db.query(UserJobMatch).filter(
-                UserJobMatch.user_id == user_id,
-                UserJobMatch.job_id == job_id_val
-            ).first()
+            existing_match = (await db.execute(
+                select(UserJobMatch).where(
+                    UserJobMatch.user_id == user_id,
+                    UserJobMatch.job_id == job_id_val
+                )
+            )).scalars().first()
             if existing_match:
                 existing_match.relevance_score = relevance_score
             else:
@@ -147,39 +225,49 @@ async def match_jobs_for_user(user_id: str, **kwargs: Any):
             saved_matches_count += 1
         
         if saved_matches_count > 0:
-            db.commit()
-            logger.info(f"User {user_id} - Saved/updated {saved_matches_count} job matches to UserJobMatch table.")
+            await db.commit()
+            MATCH_STAGE_SECONDS.observe(time.perf_counter() - save_started, stage="save")
+            await response_cache.invalidate_user(user_id)
+            logger.info("User %s - Saved/updated %d job matches to UserJobMatch table.", user_id, saved_matches_count)
+            if task_id:
+                await publish_task_event(task_id, "matches", {
+                    "count": saved_matches_count,
+                    "matches": [
+                        {"job_id": job_id_val, "title": (titles.get(job_id_val) or "")[:120], "relevance_score": round(score, 4)}
+                        for job_id_val, score in job_matches_to_save[:MATCH_EVENT_LIMIT] if score > 0.01
+                    ],
+                })
             _update_status(f"Matching completed. {saved_matches_count} matches found/updated.", current_status_verb="completed")
         else:
-            logger.info(f"User {user_id} - No relevant job matches (score > 0.01) found to save.")
+            logger.info("User %s - No relevant job matches (score > 0.01) found to save.", user_id)
             _update_status("Matching completed. No new relevant matches found.", current_status_verb="completed")
         
-        logger.info(f"Job matching completed for user {user_id} (Task ID: {task_id})")
+        logger.debug("Job matching completed for user %s (Task ID: %s)", user_id, task_id)
         
     except Exception as e:
-        logger.error(f"Error during job matching for user {user_id} (Task ID: {task_id}): {str(e)}", exc_info=True)
+        logger.error("Error during job matching for user %s (Task ID: %s): %s", user_id, task_id, e, exc_info=True)
         if task_id and task_statuses_ref is not None:
              _update_status(f"Matching failed: {str(e)}", current_status_verb="failed")
     finally:
-        if db: db.close()
+        if db: await db.close()
 
 async def match_jobs_for_all_users():
-    db: Optional[Session] = None
+    db: Optional[AsyncSession] = None
     try:
-        db = SessionLocal()
-        users = db.query(User).filter(User.is_active == True).all()
+        db = AsyncSessionLocal()
+        users = (await db.execute(select(User).where(User.is_active == True))).scalars().all()
         
         for user in users:
             if user.supabase_id: 
-                logger.info(f"Scheduler: Triggering matching for user with supabase_id: {user.supabase_id}")
+                logger.info("Scheduler: Triggering matching for user with supabase_id: %s", user.supabase_id)
                 await match_jobs_for_user(user_id=user.supabase_id, task_id=None, task_statuses_ref=None) 
                 await asyncio.sleep(1)
             else:
-                logger.warning(f"Scheduler: Skipping user with local id {user.id} as they don't have a supabase_id.")
+                logger.warning("Scheduler: Skipping user with local id %s as they don't have a supabase_id.", user.id)
             
         logger.info("Job matching completed for all users by scheduler.")
         
     except Exception as e:
-        logger.error(f"Error during scheduled job matching for all users: {str(e)}", exc_info=True)
+        logger.error("Error during scheduled job matching for all users: %s", e, exc_info=True)
     finally:
-        if db: db.close()
+        if db: await db.close()
@@ -1,23 +1,20 @@
 import os
-from bs4 import BeautifulSoup
 import time
 import random
 from datetime import datetime
 import asyncio
-from sqlalchemy.orm import Session
-from firecrawl import FirecrawlApp
-import requests
 
-from app.db.database import SessionLocal
 from app.core.config import settings
+from app.core.metrics import SCRAPE_ITEMS, SCRAPE_SECONDS
+from app.core.tracing import span, traced
 from app.services.hackernews_scraper import run_hackernews_scraper
 from app.services.weworkremotely_scraper import run_weworkremotely_scraper 
 from app.services.db_utils import save_jobs_to_db 
+from app.services.profiling import profiled
 import logging
 from typing import Dict, Optional, Any # For type hinting
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO) 
 
 nlp = None # Spacy is temporarily commented out
 
@@ -44,15 +41,25 @@ async def parse_linkedin_html(html_content: str, source_url: str, max_results=10
     logger.info(f"LinkedIn HTML parsing not yet implemented. Received {len(html_content)} chars for {source_url}.")
     return jobs
 
+async def _timed_scrape(source: str, scrape):
+    with span(f"scrape.{source}", **{"scrape.source": source}) as scrape_span, SCRAPE_SECONDS.time(source=source):
+        jobs = await scrape
+        if scrape_span is not None:
+            scrape_span.set_attribute("scrape.jobs", len(jobs) if isinstance(jobs, list) else 0)
+    SCRAPE_ITEMS.observe(len(jobs) if isinstance(jobs, list) else 0, source=source)
+    return jobs
+
+@traced("trigger_job_scraping")
+@profiled("scrape", label_kwarg="task_id")
 async def trigger_job_scraping(**kwargs: Any): # Accept arbitrary keyword arguments
-    db = SessionLocal()
+    db = None # Scrapers save through save_jobs_to_db, which opens its own async session
     task_id: Optional[str] = kwargs.get("task_id")
     task_statuses_ref: Optional[Dict[str, Dict[str, str]]] = kwargs.get("task_statuses_ref")
 
     def _update_status(status_message: str, current_status_verb: str = "scraping"):
         if task_id and task_statuses_ref is not None:
             task_statuses_ref[task_id] = {"status": current_status_verb, "message": status_message}
-            logger.info(f"Task ID {task_id}: Status updated - {status_message}")
+            logger.debug("Task ID %s: Status updated - %s", task_id, status_message)
 
     try:
         _update_status("Initializing scraping: Fetching enabled sources.")
@@ -66,13 +73,13 @@ async def trigger_job_scraping(**kwargs: Any): # Accept arbitrary keyword argume
             _update_status("Queueing Hacker News Jobs scraping.")
             logger.info("Queueing Hacker News Jobs scraping...")
             # Pass db and max_jobs; individual scrapers handle their own saving now
-            scraping_tasks.append(run_hackernews_scraper(db, max_jobs=settings.SCRAPER_MAX_JOBS_PER_SOURCE or 30))
+            scraping_tasks.append(_timed_scrape("hackernews", run_hackernews_scraper(db, max_jobs=settings.SCRAPER_MAX_JOBS_PER_SOURCE or 30)))
             source_map.append("HackerNews")
 
         if "weworkremotely" in enabled_sources:
             _update_status("Queueing WeWorkRemotely Jobs scraping.")
             logger.info("Queueing WeWorkRemotely Jobs scraping...")
-            scraping_tasks.append(run_weworkremotely_scraper(db, max_jobs=settings.SCRAPER_MAX_JOBS_PER_SOURCE or 30))
+            scraping_tasks.append(_timed_scrape("weworkremotely", run_weworkremotely_scraper(db, max_jobs=settings.SCRAPER_MAX_JOBS_PER_SOURCE or 30)))
             source_map.append("WeWorkRemotely")
         
         if scraping_tasks:
@@ -107,5 +114,3 @@ async def trigger_job_scraping(**kwargs: Any): # Accept arbitrary keyword argume
         logger.error(f"Critical error in trigger_job_scraping: {str(e)}", exc_info=True)
         if task_id and task_statuses_ref is not None:
             _update_status(f"Scraping failed: {str(e)}", current_status_verb="failed")
-    finally:
-        if db: db.close()
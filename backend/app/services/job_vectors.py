@@ -0,0 +1,300 @@
+"""
+On-disk TF-IDF job vectors and memory-bounded top-k scoring.
+
+The in-memory matcher loads MATCH_JOB_LIMIT Job rows (descriptions included)
+and vectorizes them on every cache miss. For large job tables this module
+keeps the vectorized jobs in a snapshot directory instead:
+
+  - build_snapshot() streams (id, title, company, location, description) rows
+    from a server-side cursor in blocks, transforms each block and appends the
+    CSR arrays to raw files, so only one block of text is alive at a time,
+  - load_snapshot() memory-maps those files (the page cache, not the Python
+    heap, holds them, and processes share the pages),
+  - top_k() scores the matrix block by block against a profile vector and keeps
+    a running top-k heap, so peak memory is one block of similarities.
+
+Block sizes are derived from MATCH_MEMORY_BUDGET_MB. Snapshots are keyed by the
+job table's (count, max id, max scraped_at) and the vectorizer fingerprint;
+current_snapshot() rebuilds when either changes, holding a lock file in
+JOB_VECTOR_DIR so only one process builds (and removes old snapshots) at a
+time. Used by match_jobs_for_user when MATCH_CHUNKED is on and by the sharded
+matcher.
+"""
+
+import asyncio
+import contextlib
+import heapq
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError: # Windows: builds aren't serialised across processes
+    fcntl = None
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.metrics import VECTORIZER_TRANSFORM_SECONDS
+from app.db.database import AsyncSessionLocal
+from app.db.models import Job
+from app.services.vectorizer import VECTORIZER_PATH, get_global_vectorizer
+
+logger = logging.getLogger(__name__)
+
+# First build block; later blocks are sized from the text bytes actually seen
+INITIAL_BUILD_BLOCK = 256
+MIN_BLOCK_ROWS = 64
+
+_DTYPES = {"data": np.float64, "indices": np.int32, "indptr": np.int64, "job_ids": np.int64}
+
+_loaded: Dict[str, object] = {"dir": None, "snapshot": None}
+_build_lock: Optional[asyncio.Lock] = None
+
+
+class JobVectorSnapshot:
+    """Memory-mapped CSR matrix of job vectors; row i is job_ids[i]."""
+
+    def __init__(self, directory: str, matrix: csr_matrix, job_ids: np.ndarray, meta: dict):
+        self.directory = directory
+        self.matrix = matrix
+        self.job_ids = job_ids
+        self.meta = meta
+
+    @property
+    def rows(self) -> int:
+        return self.matrix.shape[0]
+
+    def block_rows(self, budget_bytes: Optional[int] = None) -> int:
+        """Rows per scoring block that keep one block's arrays and similarities within the budget."""
+        budget_bytes = budget_bytes or _budget_bytes()
+        nnz_per_row = self.matrix.nnz / self.rows if self.rows else 0
+        # data + indices per stored value, indptr + the dense similarity per row, x2 for the product's temporaries
+        per_row = 2 * (nnz_per_row * 12 + 16)
+        return max(MIN_BLOCK_ROWS, int(budget_bytes // per_row) if per_row else self.rows)
+
+
+def _budget_bytes() -> int:
+    return max(1, settings.MATCH_MEMORY_BUDGET_MB) * 1024 * 1024
+
+
+def vectorizer_fingerprint(vectorizer) -> str:
+    """Changes whenever the global vectorizer is refit (the pickle is rewritten on every fit)."""
+    try:
+        mtime = int(os.path.getmtime(VECTORIZER_PATH))
+    except OSError:
+        mtime = 0
+    return f"{len(getattr(vectorizer, 'vocabulary_', None) or {})}-{mtime}"
+
+
+async def job_table_key(db, limit: int) -> List[object]:
+    """Cheap fingerprint of the jobs a snapshot would contain."""
+    row = (await db.execute(select(func.count(Job.id), func.max(Job.id), func.max(Job.scraped_at)))).one()
+    return [min(row[0], limit) if limit else row[0], row[1], str(row[2])]
+
+
+def _job_text(row) -> str:
+    return f"{row.title or ''} {row.company or ''} {row.location or ''} {row.description or ''}"
+
+
+def _transform_block(vectorizer, rows: list) -> csr_matrix:
+    with VECTORIZER_TRANSFORM_SECONDS.time(target="jobs"):
+        return vectorizer.transform([_job_text(row) for row in rows]).tocsr()
+
+
+async def build_snapshot(directory: str, limit: int = 0) -> Optional[JobVectorSnapshot]:
+    """Stream the newest `limit` jobs (0 = all) into a snapshot at `directory`. None if the vectorizer isn't fitted."""
+    vectorizer = get_global_vectorizer()
+    if not hasattr(vectorizer, 'vocabulary_') or not vectorizer.vocabulary_:
+        logger.error("Global TF-IDF vectorizer is not fitted. Cannot build the job vector snapshot.")
+        return None
+    os.makedirs(directory, exist_ok=True)
+    budget = _budget_bytes()
+    started = time.perf_counter()
+
+    stmt = select(Job.id, Job.title, Job.company, Job.location, Job.description).order_by(Job.scraped_at.desc(), Job.id.desc())
+    if limit:
+        stmt = stmt.limit(limit)
+
+    files = {name: open(os.path.join(directory, f"{name}.bin"), "wb") for name in _DTYPES}
+    rows_written = nnz_written = 0
+    block_size = INITIAL_BUILD_BLOCK
+    try:
+        np.zeros(1, dtype=_DTYPES["indptr"]).tofile(files["indptr"])
+        async with AsyncSessionLocal() as db:
+            key = await job_table_key(db, limit)
+            result = await db.stream(stmt.execution_options(yield_per=INITIAL_BUILD_BLOCK))
+            block: list = []
+            block_text_bytes = 0
+            async for row in result:
+                block.append(row)
+                block_text_bytes += len(row.description or "") + 200
+                if len(block) >= block_size or block_text_bytes >= budget:
+                    nnz_written = await _append_block(files, vectorizer, block, nnz_written)
+                    rows_written += len(block)
+                    # Keep each block's text (plus its transform) near a quarter of the budget
+                    block_size = max(MIN_BLOCK_ROWS, int(len(block) * (budget / 4) / max(block_text_bytes, 1)))
+                    block, block_text_bytes = [], 0
+            if block:
+                nnz_written = await _append_block(files, vectorizer, block, nnz_written)
+                rows_written += len(block)
+    finally:
+        for f in files.values():
+            f.close()
+
+    meta = {"rows": rows_written, "cols": len(vectorizer.vocabulary_), "nnz": nnz_written, "limit": limit,
+            "table_key": key, "vectorizer": vectorizer_fingerprint(vectorizer), "built_at": time.time()}
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    logger.info("Built job vector snapshot: %d jobs, %d non-zeros in %.2fs (%s).",
+                rows_written, nnz_written, time.perf_counter() - started, directory)
+    return load_snapshot(directory)
+
+
+async def _append_block(files, vectorizer, block: list, nnz_offset: int) -> int:
+    matrix = await asyncio.to_thread(_transform_block, vectorizer, block)
+    matrix.data.astype(_DTYPES["data"], copy=False).tofile(files["data"])
+    matrix.indices.astype(_DTYPES["indices"], copy=False).tofile(files["indices"])
+    (matrix.indptr[1:].astype(_DTYPES["indptr"]) + nnz_offset).tofile(files["indptr"])
+    np.fromiter((row.id for row in block), dtype=_DTYPES["job_ids"], count=len(block)).tofile(files["job_ids"])
+    return nnz_offset + matrix.nnz
+
+
+def load_snapshot(directory: str) -> JobVectorSnapshot:
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+
+    def _map(name: str, count: int) -> np.ndarray:
+        if count == 0:
+            return np.zeros(0, dtype=_DTYPES[name])
+        return np.memmap(os.path.join(directory, f"{name}.bin"), dtype=_DTYPES[name], mode="r", shape=(count,))
+
+    indptr = _map("indptr", meta["rows"] + 1)
+    if meta["nnz"] < np.iinfo(np.int32).max:
+        # Match the int32 indices, otherwise scipy upcasts (copies) the whole indices array
+        indptr = indptr.astype(np.int32)
+    matrix = csr_matrix(
+        (_map("data", meta["nnz"]), _map("indices", meta["nnz"]), indptr),
+        shape=(meta["rows"], meta["cols"]), copy=False,
+    )
+    return JobVectorSnapshot(directory, matrix, _map("job_ids", meta["rows"]), meta)
+
+
+def top_k(snapshot: JobVectorSnapshot, profile_vector, k: int, block_rows: Optional[int] = None) -> List[Tuple[int, float]]:
+    """(job_id, cosine similarity) of the k best rows, scored one block at a time, best first."""
+    if snapshot.rows == 0 or k <= 0:
+        return []
+    block_rows = block_rows or snapshot.block_rows()
+    profile_column = profile_vector.T.tocsc()
+    heap: List[Tuple[float, int]] = [] # min-heap of (score, row)
+    for start in range(0, snapshot.rows, block_rows):
+        # TF-IDF rows are L2-normalised, so the dot product is the cosine similarity
+        scores = (snapshot.matrix[start:start + block_rows] @ profile_column).toarray().ravel()
+        candidates = np.argpartition(-scores, k)[:k] if len(scores) > k else range(len(scores))
+        for i in candidates:
+            entry = (float(scores[i]), start + int(i))
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+    return [(int(snapshot.job_ids[row]), score) for score, row in sorted(heap, reverse=True)]
+
+
+def _current_pointer() -> str:
+    return os.path.join(settings.JOB_VECTOR_DIR, "current.json")
+
+
+def _read_current() -> Optional[str]:
+    try:
+        with open(_current_pointer()) as f:
+            return os.path.join(settings.JOB_VECTOR_DIR, json.load(f)["dir"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+@contextlib.asynccontextmanager
+async def _cross_process_build_lock():
+    """Hold an exclusive lock on JOB_VECTOR_DIR/build.lock; yields whether one was taken."""
+    if fcntl is None:
+        yield False
+        return
+    with open(os.path.join(settings.JOB_VECTOR_DIR, "build.lock"), "a") as f:
+        # Another process may be mid-build; wait for it off the event loop
+        await asyncio.to_thread(fcntl.flock, f, fcntl.LOCK_EX)
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+async def current_snapshot(db) -> Optional[JobVectorSnapshot]:
+    """The shared snapshot for the newest MATCH_CHUNKED_JOB_LIMIT jobs, rebuilt if the jobs or vectorizer changed."""
+    global _build_lock
+    limit = settings.MATCH_CHUNKED_JOB_LIMIT
+    vectorizer = get_global_vectorizer()
+    expected = {"table_key": await job_table_key(db, limit), "vectorizer": vectorizer_fingerprint(vectorizer)}
+
+    def _fresh(snapshot) -> bool:
+        return snapshot is not None and all(snapshot.meta.get(name) == value for name, value in expected.items())
+
+    snapshot = _cached_snapshot()
+    if _fresh(snapshot):
+        return snapshot
+    if _build_lock is None:
+        _build_lock = asyncio.Lock()
+    async with _build_lock:
+        snapshot = _cached_snapshot()
+        if _fresh(snapshot):
+            return snapshot
+        os.makedirs(settings.JOB_VECTOR_DIR, exist_ok=True)
+        async with _cross_process_build_lock() as exclusive:
+            # Another process may have published while we waited for the lock
+            snapshot = _cached_snapshot()
+            if _fresh(snapshot):
+                return snapshot
+            directory = os.path.join(settings.JOB_VECTOR_DIR, uuid.uuid4().hex)
+            snapshot = await build_snapshot(directory, limit)
+            if snapshot is None:
+                shutil.rmtree(directory, ignore_errors=True)
+                return None
+            # Publish atomically; other processes pick it up on their next lookup
+            fd, tmp_path = tempfile.mkstemp(dir=settings.JOB_VECTOR_DIR, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump({"dir": os.path.basename(directory)}, f)
+            os.replace(tmp_path, _current_pointer())
+            _loaded.update(dir=directory, snapshot=snapshot)
+            _remove_old_snapshots(keep=directory, exclusive=exclusive)
+            return snapshot
+
+
+def _cached_snapshot() -> Optional[JobVectorSnapshot]:
+    directory = _read_current()
+    if directory is None:
+        return None
+    if _loaded["dir"] != directory:
+        try:
+            _loaded.update(dir=directory, snapshot=load_snapshot(directory))
+        except (OSError, ValueError, KeyError):
+            return None
+    return _loaded["snapshot"]
+
+
+def _remove_old_snapshots(keep: str, exclusive: bool, grace_seconds: float = 3600):
+    # Readers that still map an old snapshot keep their pages until they drop it (POSIX unlink semantics).
+    # Under the build lock no other process is building, so every unpublished directory is left over.
+    # Without it, any other directory may be a build in progress (or finished but not yet published).
+    published = _read_current()
+    for name in os.listdir(settings.JOB_VECTOR_DIR):
+        path = os.path.join(settings.JOB_VECTOR_DIR, name)
+        if not os.path.isdir(path) or path in (keep, published):
+            continue
+        if exclusive or time.time() - os.path.getmtime(path) > grace_seconds:
+            shutil.rmtree(path, ignore_errors=True)
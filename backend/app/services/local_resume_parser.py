@@ -0,0 +1,316 @@
+"""
+Local, deterministic resume parsing (no LLM round trip).
+
+Produces the same `full_name / skills / experiences` JSON as the Gemini
+extraction, in milliseconds, from the extracted resume text:
+
+  - sections are found by their headings (Experience, Skills, Education, ...),
+  - skills are matched against SKILL_TAXONOMY (canonical name -> aliases),
+    preferring the Skills section but scanning the whole resume,
+  - experiences are split on lines containing a date range; the title and
+    company come from that line (or the one before it), the description from
+    the lines that follow,
+  - the name is the first PERSON entity spaCy finds near the top of the
+    resume when `en_core_web_sm` is installed, else the first line that looks
+    like a name.
+
+parse_resume uses it as a first pass that is saved immediately and then,
+when Gemini is configured, refined by the LLM.
+"""
+
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SKILL_TAXONOMY: Dict[str, List[str]] = {
+    # Languages
+    "Python": ["python", "python3"],
+    "Java": ["java"],
+    "JavaScript": ["javascript", "js", "es6"],
+    "TypeScript": ["typescript", "ts"],
+    "C": ["c"],
+    "C++": ["c++", "cpp"],
+    "C#": ["c#", "csharp"],
+    "Go": ["go", "golang"],
+    "Rust": ["rust"],
+    "Ruby": ["ruby"],
+    "PHP": ["php"],
+    "Kotlin": ["kotlin"],
+    "Swift": ["swift"],
+    "Scala": ["scala"],
+    "R": ["r"],
+    "MATLAB": ["matlab"],
+    "SQL": ["sql"],
+    "Bash": ["bash", "shell scripting"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3"],
+    # Frameworks and libraries
+    "React": ["react", "react.js", "reactjs"],
+    "Next.js": ["next.js", "nextjs"],
+    "Vue.js": ["vue", "vue.js", "vuejs"],
+    "Angular": ["angular", "angularjs"],
+    "Svelte": ["svelte"],
+    "Node.js": ["node", "node.js", "nodejs"],
+    "Express": ["express", "express.js"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi"],
+    "Spring": ["spring", "spring boot"],
+    ".NET": [".net", "dotnet", "asp.net"],
+    "Ruby on Rails": ["rails", "ruby on rails"],
+    "Tailwind CSS": ["tailwind", "tailwindcss"],
+    "Redux": ["redux"],
+    "GraphQL": ["graphql"],
+    "REST APIs": ["rest", "rest api", "rest apis", "restful"],
+    "gRPC": ["grpc"],
+    # Data and ML
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "scikit-learn": ["scikit-learn", "sklearn"],
+    "TensorFlow": ["tensorflow"],
+    "PyTorch": ["pytorch"],
+    "Keras": ["keras"],
+    "Machine Learning": ["machine learning", "ml"],
+    "Deep Learning": ["deep learning"],
+    "NLP": ["nlp", "natural language processing"],
+    "Computer Vision": ["computer vision", "opencv"],
+    "Data Analysis": ["data analysis", "data analytics"],
+    "Spark": ["spark", "pyspark", "apache spark"],
+    "Hadoop": ["hadoop"],
+    "Airflow": ["airflow"],
+    "Tableau": ["tableau"],
+    "Power BI": ["power bi", "powerbi"],
+    "Excel": ["excel"],
+    # Databases
+    "PostgreSQL": ["postgresql", "postgres"],
+    "MySQL": ["mysql"],
+    "SQLite": ["sqlite"],
+    "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"],
+    "Elasticsearch": ["elasticsearch"],
+    "DynamoDB": ["dynamodb"],
+    "Firebase": ["firebase"],
+    "Supabase": ["supabase"],
+    # Cloud and DevOps
+    "AWS": ["aws", "amazon web services"],
+    "Azure": ["azure"],
+    "GCP": ["gcp", "google cloud"],
+    "Docker": ["docker"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "Terraform": ["terraform"],
+    "Ansible": ["ansible"],
+    "CI/CD": ["ci/cd", "continuous integration"],
+    "Jenkins": ["jenkins"],
+    "GitHub Actions": ["github actions"],
+    "Git": ["git"],
+    "Linux": ["linux", "unix"],
+    "Nginx": ["nginx"],
+    "Kafka": ["kafka"],
+    "RabbitMQ": ["rabbitmq"],
+    "Celery": ["celery"],
+    "Microservices": ["microservices"],
+    # Practices and tools
+    "Agile": ["agile", "scrum"],
+    "Jira": ["jira"],
+    "Figma": ["figma"],
+    "Unit Testing": ["unit testing", "pytest", "jest", "junit"],
+    "System Design": ["system design"],
+    "Data Structures": ["data structures", "algorithms"],
+    # Soft skills
+    "Leadership": ["leadership"],
+    "Communication": ["communication"],
+    "Teamwork": ["teamwork", "collaboration"],
+    "Problem Solving": ["problem solving", "problem-solving"],
+    "Project Management": ["project management"],
+}
+
+# Aliases that are also common English words / letters only count inside the Skills section
+_AMBIGUOUS_ALIASES = {"c", "r", "go", "rest", "spring", "express", "swift", "rust", "ml", "ts", "js", "node", "git", "excel", "communication", "leadership", "teamwork", "collaboration", "agile"}
+
+SECTION_HEADINGS = {
+    "experience": ["experience", "work experience", "professional experience", "employment", "employment history", "work history", "career history", "internships", "internship experience"],
+    "skills": ["skills", "technical skills", "core skills", "key skills", "skills & tools", "technologies", "tech stack", "core competencies", "tools"],
+    "education": ["education", "academic background", "qualifications"],
+    "projects": ["projects", "personal projects", "academic projects", "key projects"],
+    "summary": ["summary", "profile", "professional summary", "about me", "objective", "career objective"],
+    "other": ["certifications", "certificates", "awards", "achievements", "publications", "languages", "interests", "hobbies", "references", "volunteering", "activities"],
+}
+
+_MONTHS = {m: i for i, m in enumerate(["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+_DATE = r"(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+\d{4}|\d{1,2}/\d{4}|\d{4})"
+_PRESENT = r"(?:present|current|now|today|ongoing)"
+DATE_RANGE_RE = re.compile(rf"(?P<start>{_DATE})\s*(?:-|–|—|to|until)\s*(?P<end>{_DATE}|{_PRESENT})", re.IGNORECASE)
+_BULLET_RE = re.compile(r"^[\s•·▪◦●\-\*–]+")
+_EMAIL_PHONE_RE = re.compile(r"@|\d{3}[\s\-.]?\d{3}[\s\-.]?\d{4}|https?://|www\.|linkedin|github", re.IGNORECASE)
+
+_heading_lookup = {alias: section for section, aliases in SECTION_HEADINGS.items() for alias in aliases}
+_alias_lookup = {alias.lower(): canonical for canonical, aliases in SKILL_TAXONOMY.items() for alias in aliases}
+# Longest aliases first so "machine learning" wins over "ml", "react.js" over "react"
+_SKILL_RE = re.compile(
+    r"(?<![\w+#.])(" + "|".join(re.escape(alias) for alias in sorted(_alias_lookup, key=len, reverse=True)) + r")(?![\w+#]|\.\w)",
+    re.IGNORECASE,
+)
+
+_nlp = None
+_nlp_loaded = False
+
+
+def _get_nlp():
+    """spaCy's small English model if installed; loaded once on first use."""
+    global _nlp, _nlp_loaded
+    if not _nlp_loaded:
+        _nlp_loaded = True
+        try:
+            import spacy
+            _nlp = spacy.load("en_core_web_sm", disable=["parser", "lemmatizer"])
+        except Exception as e: # ImportError, or the model isn't downloaded
+            logger.info(f"[LocalResumeParser] spaCy model unavailable ({e}); using heuristic name detection.")
+            _nlp = None
+    return _nlp
+
+
+def _heading_for(line: str) -> Optional[str]:
+    candidate = line.strip().strip(":").strip().lower()
+    if not candidate or len(candidate) > 40:
+        return None
+    return _heading_lookup.get(candidate)
+
+
+def split_sections(text: str) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Return (header lines before the first heading, {section: lines})."""
+    header: List[str] = []
+    sections: Dict[str, List[str]] = {}
+    current = None
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        section = _heading_for(line)
+        if section:
+            current = section
+            sections.setdefault(section, [])
+            continue
+        if current is None:
+            header.append(line)
+        else:
+            sections[current].append(line)
+    return header, sections
+
+
+def match_skills(text: str, allow_ambiguous: bool) -> List[str]:
+    found = []
+    for match in _SKILL_RE.finditer(text):
+        alias = match.group(1).lower()
+        if alias in _AMBIGUOUS_ALIASES and not allow_ambiguous:
+            continue
+        # Single-letter languages only as list items ("C, C++" not "Plan C")
+        if len(alias) == 1 and match.group(1) != match.group(1).upper():
+            continue
+        canonical = _alias_lookup[alias]
+        if canonical not in found:
+            found.append(canonical)
+    return found
+
+
+def _looks_like_name(line: str) -> bool:
+    words = line.replace(",", " ").split()
+    if not 2 <= len(words) <= 4 or _EMAIL_PHONE_RE.search(line) or any(ch.isdigit() for ch in line):
+        return False
+    return all(word[0].isupper() and word.replace("-", "").replace("'", "").replace(".", "").isalpha() for word in words)
+
+
+def _find_name(header: List[str], text: str) -> str:
+    nlp = _get_nlp()
+    if nlp is not None:
+        top = "\n".join(header[:5] or text.splitlines()[:5])
+        for ent in nlp(top).ents:
+            if ent.label_ == "PERSON" and _looks_like_name(ent.text):
+                return ent.text.strip()
+    for line in (header or text.splitlines())[:8]:
+        if _looks_like_name(line.strip()):
+            return line.strip()
+    return ""
+
+
+def _to_iso(value: str) -> str:
+    value = value.strip().lower().rstrip(".")
+    if re.fullmatch(_PRESENT, value):
+        return "Present"
+    match = re.fullmatch(r"([a-z]+)\.?\s+(\d{4})", value)
+    if match and match.group(1)[:3] in _MONTHS:
+        return f"{match.group(2)}-{_MONTHS[match.group(1)[:3]]:02d}-01"
+    match = re.fullmatch(r"(\d{1,2})/(\d{4})", value)
+    if match and 1 <= int(match.group(1)) <= 12:
+        return f"{match.group(2)}-{int(match.group(1)):02d}-01"
+    if re.fullmatch(r"\d{4}", value):
+        return f"{value}-01-01"
+    return ""
+
+
+def _split_title_company(text: str) -> Tuple[str, str]:
+    text = text.strip(" ,|-–—:")
+    for separator in (" at ", " @ ", " | ", " – ", " — ", " - ", ", "):
+        if separator in text:
+            title, company = text.split(separator, 1)
+            return title.strip(" ,|-–—"), company.strip(" ,|-–—")
+    return text, ""
+
+
+def extract_experiences(lines: List[str]) -> List[Dict[str, Any]]:
+    experiences: List[Dict[str, Any]] = []
+    previous_line = ""
+    current: Optional[Dict[str, Any]] = None
+    for line in lines:
+        match = DATE_RANGE_RE.search(line)
+        if match:
+            if current:
+                experiences.append(current)
+            remainder = (line[:match.start()] + " " + line[match.end():]).strip(" ,|-–—()")
+            heading = remainder
+            # Date on its own line: the title/company line came just before it,
+            # so take it back from the previous entry's description
+            if len(remainder) < 3 and previous_line:
+                heading = previous_line
+                if experiences:
+                    previous_bullet = _BULLET_RE.sub("", previous_line).strip()
+                    description = experiences[-1]["description"]
+                    if description.endswith(previous_bullet):
+                        experiences[-1]["description"] = description[:-len(previous_bullet)].strip()
+            title, company = _split_title_company(_BULLET_RE.sub("", heading))
+            current = {
+                "title": title,
+                "company": company,
+                "location": "",
+                "start_date": _to_iso(match.group("start")),
+                "end_date": _to_iso(match.group("end")),
+                "description": "",
+            }
+        elif current is not None:
+            bullet = _BULLET_RE.sub("", line).strip()
+            current["description"] = f"{current['description']} {bullet}".strip()
+        previous_line = line
+    if current:
+        experiences.append(current)
+    for experience in experiences:
+        experience["description"] = experience["description"][:1000]
+    return experiences
+
+
+def parse_resume_text(text: str) -> Dict[str, Any]:
+    """Parse resume text into the extraction JSON shape. Deterministic; never raises on odd input."""
+    header, sections = split_sections(text)
+    skills = match_skills("\n".join(sections.get("skills", [])), allow_ambiguous=True)
+    for skill in match_skills(text, allow_ambiguous=False):
+        if skill not in skills:
+            skills.append(skill)
+    experience_lines = sections.get("experience")
+    if experience_lines is None:
+        # No recognisable heading: look for dated entries anywhere outside education
+        experience_lines = [line for section, lines in sections.items() if section != "education" for line in lines] or header
+    return {
+        "full_name": _find_name(header, text),
+        "skills": skills,
+        "experiences": extract_experiences(experience_lines),
+    }
@@ -0,0 +1,299 @@
+"""
+Opt-in profiling of scrape runs, match runs and single API requests.
+
+An admin arms a target ("scrape", "match" or "request") through
+/api/admin/profiling; the next run(s) of that target are then profiled and
+their reports written to PROFILING_DIR/<run_id>/:
+
+  - profile.txt / profile.pstats  cProfile, sorted by cumulative time
+                                  (mode "cprofile", the default)
+  - stacks.txt                    collapsed stacks from a wall-clock sampler
+                                  over every thread, flamegraph.pl-compatible
+                                  (mode "sampling"; cheaper, sees threads)
+  - memory.txt                    tracemalloc: top allocation sites grown
+                                  during the run (unless memory=False)
+  - meta.json                     target, label, timings, options
+
+Arming is a file under PROFILING_DIR/armed/, so a run is picked up by
+whichever process executes it next (API or run_task_worker.py), and claiming
+it is an atomic rename, so each armed run is profiled exactly once. Only one
+run per process is profiled at a time; cProfile sees everything the event loop
+runs in the meantime, which is worth keeping in mind when reading the report.
+"""
+
+import cProfile
+import functools
+import inspect
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TARGETS = ("scrape", "match", "request")
+MODES = ("cprofile", "sampling")
+
+# One profiled run at a time per process (cProfile can't nest, and tracemalloc is global)
+_active = threading.Lock()
+# Cheap existence check for the per-request hook; re-stat the armed file at most this often
+_ARMED_CHECK_INTERVAL = 1.0
+_armed_checked: Dict[str, float] = {}
+_armed_cached: Dict[str, bool] = {}
+
+
+def _armed_dir() -> str:
+    return os.path.join(settings.PROFILING_DIR, "armed")
+
+
+def _armed_path(target: str) -> str:
+    return os.path.join(_armed_dir(), f"{target}.json")
+
+
+def arm(target: str, runs: int = 1, mode: str = "cprofile", memory: bool = True, match: Optional[str] = None) -> Dict[str, Any]:
+    """Profile the next `runs` runs of `target`. `match` filters by label (user id, path prefix, ...)."""
+    if target not in TARGETS:
+        raise ValueError(f"Unknown profiling target {target!r}; expected one of {TARGETS}")
+    if mode not in MODES:
+        raise ValueError(f"Unknown profiling mode {mode!r}; expected one of {MODES}")
+    options = {"target": target, "runs": max(1, runs), "mode": mode, "memory": memory, "match": match,
+               "armed_at": datetime.now(timezone.utc).isoformat()}
+    os.makedirs(_armed_dir(), exist_ok=True)
+    _write_json(_armed_path(target), options)
+    _armed_checked.pop(target, None)
+    return options
+
+
+def disarm(target: Optional[str] = None):
+    for name in [target] if target else TARGETS:
+        try:
+            os.remove(_armed_path(name))
+        except FileNotFoundError:
+            pass
+        _armed_checked.pop(name, None)
+
+
+def armed() -> List[Dict[str, Any]]:
+    result = []
+    for target in TARGETS:
+        try:
+            with open(_armed_path(target), "r", encoding="utf-8") as f:
+                result.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return result
+
+
+def _maybe_armed(target: str) -> bool:
+    now = time.monotonic()
+    if now - _armed_checked.get(target, 0.0) > _ARMED_CHECK_INTERVAL:
+        _armed_cached[target] = os.path.exists(_armed_path(target))
+        _armed_checked[target] = now
+    return _armed_cached.get(target, False)
+
+
+def _claim(target: str, label: str) -> Optional[Dict[str, Any]]:
+    """Take one armed run for `target` if its filter matches `label`. Atomic across processes."""
+    if not _maybe_armed(target):
+        return None
+    path = _armed_path(target)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            options = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if options.get("match") and not label.startswith(options["match"]):
+        return None
+    claimed = f"{path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.claimed"
+    try:
+        os.replace(path, claimed)
+    except FileNotFoundError:
+        return None # Another process claimed it first
+    os.remove(claimed)
+    if options["runs"] > 1:
+        _write_json(path, {**options, "runs": options["runs"] - 1})
+    else:
+        _armed_cached[target] = False
+    return options
+
+
+def _write_json(path: str, data: Dict[str, Any]):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+class StackSampler:
+    """Wall-clock sampler: records every thread's stack each `interval` seconds."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+
+def _memory_report(before, after, limit: int = 40) -> str:
+    out = io.StringIO()
+    current, peak = tracemalloc.get_traced_memory()
+    out.write(f"Traced memory at end: {current / 1e6:.1f} MB, peak during run: {peak / 1e6:.1f} MB\n\n")
+    out.write(f"Top {limit} allocation sites by growth during the run:\n")
+    for stat in after.compare_to(before, "traceback")[:limit]:
+        out.write(f"\n{stat.size_diff / 1024:+.1f} KiB ({stat.count_diff:+d} blocks), now {stat.size / 1024:.1f} KiB\n")
+        for line in stat.traceback.format()[-8:]:
+            out.write(f"    {line}\n")
+    return out.getvalue()
+
+
+@asynccontextmanager
+async def profile_run(target: str, label: str = ""):
+    """Profile the enclosed block if `target` is armed (and nothing else is being profiled here)."""
+    if not _maybe_armed(target) or not _active.acquire(blocking=False):
+        yield None
+        return
+    options = _claim(target, label)
+    if options is None:
+        _active.release()
+        yield None
+        return
+
+    run_id = f"{target}-{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+    run_dir = os.path.join(settings.PROFILING_DIR, run_id)
+    os.makedirs(run_dir, exist_ok=True)
+    logger.warning(f"[Profiling] Profiling {target} run {label!r} as {run_id} ({options['mode']}).")
+
+    started_tracing = False
+    snapshot_before = None
+    if options.get("memory"):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(settings.PROFILING_TRACEMALLOC_FRAMES)
+            started_tracing = True
+        tracemalloc.reset_peak()
+        snapshot_before = tracemalloc.take_snapshot()
+
+    profiler = sampler = None
+    if options["mode"] == "sampling":
+        sampler = StackSampler()
+        sampler.start()
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    started_at = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    error = None
+    try:
+        yield run_id
+    except BaseException as e:
+        error = repr(e)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        try:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(os.path.join(run_dir, "profile.pstats"))
+                report = io.StringIO()
+                pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(80)
+                with open(os.path.join(run_dir, "profile.txt"), "w", encoding="utf-8") as f:
+                    f.write(report.getvalue())
+            if sampler is not None:
+                sampler.stop()
+                with open(os.path.join(run_dir, "stacks.txt"), "w", encoding="utf-8") as f:
+                    f.write(sampler.collapsed())
+            if snapshot_before is not None:
+                with open(os.path.join(run_dir, "memory.txt"), "w", encoding="utf-8") as f:
+                    f.write(_memory_report(snapshot_before, tracemalloc.take_snapshot()))
+                if started_tracing:
+                    tracemalloc.stop()
+            _write_json(os.path.join(run_dir, "meta.json"), {
+                "run_id": run_id, "target": target, "label": label, "options": options, "pid": os.getpid(),
+                "started_at": started_at.isoformat(), "duration_seconds": elapsed, "error": error,
+                "samples": sampler.samples if sampler else None,
+            })
+            logger.warning(f"[Profiling] {run_id} finished in {elapsed:.2f}s; reports in {run_dir}")
+        except Exception as e:
+            logger.error(f"[Profiling] Failed to write reports for {run_id}: {e}", exc_info=True)
+        finally:
+            _active.release()
+
+
+def profiled(target: str, label_kwarg: Optional[str] = None):
+    """Decorator for async functions: profile calls when `target` is armed, labelled by a kwarg."""
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            label = ""
+            if label_kwarg:
+                bound = signature.bind_partial(*args, **kwargs).arguments
+                label = str(bound.get(label_kwarg) or bound.get("kwargs", {}).get(label_kwarg) or "")
+            async with profile_run(target, label):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def list_runs() -> List[Dict[str, Any]]:
+    runs = []
+    directory = settings.PROFILING_DIR
+    for name in sorted(os.listdir(directory), reverse=True) if os.path.isdir(directory) else []:
+        meta_path = os.path.join(directory, name, "meta.json")
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        meta["files"] = sorted(os.listdir(os.path.join(directory, name)))
+        runs.append(meta)
+    return runs
+
+
+def report_path(run_id: str, filename: str) -> Optional[str]:
+    """Path of a report file, or None if it doesn't exist (names are validated against traversal)."""
+    if os.path.basename(run_id) != run_id or os.path.basename(filename) != filename or run_id == "armed":
+        return None
+    path = os.path.join(settings.PROFILING_DIR, run_id, filename)
+    return path if os.path.isfile(path) else None
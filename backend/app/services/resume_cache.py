@@ -0,0 +1,104 @@
+"""
+Content-addressed cache of resume parse results.
+
+Keyed by SHA-256 of the uploaded file bytes plus the extraction prompt and
+model name, so re-uploading the same file skips both text extraction and the
+Gemini call, while any change to the prompt or model naturally misses. Entries
+are JSON files under RESUME_CACHE_DIR; the least recently used are evicted
+beyond RESUME_CACHE_MAX_ENTRIES and entries expire after RESUME_CACHE_TTL_DAYS.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import register_cache
+
+logger = logging.getLogger(__name__)
+
+
+class ResumeParseCache:
+    def __init__(self, directory: str, max_entries: int, ttl_seconds: float):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    @staticmethod
+    def key_for(file_bytes: bytes, prompt: str, model_name: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(hashlib.sha256(prompt.encode("utf-8")).digest())
+        digest.update(model_name.encode("utf-8") + b"\0")
+        digest.update(file_bytes)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        data = await asyncio.to_thread(self._read, key)
+        self.stats["hits" if data is not None else "misses"] += 1
+        return data
+
+    async def set(self, key: str, data: Dict[str, Any]):
+        try:
+            await asyncio.to_thread(self._write, key, data)
+            self.stats["writes"] += 1
+        except OSError as e:
+            logger.warning(f"[ResumeCache] Failed to store entry {key[:12]}: {e}")
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                os.remove(path)
+                self.stats["evictions"] += 1
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            os.utime(path) # Mark as recently used
+            return data
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, key: str, data: Dict[str, Any]):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                path = os.path.join(self.directory, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        entries.sort()
+        now = time.time()
+        excess = len(entries) - self.max_entries
+        for index, (mtime, path) in enumerate(entries):
+            if index >= excess and now - mtime <= self.ttl_seconds:
+                continue
+            try:
+                os.remove(path)
+                self.stats["evictions"] += 1
+            except OSError:
+                pass
+
+
+resume_parse_cache = ResumeParseCache(
+    settings.RESUME_CACHE_DIR,
+    max_entries=settings.RESUME_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESUME_CACHE_TTL_DAYS * 86400,
+)
+register_cache("resume_parse", lambda: (resume_parse_cache.stats["hits"], resume_parse_cache.stats["misses"]))
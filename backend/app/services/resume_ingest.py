@@ -0,0 +1,376 @@
+"""
+Bulk resume ingestion (e.g. onboarding a cohort of users at once).
+
+Builds on the parse_resume pipeline (content-hash cache, pooled text
+extraction, the same prompt and JSON normalisation) but is tuned for many
+files:
+
+  - resumes are read lazily and processed concurrently, with a bounded number
+    in flight, so memory doesn't grow with the cohort; text extraction runs in
+    the extraction process pool,
+  - LLM calls are bounded by a concurrency limit and a token bucket
+    (requests per minute), and retried with exponential backoff and jitter,
+  - parsed profiles are written in batches: one statement each to update
+    names, clear and insert skills and experiences. Only profiles that already
+    exist are written (a profile row needs its auth user); the rest are
+    reported as unknown_profile. If a batch fails, its rows are retried one
+    savepoint each so a bad row only fails itself,
+  - a report with throughput and a failure breakdown by reason is returned.
+
+Driven by ingest_resumes.py. Pass `generate=StubLLM()` to run without Gemini.
+"""
+
+import asyncio
+import csv
+import json
+import logging
+import os
+import random
+import re
+import tarfile
+import time
+import uuid
+import zipfile
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select, update
+
+from app.core.cache import response_cache
+from app.db.database import AsyncSessionLocal
+from app.db.models import Profile, Skill, Experience
+from app.services.resume_cache import resume_parse_cache
+from app.services.resume_parser import (
+    EXTRACTION_PROMPT_TEMPLATE,
+    GEMINI_MODEL_NAME,
+    LLMGenerate,
+    ResumeExtractionError,
+    build_profile_rows,
+    extract_resume_data,
+    generate_with_gemini,
+)
+from app.services.tasks import schedule_rematch
+
+logger = logging.getLogger(__name__)
+
+RESUME_EXTENSIONS = ("pdf", "docx")
+
+
+@dataclass
+class ResumeFile:
+    source: str # Path (or archive member) the resume came from
+    file_bytes: bytes
+    ext: str
+    profile_id: Optional[uuid.UUID] = None
+
+
+@dataclass
+class IngestReport:
+    total: int = 0
+    succeeded: int = 0
+    cache_hits: int = 0
+    llm_calls: int = 0
+    llm_retries: int = 0
+    failures: Counter = field(default_factory=Counter)
+    failed_sources: List[Tuple[str, str]] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def fail(self, source: str, reason: str):
+        self.failures[reason] += 1
+        self.failed_sources.append((source, reason))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": sum(self.failures.values()),
+            "failures": dict(self.failures),
+            "cache_hits": self.cache_hits,
+            "llm_calls": self.llm_calls,
+            "llm_retries": self.llm_retries,
+            "seconds": round(self.seconds, 2),
+            "resumes_per_sec": round(self.total / self.seconds, 2) if self.seconds else 0.0,
+        }
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per `per` seconds, with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, per: float = 60.0, capacity: Optional[float] = None):
+        self.fill_rate = rate / per
+        self.capacity = capacity or max(1.0, rate / 10)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.fill_rate)
+
+
+class StubLLM:
+    """
+    Offline stand-in for Gemini: answers the extraction prompt with JSON built
+    from the resume text (first line as the name, a "Skills:" line split on
+    commas), after an optional simulated latency. Fails `failure_rate` of calls.
+    """
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+
+    async def __call__(self, payload_content: List[Any]) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise RuntimeError("Stub LLM simulated failure")
+        prompt = payload_content[-1]
+        text = prompt.split("Resume Text (if provided):", 1)[-1]
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        skills = []
+        for line in lines:
+            match = re.match(r"(?i)^(technical\s+)?skills\s*[:\-]\s*(.+)$", line)
+            if match:
+                skills.extend(s.strip() for s in re.split(r"[,;|•]", match.group(2)) if s.strip())
+        return json.dumps({"full_name": lines[0] if lines else "", "skills": skills, "experiences": []})
+
+
+def rate_limited(generate: LLMGenerate, bucket: TokenBucket, concurrency: int, max_retries: int, report: IngestReport) -> LLMGenerate:
+    """Wrap an LLM call with a concurrency limit, the token bucket and retry with exponential backoff."""
+    slots = asyncio.Semaphore(concurrency)
+
+    async def call(payload_content: List[Any]) -> str:
+        for attempt in range(max_retries + 1):
+            async with slots:
+                await bucket.acquire()
+                report.llm_calls += 1
+                try:
+                    return await generate(payload_content)
+                except ResumeExtractionError:
+                    raise
+                except Exception as e:
+                    if attempt == max_retries:
+                        raise
+                    delay = min(30.0, 2 ** attempt) * (0.5 + random.random())
+                    logger.warning(f"[Ingest] LLM call failed ({e}); retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+                    report.llm_retries += 1
+            await asyncio.sleep(delay)
+
+    return call
+
+
+def load_manifest(path: str) -> Dict[str, uuid.UUID]:
+    """CSV with `file` and `profile_id` columns mapping resume file names to profiles."""
+    mapping = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            mapping[os.path.basename(row["file"].strip())] = uuid.UUID(row["profile_id"].strip())
+    return mapping
+
+
+def iter_resume_files(path: str) -> Iterator[Tuple[str, bytes]]:
+    """Yield (name, bytes) for each resume in a directory, .zip or .tar(.gz) archive, reading one file per step."""
+    def wanted(name: str) -> bool:
+        return name.rsplit(".", 1)[-1].lower() in RESUME_EXTENSIONS and not os.path.basename(name).startswith(".")
+
+    if os.path.isdir(path):
+        for root, _dirs, names in os.walk(path):
+            for name in sorted(names):
+                if wanted(name):
+                    with open(os.path.join(root, name), "rb") as f:
+                        yield os.path.join(root, name), f.read()
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and wanted(info.filename):
+                    yield info.filename, archive.read(info)
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path) as archive:
+            for member in archive:
+                if member.isfile() and wanted(member.name):
+                    yield member.name, archive.extractfile(member).read()
+    else:
+        raise ValueError(f"{path} is not a directory or a supported archive (.zip, .tar, .tar.gz)")
+
+
+def collect_resumes(path: str, manifest: Optional[Dict[str, uuid.UUID]], report: IngestReport) -> Iterator[ResumeFile]:
+    """Lazily load resumes and resolve their profile ids (manifest entry, else a UUID file name)."""
+    for source, file_bytes in iter_resume_files(path):
+        report.total += 1
+        name = os.path.basename(source)
+        stem, ext = name.rsplit(".", 1)
+        profile_id = manifest.get(name) if manifest else None
+        if profile_id is None:
+            try:
+                profile_id = uuid.UUID(stem)
+            except ValueError:
+                report.fail(source, "unmapped_profile")
+                continue
+        yield ResumeFile(source=source, file_bytes=file_bytes, ext=ext.lower(), profile_id=profile_id)
+
+
+async def _parse_one(resume: ResumeFile, generate: LLMGenerate, use_cache: bool, report: IngestReport) -> Optional[Dict[str, Any]]:
+    cache_key = resume_parse_cache.key_for(resume.file_bytes, EXTRACTION_PROMPT_TEMPLATE, GEMINI_MODEL_NAME)
+    if use_cache:
+        cached = await resume_parse_cache.get(cache_key)
+        if cached is not None:
+            report.cache_hits += 1
+            return cached
+    try:
+        extracted_data = await extract_resume_data(resume.file_bytes, resume.ext, generate=generate)
+    except ResumeExtractionError as e:
+        logger.warning(f"[Ingest] {resume.source}: {e}")
+        report.fail(resume.source, e.reason)
+        return None
+    except Exception as e:
+        logger.error(f"[Ingest] {resume.source}: unexpected error: {e}", exc_info=True)
+        report.fail(resume.source, "error")
+        return None
+    if use_cache:
+        await resume_parse_cache.set(cache_key, extracted_data)
+    return extracted_data
+
+
+async def _write_rows(db, batch: List[Tuple[ResumeFile, Dict[str, Any]]]):
+    """Replace names, skills and experiences of `batch` with a handful of multi-row statements."""
+    profile_ids, names, skill_rows, experience_rows = [], [], [], []
+    for resume, extracted_data in batch:
+        name, skills, experiences = build_profile_rows(resume.profile_id, extracted_data)
+        profile_ids.append(resume.profile_id)
+        if name:
+            names.append({"id": resume.profile_id, "first_name": name[0], "last_name": name[1]})
+        skill_rows.extend(skills)
+        experience_rows.extend(experiences)
+
+    if names:
+        # ORM bulk UPDATE by primary key (executemany)
+        await db.execute(update(Profile), names)
+    await db.execute(delete(Skill).where(Skill.profile_id.in_(profile_ids)))
+    await db.execute(delete(Experience).where(Experience.profile_id.in_(profile_ids)))
+    if skill_rows:
+        await db.execute(insert(Skill), skill_rows)
+    if experience_rows:
+        await db.execute(insert(Experience), experience_rows)
+
+
+async def _write_batch(batch: List[Tuple[ResumeFile, Dict[str, Any]]], report: IngestReport):
+    """
+    Write a batch of parsed resumes to their existing profiles. The whole batch
+    goes in one savepoint; if that fails, each row is retried in its own
+    savepoint and only the rows that still fail are reported as db_error.
+    """
+    written: List[ResumeFile] = []
+    rejected = set() # sources already reported as failed
+    try:
+        async with AsyncSessionLocal() as db:
+            requested = [resume.profile_id for resume, _ in batch]
+            existing = set((await db.execute(select(Profile.id).where(Profile.id.in_(requested)))).scalars())
+            rows = []
+            for resume, extracted_data in batch:
+                if resume.profile_id in existing:
+                    rows.append((resume, extracted_data))
+                else:
+                    rejected.add(resume.source)
+                    report.fail(resume.source, "unknown_profile")
+
+            if rows:
+                try:
+                    async with db.begin_nested():
+                        await _write_rows(db, rows)
+                    written = [resume for resume, _ in rows]
+                except Exception as e:
+                    logger.warning(f"[Ingest] Batch of {len(rows)} profiles failed ({e}); retrying row by row")
+                    for row in rows:
+                        try:
+                            async with db.begin_nested():
+                                await _write_rows(db, [row])
+                            written.append(row[0])
+                        except Exception as row_error:
+                            logger.error(f"[Ingest] {row[0].source}: failed to write profile {row[0].profile_id}: {row_error}")
+                            rejected.add(row[0].source)
+                            report.fail(row[0].source, "db_error")
+            await db.commit()
+    except Exception as e:
+        logger.error(f"[Ingest] Failed to write a batch of {len(batch)} profiles: {e}", exc_info=True)
+        for resume, _ in batch:
+            if resume.source not in rejected:
+                report.fail(resume.source, "db_error")
+        return
+
+    report.succeeded += len(written)
+    for resume in written:
+        await response_cache.invalidate_user(resume.profile_id)
+        await schedule_rematch(resume.profile_id)
+
+
+async def ingest_resumes(
+    resumes: Iterable[ResumeFile],
+    report: IngestReport,
+    generate: Optional[LLMGenerate] = None,
+    concurrency: int = 4,
+    requests_per_minute: float = 60,
+    max_retries: int = 3,
+    batch_size: int = 50,
+    use_cache: bool = True,
+) -> IngestReport:
+    """Parse and store `resumes`, filling in `report`. The iterable is consumed only as fast as resumes are parsed."""
+    started = time.perf_counter()
+    limited = rate_limited(generate or generate_with_gemini, TokenBucket(requests_per_minute), concurrency, max_retries, report)
+    # More resumes in flight than LLM slots, so text extraction overlaps LLM calls
+    in_flight = asyncio.Semaphore(concurrency * 2)
+    parsed: "asyncio.Queue[Optional[Tuple[ResumeFile, Dict[str, Any]]]]" = asyncio.Queue()
+
+    async def parse(resume: ResumeFile):
+        try:
+            extracted_data = await _parse_one(resume, limited, use_cache, report)
+        finally:
+            in_flight.release()
+        # Writing only needs the source and profile id; don't hold the file until its batch is written
+        resume.file_bytes = b""
+        if extracted_data is not None:
+            await parsed.put((resume, extracted_data))
+
+    async def writer():
+        # Keyed by profile so a profile appearing twice in a batch is written once (last wins)
+        batch: Dict[uuid.UUID, Tuple[ResumeFile, Dict[str, Any]]] = {}
+        while True:
+            item = await parsed.get()
+            if item is not None:
+                resume, _ = item
+                if resume.profile_id in batch:
+                    report.fail(batch[resume.profile_id][0].source, "duplicate_profile")
+                batch[resume.profile_id] = item
+            if batch and (item is None or len(batch) >= batch_size):
+                await _write_batch(list(batch.values()), report)
+                elapsed = time.perf_counter() - started
+                logger.info(f"[Ingest] {report.succeeded}/{report.total} resumes stored ({report.succeeded / elapsed:.1f}/s)")
+                batch = {}
+            if item is None:
+                return
+
+    writer_task = asyncio.create_task(writer())
+    parsing = set()
+    pending = iter(resumes)
+    while True:
+        # Read the next file only once a slot is free
+        await in_flight.acquire()
+        resume = next(pending, None)
+        if resume is None:
+            in_flight.release()
+            break
+        task = asyncio.create_task(parse(resume))
+        parsing.add(task)
+        task.add_done_callback(parsing.discard)
+    await asyncio.gather(*parsing)
+    await parsed.put(None)
+    await writer_task
+    report.seconds = time.perf_counter() - started
+    return report
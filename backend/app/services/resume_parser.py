@@ -1,33 +1,47 @@
 import os
-import io
 import json
 import asyncio
 import logging
+import time
 from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
-from sqlalchemy.orm import Session
-import google.generativeai as genai
+from sqlalchemy import select, delete, insert
 
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.metrics import RESUME_STAGE_SECONDS
 from app.db.models import Profile, Skill, Experience
+from app.services.local_resume_parser import parse_resume_text
+from app.services.resume_cache import resume_parse_cache
+from app.services.tasks import schedule_rematch
+from app.services.text_extraction import extract_resume_text
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
 
 # --- Gemini API Configuration ---
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_MODEL_NAME = "gemini-2.5-flash"
 
-if not GEMINI_API_KEY:
-    logger.error("GEMINI_API_KEY is not set. Resume parsing will not work.")
-    gemini_model = None
-else:
-    try:
-        genai.configure(api_key=GEMINI_API_KEY)
-        gemini_model = genai.GenerativeModel(GEMINI_MODEL_NAME)
-        logger.info(f"Gemini model '{GEMINI_MODEL_NAME}' configured successfully.")
-    except Exception as e:
-        logger.error(f"Error configuring Gemini model: {e}")
-        gemini_model = None
+_gemini: Dict[str, Any] = {"configured": False, "model": None}
+
+
+def get_gemini_model():
+    """The Gemini model, configured on first use (google.generativeai is slow to import). None if unavailable."""
+    if not _gemini["configured"]:
+        _gemini["configured"] = True
+        if not GEMINI_API_KEY:
+            logger.error("GEMINI_API_KEY is not set. Resume parsing will not work.")
+        else:
+            try:
+                import google.generativeai as genai
+
+                genai.configure(api_key=GEMINI_API_KEY)
+                _gemini["model"] = genai.GenerativeModel(GEMINI_MODEL_NAME)
+                logger.info(f"Gemini model '{GEMINI_MODEL_NAME}' configured successfully.")
+            except Exception as e:
+                logger.error(f"Error configuring Gemini model: {e}")
+    return _gemini["model"]
 
 # Extraction prompt — Gemini receives raw extracted text and returns structured JSON
 EXTRACTION_PROMPT_TEMPLATE = """
@@ -58,54 +72,205 @@ Resume Text (if provided):
 """
 
 
-def _extract_text_from_pdf(file_bytes: bytes) -> str:
+class ResumeExtractionError(Exception):
+    """A resume could not be turned into structured data. `reason` is a short failure category."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+# Async callable taking Gemini-style content parts and returning the response text.
+# Gemini by default; batch ingestion wraps it with rate limiting or swaps in a stub.
+LLMGenerate = Callable[[List[Any]], Awaitable[str]]
+
+
+async def generate_with_gemini(payload_content: List[Any]) -> str:
+    gemini_model = get_gemini_model()
+    if not gemini_model:
+        raise ResumeExtractionError("llm_unavailable", "Gemini model not configured.")
+    gemini_response = await gemini_model.generate_content_async(payload_content)
+
+    # Collect response text
+    if hasattr(gemini_response, "text"):
+        return gemini_response.text.strip()
+    raw_response = ""
+    for part in gemini_response.parts:
+        if hasattr(part, "text"):
+            raw_response += part.text
+    return raw_response.strip()
+
+
+def _parse_llm_json(raw_response: str) -> Dict[str, Any]:
+    # Strip markdown fences if present despite instructions
+    if "```json" in raw_response:
+        raw_response = raw_response.split("```json")[1].split("```")[0].strip()
+    elif "```" in raw_response:
+        raw_response = raw_response.split("```")[1].split("```")[0].strip()
+
+    try:
+        extracted_data = json.loads(raw_response)
+    except json.JSONDecodeError as je:
+        logger.error(
+            f"[ResumeParser] Failed to parse JSON from Gemini response: {je}\nRaw: {raw_response[:500]}"
+        )
+        raise ResumeExtractionError("invalid_json", f"Failed to parse JSON from LLM response: {je}")
+    if not isinstance(extracted_data, dict):
+        raise ResumeExtractionError("invalid_json", "LLM response is not a JSON object.")
+    return extracted_data
+
+
+async def extract_resume_data(
+    file_bytes: bytes,
+    file_extension: str,
+    generate: Optional[LLMGenerate] = None,
+    raw_text: Optional[str] = None,
+) -> Dict[str, Any]:
     """
-    Extract raw text from a PDF using pypdf.
-    Lightweight, pure-Python, no ML models needed — Gemini handles the intelligence.
+    Extract text from the file (unless `raw_text` is already known) and have the
+    LLM turn it into structured JSON. Raises ResumeExtractionError.
     """
+    if generate is None:
+        if not get_gemini_model():
+            raise ResumeExtractionError("llm_unavailable", "Gemini model not configured. Aborting.")
+        generate = generate_with_gemini
+
+    # ── Step 1: Extract raw text based on file type ──────────────────────
+    ext = file_extension.lower()
+    if ext not in ("pdf", "docx"):
+        raise ResumeExtractionError("unsupported_type", f"Unsupported file type: .{ext}")
+    if raw_text is None:
+        # pypdf / python-docx run in a process pool so large files don't block the event loop
+        with RESUME_STAGE_SECONDS.time(stage="extract"):
+            raw_text = await extract_resume_text(file_bytes, ext)
+
+    payload_content = []
+    prompt = EXTRACTION_PROMPT_TEMPLATE.format(resume_text=raw_text)
+    
+    # If pypdf failed (e.g., image-based PDF), use Gemini Vision natively
+    if not raw_text.strip() and ext == "pdf":
+        logger.info("[ResumeParser] pypdf extracted empty string. Falling back to Gemini native PDF vision processing.")
+        payload_content = [{"mime_type": "application/pdf", "data": file_bytes}, prompt]
+    elif not raw_text.strip():
+        raise ResumeExtractionError("no_text", "No text extracted from resume. Cannot proceed.")
+    else:
+        logger.info(f"[ResumeParser] Extracted {len(raw_text)} chars. Sending text to Gemini...")
+        payload_content = [prompt]
+
+    # ── Step 2: Send to the LLM for structured extraction ────────
     try:
-        import pypdf
-
-        reader = pypdf.PdfReader(io.BytesIO(file_bytes))
-        pages_text = []
-        for i, page in enumerate(reader.pages):
-            page_text = page.extract_text() or ""
-            if page_text.strip():
-                pages_text.append(page_text)
-            logger.debug(f"[ResumeParser] PDF page {i + 1}: extracted {len(page_text)} chars")
-
-        full_text = "\n\n".join(pages_text)
-        logger.info(f"[ResumeParser] pypdf extracted {len(full_text)} chars from {len(reader.pages)} pages.")
-        return full_text
-
-    except ImportError:
-        logger.error("[ResumeParser] pypdf not installed. Add 'pypdf' to requirements.txt.")
-        return ""
-    except Exception as e:
-        logger.error(f"[ResumeParser] pypdf extraction error: {e}", exc_info=True)
-        return ""
+        raw_response = await generate(payload_content)
+    except ResumeExtractionError:
+        raise
+    except Exception as gemini_err:
+        logger.error(f"[ResumeParser] Gemini API call failed: {gemini_err}", exc_info=True)
+        raise ResumeExtractionError("llm_error", f"LLM call failed: {gemini_err}")
 
+    logger.info(f"[ResumeParser] Gemini response (first 300 chars): {raw_response[:300]}")
+    return _parse_llm_json(raw_response)
 
-def _extract_text_from_docx(file_bytes: bytes) -> str:
+
+def _parse_date(value: str, field: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        logger.warning(f"[ResumeParser] Cannot parse {field}: '{value}'")
+        return None
+
+
+def build_profile_rows(profile_id, extracted_data: Dict[str, Any]) -> Tuple[Optional[Tuple[str, Optional[str]]], List[dict], List[dict]]:
     """
-    Extract raw text from a DOCX file using python-docx.
-    Lightweight — reads paragraph text from Word XML structure.
+    Normalise parsed resume JSON into ((first_name, last_name) or None,
+    skill rows, experience rows) ready to insert for `profile_id`. Skills are
+    de-duplicated case-insensitively; malformed experiences are skipped.
     """
-    try:
-        from docx import Document
+    name = None
+    extracted_name = extracted_data.get("full_name")
+    if extracted_name and isinstance(extracted_name, str) and extracted_name.strip():
+        name_parts = extracted_name.strip().split(" ", 1)
+        name = (name_parts[0], name_parts[1] if len(name_parts) > 1 else None)
+
+    skill_rows = []
+    seen_skills = set()
+    for skill_name in extracted_data.get("skills") or []:
+        if not isinstance(skill_name, str):
+            continue
+        skill_name = skill_name.strip()
+        if skill_name and skill_name.lower() not in seen_skills:
+            seen_skills.add(skill_name.lower())
+            skill_rows.append({"profile_id": profile_id, "name": skill_name})
+
+    experience_rows = []
+    for exp_data in extracted_data.get("experiences") or []:
+        try:
+            start_str = (exp_data.get("start_date") or "").strip()
+            end_str = (exp_data.get("end_date") or "").strip()
+            parsed_start = _parse_date(start_str, "start_date") if start_str else None
+            parsed_end = None
+            if end_str and end_str.lower() not in ("present", "current", "now", ""):
+                parsed_end = _parse_date(end_str, "end_date")
+
+            experience_rows.append({
+                "profile_id": profile_id,
+                "title": str(exp_data.get("title") or "").strip() or "Unknown",
+                "company": str(exp_data.get("company") or "").strip() or "Unknown",
+                "location": exp_data.get("location") or None,
+                "start_date": parsed_start,
+                "end_date": parsed_end,
+                "description": exp_data.get("description") or None,
+            })
+        except Exception as exp_err:
+            logger.error(f"[ResumeParser] Error adding experience {exp_data}: {exp_err}", exc_info=True)
+
+    return name, skill_rows, experience_rows
+
+
+async def _save_parsed_resume(profile_id, extracted_data: Dict[str, Any]) -> bool:
+    """Replace the profile's name, skills and experiences with parsed resume data."""
+    from app.db.database import AsyncSessionLocal
+
+    name, skill_rows, experience_rows = build_profile_rows(profile_id, extracted_data)
+    logger.info(
+        f"[ResumeParser] Parsed: name='{extracted_data.get('full_name')}', "
+        f"skills={len(skill_rows)}, experiences={len(experience_rows)}"
+    )
 
-        doc = Document(io.BytesIO(file_bytes))
-        paragraphs = [para.text for para in doc.paragraphs if para.text.strip()]
-        full_text = "\n".join(paragraphs)
-        logger.info(f"[ResumeParser] python-docx extracted {len(full_text)} chars from {len(paragraphs)} paragraphs.")
-        return full_text
+    async with AsyncSessionLocal() as db:
+        try:
+            profile = (await db.execute(select(Profile).where(Profile.id == profile_id))).scalars().first()
+            if not profile:
+                logger.warning(f"[ResumeParser] Profile {profile_id} not found. Cannot save.")
+                return False
+
+            # Update name
+            if name:
+                profile.first_name, profile.last_name = name
+                logger.info(f"[ResumeParser] Name: {profile.first_name} {profile.last_name}")
+
+            # Replace skills
+            # Delete + one multi-row INSERT per table (rows are de-duplicated, so the
+            # unique (profile_id, lower(name)) skill index can't be hit)
+            await db.execute(delete(Skill).where(Skill.profile_id == profile_id))
+            if skill_rows:
+                await db.execute(insert(Skill).values(skill_rows))
+            logger.info(f"[ResumeParser] Inserted {len(skill_rows)} skills.")
+
+            # Replace experiences
+            await db.execute(delete(Experience).where(Experience.profile_id == profile_id))
+            if experience_rows:
+                await db.execute(insert(Experience).values(experience_rows))
+            logger.info(f"[ResumeParser] Inserted {len(experience_rows)} experiences.")
+
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
 
-    except ImportError:
-        logger.error("[ResumeParser] python-docx not installed. Add 'python-docx' to requirements.txt.")
-        return ""
-    except Exception as e:
-        logger.error(f"[ResumeParser] python-docx extraction error: {e}", exc_info=True)
-        return ""
+    await response_cache.invalidate_user(profile_id)
+    # Debounced, so the local pass and the LLM refinement collapse into one rematch
+    await schedule_rematch(profile_id)
+    logger.info(f"[ResumeParser] ✅ Committed all data for profile {profile_id}.")
+    return True
 
 
 async def parse_resume(file_bytes: bytes, file_extension: str, profile_id: str):
@@ -114,9 +279,15 @@ async def parse_resume(file_bytes: bytes, file_extension: str, profile_id: str):
 
     Pipeline:
       1. Receive raw file bytes + extension directly from the upload endpoint
+         (a previously parsed identical file is served from resume_parse_cache,
+         skipping steps 2-4)
       2. Extract raw text using pypdf (PDF) or python-docx (DOCX)
-      3. Send raw text to Gemini API for structured data extraction (name, skills, experiences)
-      4. Save extracted data to PostgreSQL
+      3. Fast first pass: parse the text locally (local_resume_parser) and save
+         it, so the profile fills in within milliseconds of extraction
+      4. Send raw text to Gemini API for structured data extraction (name, skills, experiences)
+         and save the refined result over the first pass
+    Step 3 runs when RESUME_LOCAL_PARSER is on; step 4 when Gemini is configured
+    and either RESUME_LLM_REFINE is on or the local pass produced nothing.
 
     Uses lightweight parsers (pypdf / python-docx) for text extraction instead of heavy
     ML-based converters, keeping the Docker image memory footprint small enough for
@@ -128,158 +299,48 @@ async def parse_resume(file_bytes: bytes, file_extension: str, profile_id: str):
     )
 
     try:
-        if not gemini_model:
-            logger.error("[ResumeParser] Gemini model not configured. Aborting.")
+        # Identical re-uploads (same bytes, prompt and model) reuse the earlier parse
+        cache_key = resume_parse_cache.key_for(file_bytes, EXTRACTION_PROMPT_TEMPLATE, GEMINI_MODEL_NAME)
+        extracted_data = await resume_parse_cache.get(cache_key)
+        if extracted_data is not None:
+            logger.info(f"[ResumeParser] Cache hit for {cache_key[:12]}; skipping extraction and Gemini call. Stats: {resume_parse_cache.stats}")
+            await _save_parsed_resume(profile_id, extracted_data)
             return
+        logger.info(f"[ResumeParser] Cache miss for {cache_key[:12]}. Stats: {resume_parse_cache.stats}")
 
-        from app.db.database import SessionLocal
-        db = SessionLocal()
-
-        # ── Step 1: Extract raw text based on file type ──────────────────────
         ext = file_extension.lower()
-        if ext == "pdf":
-            raw_text = _extract_text_from_pdf(file_bytes)
-        elif ext == "docx":
-            raw_text = _extract_text_from_docx(file_bytes)
-        else:
+        if ext not in ("pdf", "docx"):
             logger.error(f"[ResumeParser] Unsupported file type: .{ext}")
             return
-
-        payload_content = []
-        prompt = EXTRACTION_PROMPT_TEMPLATE.format(resume_text=raw_text)
-        
-        # If pypdf failed (e.g., image-based PDF), use Gemini Vision natively
-        if not raw_text.strip() and ext == "pdf":
-            logger.info("[ResumeParser] pypdf extracted empty string. Falling back to Gemini native PDF vision processing.")
-            payload_content = [{"mime_type": "application/pdf", "data": file_bytes}, prompt]
-        elif not raw_text.strip():
-            logger.error("[ResumeParser] No text extracted from resume. Cannot proceed.")
+        # pypdf / python-docx run in a process pool so large files don't block the event loop
+        raw_text = await extract_resume_text(file_bytes, ext)
+
+        saved_locally = False
+        if settings.RESUME_LOCAL_PARSER and raw_text.strip():
+            started = time.perf_counter()
+            local_data = await asyncio.to_thread(parse_resume_text, raw_text)
+            elapsed = time.perf_counter() - started
+            RESUME_STAGE_SECONDS.observe(elapsed, stage="local_parse")
+            logger.info(f"[ResumeParser] Local parse took {elapsed * 1000:.1f}ms.")
+            if local_data.get("skills") or local_data.get("experiences"):
+                saved_locally = await _save_parsed_resume(profile_id, local_data)
+
+        if saved_locally and not settings.RESUME_LLM_REFINE:
             return
-        else:
-            logger.info(f"[ResumeParser] Extracted {len(raw_text)} chars. Sending text to Gemini...")
-            payload_content = [prompt]
-
-        # ── Step 2: Send to Gemini for structured extraction ────────
-        try:
-            gemini_response = await gemini_model.generate_content_async(payload_content)
-        except Exception as gemini_err:
-            logger.error(f"[ResumeParser] Gemini API call failed: {gemini_err}", exc_info=True)
+        if saved_locally and not GEMINI_API_KEY:
+            logger.info("[ResumeParser] Gemini not configured; keeping the local parse.")
             return
 
-        # Collect response text
-        raw_response = ""
-        if hasattr(gemini_response, "text"):
-            raw_response = gemini_response.text.strip()
-        else:
-            for part in gemini_response.parts:
-                if hasattr(part, "text"):
-                    raw_response += part.text
-            raw_response = raw_response.strip()
-
-        logger.info(f"[ResumeParser] Gemini response (first 300 chars): {raw_response[:300]}")
-
-        # Strip markdown fences if present despite instructions
-        if "```json" in raw_response:
-            raw_response = raw_response.split("```json")[1].split("```")[0].strip()
-        elif "```" in raw_response:
-            raw_response = raw_response.split("```")[1].split("```")[0].strip()
-
         try:
-            extracted_data = json.loads(raw_response)
-        except json.JSONDecodeError as je:
-            logger.error(
-                f"[ResumeParser] Failed to parse JSON from Gemini response: {je}\nRaw: {raw_response[:500]}"
-            )
-            return
-
-        extracted_name = extracted_data.get("full_name")
-        extracted_skills = extracted_data.get("skills", [])
-        extracted_experiences = extracted_data.get("experiences", [])
-
-        logger.info(
-            f"[ResumeParser] Parsed: name='{extracted_name}', "
-            f"skills={len(extracted_skills)}, experiences={len(extracted_experiences)}"
-        )
-
-        # ── Step 3: Save to database ─────────────────────────────────────────
-        profile = db.query(Profile).filter(Profile.id == profile_id).first()
-        if not profile:
-            logger.warning(f"[ResumeParser] Profile {profile_id} not found. Cannot save.")
+            with RESUME_STAGE_SECONDS.time(stage="llm"):
+                extracted_data = await extract_resume_data(file_bytes, ext, raw_text=raw_text)
+        except ResumeExtractionError as e:
+            logger.error(f"[ResumeParser] {e}" + (" Keeping the local parse." if saved_locally else ""))
             return
-
-        # Update name
-        if extracted_name and isinstance(extracted_name, str) and extracted_name.strip():
-            name_parts = extracted_name.strip().split(" ", 1)
-            profile.first_name = name_parts[0]
-            profile.last_name = name_parts[1] if len(name_parts) > 1 else None
-            logger.info(f"[ResumeParser] Name: {profile.first_name} {profile.last_name}")
-
-        # Replace skills
-        db.query(Skill).filter(Skill.profile_id == profile_id).delete()
-        seen_skills = set()
-        for skill_name in extracted_skills:
-            if not isinstance(skill_name, str):
-                continue
-            skill_name = skill_name.strip()
-            if skill_name and skill_name.lower() not in seen_skills:
-                seen_skills.add(skill_name.lower())
-                db.add(Skill(profile_id=profile_id, name=skill_name))
-        logger.info(f"[ResumeParser] Inserted {len(seen_skills)} skills.")
-
-        # Replace experiences
-        db.query(Experience).filter(Experience.profile_id == profile_id).delete()
-        exp_count = 0
-        for exp_data in extracted_experiences:
-            try:
-                start_str = (exp_data.get("start_date") or "").strip()
-                end_str = (exp_data.get("end_date") or "").strip()
-
-                parsed_start = None
-                if start_str:
-                    try:
-                        parsed_start = datetime.strptime(start_str, "%Y-%m-%d").date()
-                    except ValueError:
-                        logger.warning(f"[ResumeParser] Cannot parse start_date: '{start_str}'")
-
-                parsed_end = None
-                if end_str and end_str.lower() not in ("present", "current", "now", ""):
-                    try:
-                        parsed_end = datetime.strptime(end_str, "%Y-%m-%d").date()
-                    except ValueError:
-                        logger.warning(f"[ResumeParser] Cannot parse end_date: '{end_str}'")
-
-                db.add(
-                    Experience(
-                        profile_id=profile_id,
-                        title=str(exp_data.get("title") or "").strip() or "Unknown",
-                        company=str(exp_data.get("company") or "").strip() or "Unknown",
-                        location=exp_data.get("location") or None,
-                        start_date=parsed_start,
-                        end_date=parsed_end,
-                        description=exp_data.get("description") or None,
-                    )
-                )
-                exp_count += 1
-            except Exception as exp_err:
-                logger.error(f"[ResumeParser] Error adding experience {exp_data}: {exp_err}", exc_info=True)
-
-        logger.info(f"[ResumeParser] Inserted {exp_count} experiences.")
-
-        db.commit()
-        logger.info(f"[ResumeParser] ✅ Committed all data for profile {profile_id}.")
+        await resume_parse_cache.set(cache_key, extracted_data)
+        await _save_parsed_resume(profile_id, extracted_data)
 
     except Exception as e:
         logger.error(f"[ResumeParser] Unexpected error for profile {profile_id}: {e}", exc_info=True)
-        try:
-            db.rollback()
-        except Exception:
-            pass
-    finally:
-        if 'db' in locals() and db:
-            try:
-                db.close()
-                logger.debug("[ResumeParser] DB session closed.")
-            except Exception:
-                pass
 
     logger.info(f"[ResumeParser] Finished for profile_id={profile_id}")
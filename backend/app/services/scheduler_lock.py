@@ -0,0 +1,83 @@
+"""
+Run periodic jobs once across replicas.
+
+Every API process (uvicorn worker or replica) starts the same APScheduler jobs.
+`run_exclusive` makes each firing safe to duplicate:
+
+  - a Postgres session-level advisory lock keyed by the job name is held for
+    the duration of the run, so runs never overlap; other replicas skip the
+    firing instead of waiting (the lock is released automatically if the
+    holder's connection dies),
+  - the `scheduler_runs` table records when each job last started, and a
+    firing is skipped if another replica already started the job within
+    `min_interval`, so N replicas produce one run per interval, not N.
+"""
+
+import hashlib
+import logging
+import os
+import socket
+from datetime import timedelta
+from typing import Awaitable, Callable
+
+from sqlalchemy import text
+
+from app.db.database import AsyncSessionLocal, async_engine
+from app.db.models import SchedulerRun
+from app.services.task_queue import utc_now
+
+logger = logging.getLogger(__name__)
+
+OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _lock_key(name: str) -> int:
+    # Advisory locks take a signed 64-bit key
+    return int.from_bytes(hashlib.sha1(f"scheduler:{name}".encode("utf-8")).digest()[:8], "big", signed=True)
+
+
+async def _claim_run(name: str, min_interval: timedelta) -> bool:
+    async with AsyncSessionLocal() as db:
+        run = await db.get(SchedulerRun, name, with_for_update=True)
+        now = utc_now()
+        if run is None:
+            run = SchedulerRun(name=name)
+            db.add(run)
+        elif run.started_at is not None and run.started_at > now - min_interval:
+            await db.commit()
+            return False
+        run.owner, run.started_at, run.finished_at, run.status = OWNER, now, None, "running"
+        await db.commit()
+        return True
+
+
+async def _finish_run(name: str, status: str):
+    async with AsyncSessionLocal() as db:
+        run = await db.get(SchedulerRun, name)
+        if run is not None and run.owner == OWNER:
+            run.finished_at, run.status = utc_now(), status
+            await db.commit()
+
+
+async def run_exclusive(name: str, job: Callable[[], Awaitable[None]], min_interval: timedelta) -> bool:
+    """Run `job` unless another replica is running it or ran it within `min_interval`. Returns whether it ran."""
+    async with async_engine.connect() as conn:
+        locked = (await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": _lock_key(name)})).scalar()
+        await conn.commit()
+        if not locked:
+            logger.info(f"Scheduler: '{name}' is running on another replica, skipping.")
+            return False
+        try:
+            if not await _claim_run(name, min_interval):
+                logger.info(f"Scheduler: '{name}' already ran within {min_interval}, skipping.")
+                return False
+            status = "failed"
+            try:
+                await job()
+                status = "completed"
+            finally:
+                await _finish_run(name, status)
+            return True
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _lock_key(name)})
+            await conn.commit()
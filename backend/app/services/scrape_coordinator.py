@@ -0,0 +1,173 @@
+"""
+Single-flight coordination for job scraping.
+
+Scraping is the same work for every user (the same boards, the same jobs), so a
+burst of refresh requests should not each launch their own scrape. Every scrape
+is recorded as a `task_queue` row of kind "scrape"; callers of
+`ensure_fresh_scrape`:
+
+  - reuse the latest completed scrape if it finished within
+    SCRAPE_FRESHNESS_MINUTES,
+  - otherwise attach to a scrape that is already running (in this process or
+    any other worker), mirroring its progress into their own task status,
+  - otherwise start one themselves.
+
+A follower whose leader stops heartbeating (TASK_STALE_SECONDS) takes over
+with a fresh scrape; one that waits longer than SCRAPE_WAIT_TIMEOUT_SECONDS
+gives up and reports the scrape as failed.
+
+The check-and-start step runs under a Postgres advisory transaction lock, so
+concurrent workers agree on a single leader.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import select, text
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.db.models import TaskRecord
+from app.services.job_scraper import trigger_job_scraping
+from app.services.task_queue import TaskStatusMap, heartbeat, mark_task_done, utc_now
+
+logger = logging.getLogger(__name__)
+
+SCRAPE_TASK_KIND = "scrape"
+# Arbitrary constant identifying the scrape leader election lock
+SCRAPE_LOCK_KEY = 0x1A7E11A5
+POLL_INTERVAL_SECONDS = 2.0
+# Returned by _wait_for_scrape when the leader stopped heartbeating
+LEADER_LOST = "leader_lost"
+
+# Scrapes led by this process, so local followers can await them directly
+_local_scrapes: Dict[str, asyncio.Task] = {}
+
+
+async def ensure_fresh_scrape(
+    task_id: Optional[str] = None,
+    task_statuses_ref=None,
+    max_age_minutes: Optional[float] = None,
+) -> str:
+    """
+    Make sure jobs were scraped recently, sharing work with concurrent callers.
+    Returns the final status of the scrape that was used ("completed" or "failed").
+    """
+    def _update_status(status_message: str, current_status_verb: str = "scraping"):
+        if task_id and task_statuses_ref is not None:
+            task_statuses_ref[task_id] = {"status": current_status_verb, "message": status_message}
+
+    if max_age_minutes is None:
+        max_age_minutes = settings.SCRAPE_FRESHNESS_MINUTES
+
+    deadline = asyncio.get_running_loop().time() + settings.SCRAPE_WAIT_TIMEOUT_SECONDS
+    while True:
+        scrape_id, role = await _find_or_start_scrape(max_age_minutes)
+        if role == "reused":
+            logger.info(f"Reusing scrape {scrape_id} completed within the last {max_age_minutes} minutes.")
+            _update_status("Using recently scraped jobs.")
+            return "completed"
+
+        if role == "leader":
+            _update_status("Started shared job scrape.")
+            _local_scrapes[scrape_id] = asyncio.create_task(_run_scrape(scrape_id))
+        else:
+            logger.info(f"Attaching to in-flight scrape {scrape_id}.")
+            _update_status("Attached to a job scrape already in progress.")
+
+        status = await _wait_for_scrape(scrape_id, _update_status, deadline)
+        if status != LEADER_LOST:
+            return status
+        # The stale row is no longer "fresh", so the next election starts a new scrape
+        logger.warning(f"Scrape {scrape_id} stopped heartbeating; taking over.")
+        _update_status("The shared job scrape stalled; restarting it.")
+
+
+async def _find_or_start_scrape(max_age_minutes: float):
+    async with AsyncSessionLocal() as db:
+        # Serialise leader election across processes; released at commit
+        await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCRAPE_LOCK_KEY})
+        latest = (await db.execute(
+            select(TaskRecord).where(TaskRecord.kind == SCRAPE_TASK_KIND)
+            .order_by(TaskRecord.created_at.desc()).limit(1)
+        )).scalars().first()
+
+        now = utc_now()
+        if latest is not None:
+            if (
+                latest.state == "done"
+                and latest.status != "failed"
+                and latest.finished_at is not None
+                and latest.finished_at >= now - timedelta(minutes=max_age_minutes)
+            ):
+                await db.commit()
+                return latest.id, "reused"
+            if latest.state == "running" and _is_alive(latest.locked_at, now):
+                await db.commit()
+                return latest.id, "follower"
+
+        scrape_id = uuid.uuid4().hex
+        db.add(TaskRecord(
+            id=scrape_id,
+            kind=SCRAPE_TASK_KIND,
+            state="running",
+            status="scraping",
+            message="Scrape started.",
+            locked_at=now,
+            # Scrapes aren't retried by the queue: if the leader dies, maintenance
+            # marks the row failed and the next caller starts a fresh scrape.
+            attempts=settings.TASK_MAX_ATTEMPTS,
+        ))
+        await db.commit()
+        return scrape_id, "leader"
+
+
+async def _run_scrape(scrape_id: str):
+    statuses = TaskStatusMap()
+    beat = asyncio.create_task(heartbeat(scrape_id))
+    try:
+        await trigger_job_scraping(task_id=scrape_id, task_statuses_ref=statuses)
+    except Exception as e:
+        logger.error(f"Shared scrape {scrape_id} failed: {e}", exc_info=True)
+        statuses[scrape_id] = {"status": "failed", "message": f"Scraping failed: {str(e)}"}
+    finally:
+        beat.cancel()
+        await mark_task_done(scrape_id, statuses)
+        _local_scrapes.pop(scrape_id, None)
+
+
+def _is_alive(locked_at, now) -> bool:
+    """Whether a running scrape's heartbeat is recent enough to keep following it."""
+    return locked_at is not None and locked_at >= now - timedelta(seconds=settings.TASK_STALE_SECONDS)
+
+
+async def _wait_for_scrape(scrape_id: str, update_status, deadline: float) -> str:
+    """Wait for a scrape to finish; returns its final status, "failed" past the deadline, or LEADER_LOST."""
+    loop = asyncio.get_running_loop()
+    last_message = None
+    while True:
+        local = _local_scrapes.get(scrape_id)
+        if local is not None:
+            await asyncio.wait({local}, timeout=POLL_INTERVAL_SECONDS)
+        async with AsyncSessionLocal() as db:
+            row = (await db.execute(
+                select(TaskRecord.state, TaskRecord.status, TaskRecord.message, TaskRecord.locked_at)
+                .where(TaskRecord.id == scrape_id)
+            )).first()
+        if row is None:
+            return "failed"
+        if row.state == "done":
+            return row.status
+        if local is None and not _is_alive(row.locked_at, utc_now()):
+            return LEADER_LOST
+        if loop.time() >= deadline:
+            logger.warning(f"Gave up waiting for scrape {scrape_id} after {settings.SCRAPE_WAIT_TIMEOUT_SECONDS}s.")
+            return "failed"
+        if row.message and row.message != last_message:
+            last_message = row.message
+            update_status(f"Shared scrape in progress: {row.message}")
+        if local is None:
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
@@ -0,0 +1,163 @@
+"""
+Record/replay layer for scraper fetches.
+
+The Hacker News and WeWorkRemotely scrapers fetch through `http_get` and
+`firecrawl_scrape` instead of calling requests/Firecrawl directly. The mode is
+SCRAPER_FIXTURE_MODE:
+
+  - "" (default): live fetches, nothing stored
+  - "record": live fetches, each response also written to SCRAPER_FIXTURE_DIR
+  - "replay": no network; responses are served from SCRAPER_FIXTURE_DIR after
+    SCRAPER_REPLAY_LATENCY_MS (± SCRAPER_REPLAY_JITTER_MS) of blocking sleep,
+    standing in for the blocking requests/Firecrawl call. Politeness delays
+    between items are skipped.
+
+Fixtures are one JSON file per (kind, url) under <dir>/<kind>/, so a scrape
+can be replayed deterministically for benchmarks (see
+benchmarks/bench_scrapers.py) and existing HTML captures can be imported with
+scripts/scrape_fixtures.py.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+HTTP = "http"
+FIRECRAWL = "firecrawl"
+
+
+class FixtureMissingError(Exception):
+    """Raised in replay mode when no fixture was recorded for a request."""
+
+
+@dataclass
+class FetchedResponse:
+    """The parts of a response the scrapers use (mirrors requests.Response)."""
+    status_code: int
+    text: str
+
+
+@dataclass
+class FirecrawlDocument:
+    """Replayed Firecrawl scrape; exposes .html like the SDK's response."""
+    html: str
+
+
+def fixture_path(kind: str, url: str, directory: Optional[str] = None) -> str:
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:24]
+    return os.path.join(directory or settings.SCRAPER_FIXTURE_DIR, kind, f"{key}.json")
+
+
+def save_fixture(kind: str, url: str, body: str, status_code: int = 200, directory: Optional[str] = None) -> str:
+    path = fixture_path(kind, url, directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    record = {
+        "kind": kind,
+        "url": url,
+        "status_code": status_code,
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "body": body,
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_fixture(kind: str, url: str, directory: Optional[str] = None) -> Dict[str, Any]:
+    path = fixture_path(kind, url, directory)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise FixtureMissingError(f"No {kind} fixture for {url} ({path})") from None
+
+
+def _replay_delay():
+    latency = settings.SCRAPER_REPLAY_LATENCY_MS
+    jitter = settings.SCRAPER_REPLAY_JITTER_MS
+    delay_ms = max(0.0, latency + (random.uniform(-jitter, jitter) if jitter else 0.0))
+    if delay_ms:
+        time.sleep(delay_ms / 1000)
+
+
+def replaying() -> bool:
+    return settings.SCRAPER_FIXTURE_MODE == "replay"
+
+
+def polite_delay(low: float, high: float):
+    """Pause between requests to the same site; skipped when replaying fixtures."""
+    if not replaying():
+        time.sleep(random.uniform(low, high))
+
+
+def http_get(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30) -> FetchedResponse:
+    mode = settings.SCRAPER_FIXTURE_MODE
+    if mode == "replay":
+        record = load_fixture(HTTP, url)
+        _replay_delay()
+        return FetchedResponse(status_code=record["status_code"], text=record["body"])
+
+    import requests
+
+    with span("http.get", kind="client", **{"http.method": "GET", "http.url": url}) as client_span:
+        response = requests.get(url, headers=headers, timeout=timeout)
+        if client_span is not None:
+            client_span.set_attribute("http.status_code", response.status_code)
+    if mode == "record":
+        path = save_fixture(HTTP, url, response.text, response.status_code)
+        logger.info(f"[ScrapeFixtures] Recorded {url} -> {path}")
+    return FetchedResponse(status_code=response.status_code, text=response.text)
+
+
+def firecrawl_html(scraped_data) -> Optional[str]:
+    """HTML from a Firecrawl scrape response, whichever field the SDK version put it in."""
+    if not scraped_data:
+        return None
+    for attr in ("html", "source_html"):
+        value = getattr(scraped_data, attr, None)
+        if value:
+            return value
+    data = getattr(scraped_data, "data", None)
+    if isinstance(data, dict) and data.get("html"):
+        return data["html"]
+    if isinstance(data, str) and data.strip().startswith("<"):
+        return data
+    return None
+
+
+def firecrawl_scrape(url: str, **params):
+    """
+    FirecrawlApp.scrape_url(url, **params), or the recorded HTML wrapped in a
+    FirecrawlDocument when replaying. Requires FIRECRAWL_API_KEY unless replaying.
+    """
+    mode = settings.SCRAPER_FIXTURE_MODE
+    if mode == "replay":
+        record = load_fixture(FIRECRAWL, url)
+        _replay_delay()
+        return FirecrawlDocument(html=record["body"])
+
+    from firecrawl import FirecrawlApp
+
+    with span("firecrawl.scrape_url", kind="client", **{"http.url": url}):
+        scraped_data = FirecrawlApp(api_key=settings.FIRECRAWL_API_KEY).scrape_url(url, **params)
+    if mode == "record":
+        html = firecrawl_html(scraped_data)
+        if html:
+            path = save_fixture(FIRECRAWL, url, html)
+            logger.info(f"[ScrapeFixtures] Recorded Firecrawl scrape of {url} -> {path}")
+        else:
+            logger.warning(f"[ScrapeFixtures] Firecrawl returned no HTML for {url}; nothing recorded.")
+    return scraped_data
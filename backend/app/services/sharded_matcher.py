@@ -0,0 +1,202 @@
+"""
+Sharded matching pass over all active users.
+
+`match_jobs_for_all_users` matches users one at a time on the event loop. This
+module spreads the same work across processes so the periodic pass scales with
+cores:
+
+  - the coordinator streams the job set through the vectorizer once, block by
+    block, into a snapshot directory (see job_vectors.build_snapshot),
+  - active users are partitioned by a stable hash of their id into N shards,
+  - each shard runs in its own process, which memory-maps the snapshot (the
+    OS shares the pages between processes), loads the vectorizer once, and
+    scores its users block by block against it (job_vectors.top_k) and saves
+    them with the synchronous SessionLocal,
+  - shards report each finished user back to the coordinator, which logs
+    progress and overall throughput in users/sec.
+
+Used for the scheduled pass when MATCH_SHARDS is not 1 (0 = one shard per CPU);
+run manually with run_sharded_matching.py.
+"""
+
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.db.models import User, Job, UserJobMatch
+from app.services.db_utils import profile_aggregate_stmt
+from app.services.job_matcher import MATCH_JOB_LIMIT, apply_role_boost, prepare_profile_text
+from app.services.job_vectors import build_snapshot, load_snapshot, top_k
+from app.services.vectorizer import get_global_vectorizer
+
+logger = logging.getLogger(__name__)
+
+TOP_N = 50
+PROGRESS_LOG_EVERY = 25
+
+
+def shard_for(user_id, num_shards: int) -> int:
+    """Stable shard assignment (Python's hash() is salted per process)."""
+    digest = hashlib.md5(str(user_id).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % num_shards
+
+
+def partition_users(user_ids: list, num_shards: int) -> List[list]:
+    shards = [[] for _ in range(num_shards)]
+    for user_id in user_ids:
+        shards[shard_for(user_id, num_shards)].append(user_id)
+    return shards
+
+
+async def _load_user_ids() -> list:
+    async with AsyncSessionLocal() as db:
+        user_ids = (await db.execute(
+            select(User.supabase_id).where(User.is_active == True, User.supabase_id.isnot(None))
+        )).scalars().all()
+    return list(user_ids)
+
+
+def _match_shard(shard_index: int, user_ids: list, snapshot_dir: str, progress):
+    """Entry point of a shard process."""
+    from app.core.logging_config import configure_logging
+    from app.db.database import SessionLocal
+
+    configure_logging()
+    snapshot = load_snapshot(snapshot_dir)
+    vectorizer = get_global_vectorizer()
+    db = SessionLocal()
+    try:
+        for user_id in user_ids:
+            try:
+                saved = _match_user(db, user_id, snapshot, vectorizer)
+                progress.put(("user", shard_index, user_id, saved))
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Shard {shard_index}: matching failed for user {user_id}: {e}", exc_info=True)
+                progress.put(("error", shard_index, user_id, 0))
+    finally:
+        db.close()
+        progress.put(("done", shard_index, None, 0))
+
+
+def _match_user(db, user_id, snapshot, vectorizer) -> int:
+    profile = db.execute(profile_aggregate_stmt(user_id)).scalars().first()
+    if not profile:
+        return 0
+    profile_text = prepare_profile_text(profile, profile.skills, profile.experiences)
+    if not profile_text.strip():
+        return 0
+
+    raw_matches = top_k(snapshot, vectorizer.transform([profile_text]), TOP_N)
+    titles = dict(db.execute(select(Job.id, Job.title).where(Job.id.in_([job_id for job_id, _ in raw_matches]))).all())
+    matches = [(job_id, score) for job_id, score in apply_role_boost(raw_matches, profile.desired_roles, titles) if score > 0.01]
+    if not matches:
+        return 0
+
+    existing = {
+        match.job_id: match
+        for match in db.execute(select(UserJobMatch).where(
+            UserJobMatch.user_id == user_id,
+            UserJobMatch.job_id.in_([job_id for job_id, _ in matches]),
+        )).scalars()
+    }
+    for job_id, score in matches:
+        if job_id in existing:
+            existing[job_id].relevance_score = score
+        else:
+            db.add(UserJobMatch(user_id=user_id, job_id=job_id, relevance_score=score, status='pending'))
+    db.commit()
+    return len(matches)
+
+
+def _run_shards(shards: List[list], snapshot_dir: str) -> Dict[str, object]:
+    """Start one process per non-empty shard and collect progress until all finish."""
+    context = multiprocessing.get_context("spawn")
+    progress = context.Queue()
+    processes = []
+    for index, user_ids in enumerate(shards):
+        if not user_ids:
+            continue
+        process = context.Process(target=_match_shard, args=(index, user_ids, snapshot_dir, progress), name=f"match-shard-{index}")
+        process.start()
+        processes.append(process)
+
+    total = sum(len(user_ids) for user_ids in shards)
+    started = time.perf_counter()
+    matched_users, errors, processed = [], 0, 0
+    remaining = len(processes)
+    while remaining:
+        try:
+            kind, shard_index, user_id, _saved = progress.get(timeout=5)
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                logger.error("All shard processes exited without reporting completion.")
+                break
+            continue
+        if kind == "done":
+            remaining -= 1
+            continue
+        processed += 1
+        if kind == "error":
+            errors += 1
+        else:
+            matched_users.append(user_id)
+        if processed % PROGRESS_LOG_EVERY == 0 or processed == total:
+            elapsed = time.perf_counter() - started
+            logger.info(f"Sharded matching: {processed}/{total} users ({processed / elapsed:.1f} users/sec)")
+
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+    return {
+        "users": processed,
+        "errors": errors,
+        "shards": len(processes),
+        "seconds": round(elapsed, 2),
+        "users_per_sec": round(processed / elapsed, 2) if elapsed else 0.0,
+        "matched_users": matched_users,
+    }
+
+
+async def match_jobs_for_all_users_sharded(num_shards: Optional[int] = None) -> Dict[str, object]:
+    """Match every active user across `num_shards` processes (default MATCH_SHARDS or CPU count)."""
+    num_shards = num_shards or settings.MATCH_SHARDS or os.cpu_count() or 1
+    user_ids = await _load_user_ids()
+    if not user_ids:
+        logger.info("Sharded matching skipped: no active users.")
+        return {"users": 0, "errors": 0, "shards": 0, "seconds": 0.0, "users_per_sec": 0.0}
+
+    snapshot_dir = tempfile.mkdtemp(prefix="job_vectors_")
+    try:
+        # Same job window as per-user matching
+        snapshot = await build_snapshot(snapshot_dir, settings.MATCH_CHUNKED_JOB_LIMIT if settings.MATCH_CHUNKED else MATCH_JOB_LIMIT)
+        if snapshot is None:
+            return {"users": 0, "errors": len(user_ids), "shards": 0, "seconds": 0.0, "users_per_sec": 0.0}
+        if snapshot.rows == 0:
+            logger.info("Sharded matching skipped: no jobs.")
+            return {"users": 0, "errors": 0, "shards": 0, "seconds": 0.0, "users_per_sec": 0.0}
+        shards = partition_users(user_ids, num_shards)
+        logger.info(f"Sharded matching: {len(user_ids)} users, {snapshot.rows} jobs, {num_shards} shards.")
+        result = await asyncio.to_thread(_run_shards, shards, snapshot_dir)
+    finally:
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+    for user_id in result.pop("matched_users"):
+        await response_cache.invalidate_user(user_id)
+    logger.info(
+        f"Sharded matching completed: {result['users']} users in {result['seconds']}s "
+        f"({result['users_per_sec']} users/sec, {result['shards']} shards, {result['errors']} errors)"
+    )
+    return result
@@ -0,0 +1,163 @@
+"""
+Push channel for background task progress.
+
+Workers publish events with Postgres NOTIFY (delivered when the writing
+transaction commits, so subscribers never see an event before the row it
+describes). Each API process keeps one LISTEN connection and fans events out
+to the Server-Sent Events streams subscribed to that task id, so clients no
+longer need to poll `/api/jobs/refresh/status/{task_id}`.
+
+Events:
+  status   {"status": ..., "message": ...}                 progress transitions
+  matches  {"count": n, "matches": [{job_id, title, ...}]}  newly saved matches
+
+The same channel carries response cache invalidations ({"user_id": ...}, no
+task id) for the in-process response cache; API processes using it call
+task_event_hub.start() so they listen even with no SSE stream open.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.cache import response_cache
+from app.db.database import AsyncSessionLocal, async_engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "task_events"
+CACHE_INVALIDATE_EVENT = "cache_invalidate"
+# NOTIFY payloads must stay under 8000 bytes
+MAX_PAYLOAD_BYTES = 7900
+
+
+def _encode(task_id: str, event: str, data: Dict[str, Any]) -> str:
+    payload = json.dumps({"task_id": task_id, "event": event, "data": data}, default=str)
+    if len(payload.encode("utf-8")) > MAX_PAYLOAD_BYTES:
+        payload = json.dumps({"task_id": task_id, "event": event, "data": {"truncated": True}})
+    return payload
+
+
+async def notify_task_event(db: AsyncSession, task_id: str, event: str, data: Dict[str, Any]):
+    """Queue an event on the caller's transaction; it is delivered at commit."""
+    await db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": _encode(task_id, event, data)})
+
+
+async def publish_task_event(task_id: str, event: str, data: Dict[str, Any]):
+    """Publish an event in its own transaction."""
+    try:
+        async with AsyncSessionLocal() as db:
+            await notify_task_event(db, task_id, event, data)
+            await db.commit()
+    except Exception as e:
+        logger.warning(f"Failed to publish {event} event for task {task_id}: {e}")
+
+
+async def publish_cache_invalidation(user_key: str):
+    """Tell every API process to drop `user_key`'s cached responses. NOTIFY is Postgres-only."""
+    if async_engine.dialect.name != "postgresql":
+        return
+    await publish_task_event("", CACHE_INVALIDATE_EVENT, {"user_id": user_key})
+
+
+class TaskEventHub:
+    """One LISTEN connection per process, fanned out to per-task subscriber queues."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._connection: Optional[AsyncConnection] = None
+        self._start_lock = asyncio.Lock()
+        self._reconnecting: Optional[asyncio.Task] = None
+        self._persistent = False # Keep listening with no subscribers (cache invalidations)
+
+    async def _ensure_listening(self):
+        if self._connection is not None:
+            return
+        async with self._start_lock:
+            if self._connection is not None:
+                return
+            connection = await async_engine.connect()
+            raw = await connection.get_raw_connection()
+            await raw.driver_connection.add_listener(CHANNEL, self._on_notify)
+            raw.driver_connection.add_termination_listener(self._on_connection_lost)
+            self._connection = connection
+            logger.info(f"Listening for task events on channel '{CHANNEL}'.")
+
+    async def start(self):
+        """Listen for the life of the process, reconnecting in the background if the connection can't be made or drops."""
+        if async_engine.dialect.name != "postgresql":
+            return # LISTEN/NOTIFY is Postgres-only; a SQLite dev setup is a single process
+        self._persistent = True
+        try:
+            await self._ensure_listening()
+        except Exception as e:
+            logger.warning(f"Task event listener failed to start, retrying in the background: {e}")
+            self._schedule_reconnect()
+
+    def _on_connection_lost(self, _conn):
+        logger.warning("Task event listener connection lost.")
+        self._connection = None
+        # Existing subscriber queues stay registered; LISTEN again for them right away
+        # instead of waiting for the next subscribe()
+        if self._subscribers or self._persistent:
+            self._schedule_reconnect()
+
+    def _schedule_reconnect(self):
+        if self._reconnecting is None or self._reconnecting.done():
+            self._reconnecting = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self, max_delay: float = 30.0):
+        delay = 1.0
+        while (self._subscribers or self._persistent) and self._connection is None:
+            try:
+                await self._ensure_listening()
+                logger.info(f"Task event listener reconnected for {len(self._subscribers)} subscribed tasks.")
+                if not response_cache.shared:
+                    # Invalidations sent while disconnected were missed
+                    response_cache.clear()
+                return
+            except Exception as e:
+                logger.warning(f"Task event listener reconnect failed, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, max_delay)
+
+    def _on_notify(self, _conn, _pid, _channel, payload: str):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        if message.get("event") == CACHE_INVALIDATE_EVENT:
+            if not response_cache.shared:
+                response_cache.apply_invalidation(str(message.get("data", {}).get("user_id")))
+            return
+        for queue in self._subscribers.get(message.get("task_id"), ()):
+            queue.put_nowait(message)
+
+    async def subscribe(self, task_id: str) -> asyncio.Queue:
+        """Return a queue receiving this task's events; pair with unsubscribe()."""
+        await self._ensure_listening()
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(task_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, task_id: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(task_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[task_id]
+
+    async def close(self):
+        self._persistent = False
+        if self._reconnecting is not None:
+            self._reconnecting.cancel()
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+
+task_event_hub = TaskEventHub()
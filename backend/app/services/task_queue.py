@@ -0,0 +1,384 @@
+"""
+Durable, DB-backed background task queue.
+
+Replaces FastAPI BackgroundTasks + the module-level `task_statuses` dict for
+heavy work (scrape + match). Tasks are rows in `task_queue`:
+
+  - the API enqueues a row and returns its id immediately,
+  - worker processes (run_task_worker.py, or an embedded worker in the API
+    process for single-process deployments) claim rows with
+    SELECT ... FOR UPDATE SKIP LOCKED, so any number of workers can share the
+    queue without double-processing,
+  - progress is written back to the row, so status survives restarts and is
+    visible from every API worker,
+  - finished rows are deleted after TASK_RETENTION_HOURS, and running rows
+    whose worker died (no heartbeat for TASK_STALE_SECONDS) are requeued up to
+    TASK_MAX_ATTEMPTS times,
+  - enqueueing refuses new work once TASK_QUEUE_MAX_PENDING tasks are queued
+    (backpressure), and a user's duplicate request attaches to their existing
+    queued/running task instead of adding another.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import select, update, delete, func, and_, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY, MetricFamily
+from app.core.tracing import inject, parse_traceparent, span
+from app.db.database import AsyncSessionLocal
+from app.db.models import TaskRecord
+from app.services.task_events import notify_task_event
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class QueueFullError(Exception):
+    """Raised when the queue is over TASK_QUEUE_MAX_PENDING."""
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def _lock_kind_for_user(db: AsyncSession, kind: str, user_id: Any):
+    """Serialise enqueues per (kind, user) until the transaction ends, so check-then-insert can't race."""
+    await db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": f"{kind}:{user_id}"})
+
+
+async def enqueue_task(
+    db: AsyncSession,
+    kind: str,
+    user_id: Any = None,
+    payload: Optional[dict] = None,
+    message: str = "Task queued.",
+    dedupe: bool = True,
+) -> str:
+    """Insert a queued task and return its id (or the id of an equivalent active task)."""
+    if dedupe and user_id is not None:
+        await _lock_kind_for_user(db, kind, user_id)
+        existing_id = (await db.execute(
+            select(TaskRecord.id).where(
+                TaskRecord.kind == kind,
+                TaskRecord.user_id == user_id,
+                TaskRecord.state.in_(("queued", "running")),
+            ).limit(1)
+        )).scalar_one_or_none()
+        if existing_id:
+            await db.rollback() # Release the lock
+            return existing_id
+
+    pending = (await db.execute(
+        select(func.count()).select_from(TaskRecord).where(TaskRecord.state == "queued")
+    )).scalar_one()
+    if pending >= settings.TASK_QUEUE_MAX_PENDING:
+        await db.rollback()
+        raise QueueFullError(f"{pending} tasks already queued")
+
+    task_id = uuid.uuid4().hex
+    # The worker continues the enqueuing request's trace from the payload's traceparent
+    db.add(TaskRecord(id=task_id, kind=kind, user_id=user_id, payload=inject(payload), state="queued", status="pending", message=message))
+    await db.commit()
+    return task_id
+
+
+async def enqueue_debounced(
+    db: AsyncSession,
+    kind: str,
+    user_id: Any,
+    delay_seconds: float,
+    payload: Optional[dict] = None,
+    message: str = "Task queued.",
+) -> str:
+    """
+    Queue a task to run `delay_seconds` from now, coalescing with the user's
+    already-queued task of the same kind (its start is pushed back instead).
+    A task that is already running is left alone: the new one runs after it.
+    """
+    # Serialise per (kind, user) so concurrent calls can't both insert
+    await _lock_kind_for_user(db, kind, user_id)
+    run_after = utc_now() + timedelta(seconds=delay_seconds)
+    existing_id = (await db.execute(
+        select(TaskRecord.id).where(
+            TaskRecord.kind == kind,
+            TaskRecord.user_id == user_id,
+            TaskRecord.state == "queued",
+        ).limit(1)
+    )).scalar_one_or_none()
+    if existing_id:
+        await db.execute(update(TaskRecord).where(TaskRecord.id == existing_id).values(run_after=run_after))
+        await db.commit()
+        return existing_id
+
+    pending = (await db.execute(
+        select(func.count()).select_from(TaskRecord).where(TaskRecord.state == "queued")
+    )).scalar_one()
+    if pending >= settings.TASK_QUEUE_MAX_PENDING:
+        await db.rollback()
+        raise QueueFullError(f"{pending} tasks already queued")
+
+    task_id = uuid.uuid4().hex
+    db.add(TaskRecord(id=task_id, kind=kind, user_id=user_id, payload=inject(payload), state="queued", status="pending", message=message, run_after=run_after))
+    await db.commit()
+    return task_id
+
+
+async def get_task_status(db: AsyncSession, task_id: str) -> Optional[Dict[str, str]]:
+    row = (await db.execute(
+        select(TaskRecord.status, TaskRecord.message).where(TaskRecord.id == task_id)
+    )).first()
+    if not row:
+        return None
+    return {"status": row.status, "message": row.message or ""}
+
+
+async def queue_depth() -> Dict[str, int]:
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(TaskRecord.state, func.count()).group_by(TaskRecord.state)
+        )).all()
+    return {state: count for state, count in rows}
+
+
+QUEUE_METRICS_CACHE_SECONDS = 5
+_queue_metrics: Dict[str, Any] = {"at": 0.0, "families": None}
+
+
+async def collect_queue_metrics():
+    # Cached so frequent (or several) scrapers don't each run a GROUP BY over the task table
+    now = time.monotonic()
+    if _queue_metrics["families"] is not None and now - _queue_metrics["at"] < QUEUE_METRICS_CACHE_SECONDS:
+        return _queue_metrics["families"]
+    depths = await queue_depth()
+    samples = [("task_queue_depth", {"state": state}, count) for state, count in depths.items()]
+    families = [MetricFamily("task_queue_depth", "gauge", "Tasks in the queue by state", samples)]
+    _queue_metrics.update(at=now, families=families)
+    return families
+
+REGISTRY.add_collector(collect_queue_metrics)
+
+
+class TaskStatusMap:
+    """
+    Drop-in for the old `task_statuses` dict passed to services as
+    `task_statuses_ref`. Assignments update a local view immediately and are
+    written to the task row in order by a single background writer, so
+    `_update_status` calls stay synchronous and never block on the DB.
+    """
+
+    def __init__(self):
+        self._local: Dict[str, Dict[str, str]] = {}
+        self._pending: "asyncio.Queue[tuple]" = asyncio.Queue()
+        self._writer: Optional[asyncio.Task] = None
+
+    def __setitem__(self, task_id: str, value: Dict[str, str]):
+        self._local[task_id] = value
+        self._pending.put_nowait((task_id, value.get("status"), value.get("message")))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.get_running_loop().create_task(self._drain())
+
+    def __getitem__(self, task_id: str) -> Dict[str, str]:
+        return self._local[task_id]
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._local
+
+    def get(self, task_id: str, default=None):
+        return self._local.get(task_id, default)
+
+    async def _drain(self):
+        while not self._pending.empty():
+            task_id, status, message = self._pending.get_nowait()
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(
+                        update(TaskRecord).where(TaskRecord.id == task_id).values(status=status, message=message)
+                    )
+                    await notify_task_event(db, task_id, "status", {"status": status, "message": message})
+                    await db.commit()
+            except Exception as e:
+                logger.error(f"Failed to persist status for task {task_id}: {e}")
+
+    async def flush(self):
+        if self._writer and not self._writer.done():
+            await self._writer
+
+
+async def heartbeat(task_id: str):
+    """Keep a running task's lock fresh so maintenance doesn't treat it as orphaned."""
+    while True:
+        await asyncio.sleep(max(settings.TASK_STALE_SECONDS / 4, 5))
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(update(TaskRecord).where(TaskRecord.id == task_id).values(locked_at=utc_now()))
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Heartbeat failed for task {task_id}: {e}")
+
+
+async def mark_task_done(task_id: str, statuses: TaskStatusMap):
+    """Finish a task row, defaulting its status to completed unless it reported a terminal one."""
+    await statuses.flush()
+    final = statuses.get(task_id, {})
+    values = {"state": "done", "finished_at": utc_now()}
+    if final.get("status") not in TERMINAL_STATUSES:
+        values.update(status="completed", message=final.get("message") or "Task completed.")
+    event = {
+        "status": values.get("status", final.get("status")),
+        "message": values.get("message", final.get("message")),
+        "final": True,
+    }
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(TaskRecord).where(TaskRecord.id == task_id).values(**values))
+            await notify_task_event(db, task_id, "status", event)
+            await db.commit()
+    except Exception as e:
+        logger.error(f"Failed to mark task {task_id} as done: {e}")
+
+
+async def requeue_task(task_id: str, message: str):
+    """Put a task that was interrupted mid-run (worker shutdown) back in the queue."""
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(TaskRecord).where(TaskRecord.id == task_id, TaskRecord.state == "running")
+                .values(state="queued", status="pending", message=message, locked_at=None, run_after=utc_now())
+            )
+            await notify_task_event(db, task_id, "status", {"status": "pending", "message": message})
+            await db.commit()
+    except Exception as e:
+        # Stale-lock recovery in _maintenance requeues it once the heartbeat stops
+        logger.error(f"Failed to requeue interrupted task {task_id}: {e}")
+
+
+TaskHandler = Callable[[TaskRecord, TaskStatusMap], Awaitable[None]]
+
+
+class TaskWorker:
+    """Claims and runs queued tasks. Run several (processes) to scale out."""
+
+    def __init__(self, handlers: Dict[str, TaskHandler], concurrency: Optional[int] = None, poll_interval: Optional[float] = None):
+        self.handlers = handlers
+        self.concurrency = concurrency or settings.TASK_WORKER_CONCURRENCY
+        self.poll_interval = poll_interval or settings.TASK_POLL_INTERVAL_SECONDS
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._running: set = set()
+        self._stopping = asyncio.Event()
+
+    async def run(self):
+        logger.info(f"Task worker {self.worker_id} started (concurrency={self.concurrency}).")
+        last_maintenance = 0.0
+        loop = asyncio.get_running_loop()
+        while not self._stopping.is_set():
+            if loop.time() - last_maintenance > 60:
+                await self._maintenance()
+                last_maintenance = loop.time()
+
+            await self._slots.acquire()
+            try:
+                task = await self._claim()
+            except Exception as e:
+                logger.error(f"Task worker {self.worker_id}: claim failed: {e}")
+                task = None
+            if task is None:
+                self._slots.release()
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            runner = asyncio.create_task(self._execute(task))
+            self._running.add(runner)
+            runner.add_done_callback(self._running.discard)
+
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        logger.info(f"Task worker {self.worker_id} stopped.")
+
+    def stop(self):
+        self._stopping.set()
+
+    async def _claim(self) -> Optional[TaskRecord]:
+        async with AsyncSessionLocal() as db:
+            task = (await db.execute(
+                select(TaskRecord).where(
+                    TaskRecord.state == "queued",
+                    TaskRecord.run_after <= func.now(),
+                    TaskRecord.kind.in_(list(self.handlers)),
+                ).order_by(TaskRecord.run_after).limit(1).with_for_update(skip_locked=True)
+            )).scalars().first()
+            if task is None:
+                return None
+            task.state = "running"
+            task.attempts = (task.attempts or 0) + 1
+            task.locked_at = utc_now()
+            await db.commit()
+            return task
+
+    async def _execute(self, task: TaskRecord):
+        statuses = TaskStatusMap()
+        beat = asyncio.create_task(heartbeat(task.id))
+        interrupted = False
+        try:
+            with span(f"task.{task.kind}", kind="consumer", parent=parse_traceparent((task.payload or {}).get("traceparent")),
+                      **{"task.id": task.id, "task.attempt": task.attempts or 1}):
+                await self.handlers[task.kind](task, statuses)
+        except asyncio.CancelledError:
+            # Shutdown mid-run: the work is unfinished, so don't mark it done
+            interrupted = True
+            raise
+        except Exception as e:
+            logger.error(f"Task {task.id} ({task.kind}) failed: {e}", exc_info=True)
+            statuses[task.id] = {"status": "failed", "message": f"An unexpected error occurred: {str(e)}"}
+        finally:
+            beat.cancel()
+            if interrupted:
+                await statuses.flush()
+                await requeue_task(task.id, "Requeued after the worker stopped mid-run.")
+            else:
+                await mark_task_done(task.id, statuses)
+            self._slots.release()
+
+    async def _maintenance(self):
+        """TTL cleanup of finished tasks and recovery of tasks orphaned by dead workers."""
+        try:
+            async with AsyncSessionLocal() as db:
+                stale_before = utc_now() - timedelta(seconds=settings.TASK_STALE_SECONDS)
+                stale = and_(TaskRecord.state == "running", TaskRecord.locked_at < stale_before)
+                requeued = await db.execute(
+                    update(TaskRecord)
+                    .where(stale, TaskRecord.attempts < settings.TASK_MAX_ATTEMPTS)
+                    .values(state="queued", message="Requeued after worker timeout.")
+                )
+                abandoned = await db.execute(
+                    update(TaskRecord)
+                    .where(stale, TaskRecord.attempts >= settings.TASK_MAX_ATTEMPTS)
+                    .values(state="done", status="failed", message="Task abandoned after repeated worker timeouts.", finished_at=utc_now())
+                )
+                expired = await db.execute(
+                    delete(TaskRecord).where(
+                        TaskRecord.state == "done",
+                        TaskRecord.finished_at < utc_now() - timedelta(hours=settings.TASK_RETENTION_HOURS),
+                    )
+                )
+                await db.commit()
+            if requeued.rowcount or abandoned.rowcount or expired.rowcount:
+                logger.info(
+                    f"Task queue maintenance: requeued={requeued.rowcount}, "
+                    f"abandoned={abandoned.rowcount}, expired={expired.rowcount}"
+                )
+        except Exception as e:
+            logger.error(f"Task queue maintenance failed: {e}", exc_info=True)
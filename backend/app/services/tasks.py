@@ -0,0 +1,66 @@
+"""
+Handlers for task kinds processed by the background task queue.
+"""
+
+import logging
+
+from app.core.config import settings
+from app.core.tracing import traced
+from app.db.database import AsyncSessionLocal
+from app.db.models import TaskRecord
+from app.services.scrape_coordinator import ensure_fresh_scrape
+from app.services.job_matcher import match_jobs_for_user
+from app.services.task_queue import TaskStatusMap, QueueFullError, enqueue_debounced
+
+logger = logging.getLogger(__name__)
+
+
+@traced("perform_job_refresh")
+async def perform_job_refresh(user_id: str, task_id: str, task_statuses_ref):
+    try:
+        # Scrape first — shared with any concurrent refreshes, and skipped if a
+        # scrape finished within SCRAPE_FRESHNESS_MINUTES
+        scrape_status = await ensure_fresh_scrape(task_id=task_id, task_statuses_ref=task_statuses_ref)
+        if scrape_status == "failed":
+            task_statuses_ref[task_id] = {"status": "failed", "message": "Job scraping failed."}
+            return
+        # Run matcher for this specific user
+        await match_jobs_for_user(user_id=user_id, task_id=task_id, task_statuses_ref=task_statuses_ref)
+    except Exception as e:
+        logger.error(f"Error in perform_job_refresh: {e}")
+        task_statuses_ref[task_id] = {"status": "failed", "message": f"An unexpected error occurred: {str(e)}"}
+
+
+async def handle_refresh_task(task: TaskRecord, statuses: TaskStatusMap):
+    await perform_job_refresh(user_id=task.user_id, task_id=task.id, task_statuses_ref=statuses)
+
+
+async def handle_rematch_task(task: TaskRecord, statuses: TaskStatusMap):
+    # Profile changed: rematch against the jobs already in the DB, no scrape
+    await match_jobs_for_user(user_id=task.user_id, task_id=task.id, task_statuses_ref=statuses)
+
+
+async def schedule_rematch(user_id) -> None:
+    """
+    Queue a rematch for a user whose profile changed. Bursts of edits (or a
+    resume parse adding many skills) within REMATCH_DEBOUNCE_SECONDS collapse
+    into one run. Never raises: a failed trigger only delays the user's matches
+    until the next scheduled pass.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            await enqueue_debounced(
+                db, "rematch", user_id=user_id,
+                delay_seconds=settings.REMATCH_DEBOUNCE_SECONDS,
+                message="Rematch queued after profile change.",
+            )
+    except QueueFullError:
+        logger.warning(f"Task queue full; skipping rematch for user {user_id}.")
+    except Exception as e:
+        logger.error(f"Failed to queue rematch for user {user_id}: {e}")
+
+
+TASK_HANDLERS = {
+    "refresh": handle_refresh_task,
+    "rematch": handle_rematch_task,
+}
@@ -0,0 +1,160 @@
+"""
+Resume text extraction in a bounded process pool.
+
+pypdf and python-docx are CPU-bound and synchronous; run inline they block the
+event loop for the whole parse of a large or scanned PDF. Extraction is
+dispatched to a small ProcessPoolExecutor instead:
+
+  - at most RESUME_EXTRACT_WORKERS files are parsed at once (further calls
+    wait for a slot rather than piling file bytes into the pool's queue),
+  - each file gets RESUME_EXTRACT_TIMEOUT_SECONDS, enforced inside the worker
+    with SIGALRM where available (so a runaway parse frees its worker) and by
+    the caller as a backstop; a worker that outlives the backstop is killed
+    and the pool replaced, so it can't hold a slot forever,
+  - only the first RESUME_MAX_PAGES pages are read, and page text is written
+    to a buffer as each page is parsed instead of collecting a list of pages.
+"""
+
+import asyncio
+import io
+import logging
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
+
+
+class ExtractionTimeout(Exception):
+    """Raised when a file takes longer than RESUME_EXTRACT_TIMEOUT_SECONDS to extract."""
+
+
+def _on_alarm(_signum, _frame):
+    raise ExtractionTimeout()
+
+
+def _extract_pdf_text(file_bytes: bytes, max_pages: int) -> Tuple[str, int]:
+    import pypdf
+
+    reader = pypdf.PdfReader(io.BytesIO(file_bytes))
+    buffer = io.StringIO()
+    pages = 0
+    for page in reader.pages:
+        if pages >= max_pages:
+            logger.info(f"[TextExtraction] Stopping at the {max_pages}-page limit ({len(reader.pages)} pages in file).")
+            break
+        pages += 1
+        page_text = page.extract_text() or ""
+        if page_text.strip():
+            if buffer.tell():
+                buffer.write("\n\n")
+            buffer.write(page_text)
+    return buffer.getvalue(), pages
+
+
+def _extract_docx_text(file_bytes: bytes) -> Tuple[str, int]:
+    from docx import Document
+
+    doc = Document(io.BytesIO(file_bytes))
+    buffer = io.StringIO()
+    paragraphs = 0
+    for para in doc.paragraphs:
+        if para.text.strip():
+            if buffer.tell():
+                buffer.write("\n")
+            buffer.write(para.text)
+            paragraphs += 1
+    # No page concept in DOCX; count the whole document as one page
+    return buffer.getvalue(), 1
+
+
+def extract_text_sync(file_bytes: bytes, ext: str, max_pages: int, timeout: float) -> Tuple[str, int]:
+    """Worker entry point: returns (text, pages read). Raises ExtractionTimeout."""
+    use_alarm = hasattr(signal, "SIGALRM") and timeout > 0
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        if ext == "pdf":
+            return _extract_pdf_text(file_bytes, max_pages)
+        if ext == "docx":
+            return _extract_docx_text(file_bytes)
+        raise ValueError(f"Unsupported file type: .{ext}")
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool, _slots
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.RESUME_EXTRACT_WORKERS)
+    if _slots is None:
+        _slots = asyncio.Semaphore(settings.RESUME_EXTRACT_WORKERS)
+    return _pool
+
+
+async def extract_resume_text(file_bytes: bytes, ext: str) -> str:
+    """Extract text from a PDF/DOCX in the process pool. Returns "" on failure, like the old inline extractors."""
+    text, _pages = await extract_resume_text_with_pages(file_bytes, ext)
+    return text
+
+
+async def extract_resume_text_with_pages(file_bytes: bytes, ext: str) -> Tuple[str, int]:
+    ext = ext.lower()
+    timeout = settings.RESUME_EXTRACT_TIMEOUT_SECONDS
+    pool = _get_pool()
+    loop = asyncio.get_running_loop()
+    async with _slots:
+        try:
+            text, pages = await asyncio.wait_for(
+                loop.run_in_executor(pool, extract_text_sync, file_bytes, ext, settings.RESUME_MAX_PAGES, timeout),
+                # Backstop for platforms without SIGALRM or a worker stuck in C code
+                timeout=timeout + 5,
+            )
+        except ExtractionTimeout:
+            logger.error(f"[TextExtraction] .{ext} extraction timed out after {timeout}s ({len(file_bytes)} bytes).")
+            return "", 0
+        except asyncio.TimeoutError:
+            # SIGALRM didn't stop it (or isn't available); the worker is still busy
+            logger.error(f"[TextExtraction] .{ext} extraction hung past {timeout + 5}s ({len(file_bytes)} bytes); recycling the pool.")
+            _recycle_pool(pool, kill=True)
+            return "", 0
+        except BrokenProcessPool:
+            logger.error("[TextExtraction] Extraction worker died; restarting the pool.")
+            _recycle_pool(pool)
+            return "", 0
+        except ImportError as e:
+            logger.error(f"[TextExtraction] Extraction library missing ({e}); check requirements.txt.")
+            return "", 0
+        except Exception as e:
+            logger.error(f"[TextExtraction] .{ext} extraction error: {e}", exc_info=True)
+            return "", 0
+    logger.info(f"[TextExtraction] Extracted {len(text)} chars from {pages} page(s) of .{ext}.")
+    return text, pages
+
+
+def _recycle_pool(pool: ProcessPoolExecutor, kill: bool = False):
+    """Drop `pool` (if it is still the current one) so the next call starts a fresh pool and slot count."""
+    global _pool, _slots
+    if _pool is not pool:
+        return # Another caller already replaced it
+    _pool, _slots = None, None
+    if kill:
+        # shutdown() never interrupts a running task; terminate the workers so a hung parse releases its CPU
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_extraction_pool():
+    global _pool, _slots
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool, _slots = None, None
@@ -1,4 +1,3 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
 import pickle
 import os
 import logging
@@ -7,9 +6,15 @@ logger = logging.getLogger(__name__)
 
 VECTORIZER_PATH = "global_tfidf_vectorizer.pkl"
 
-# Initialize a global vectorizer instance
-# We will fit it once or load a pre-fitted one.
-vectorizer = TfidfVectorizer(stop_words='english', max_df=0.95, min_df=2) # Common parameters
+# The global vectorizer instance; created, fitted or loaded on first use so that
+# importing this module (and the API) doesn't import scikit-learn.
+vectorizer = None
+
+def new_vectorizer():
+    """A fresh, unfitted vectorizer with the app's parameters."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    return TfidfVectorizer(stop_words='english', max_df=0.95, min_df=2) # Common parameters
 
 def fit_vectorizer_globally(corpus: list[str]):
     """
@@ -22,6 +27,8 @@ def fit_vectorizer_globally(corpus: list[str]):
         return
     try:
         logger.info(f"Fitting global TF-IDF vectorizer on a corpus of {len(corpus)} documents...")
+        if vectorizer is None:
+            vectorizer = new_vectorizer()
         vectorizer.fit(corpus)
         with open(VECTORIZER_PATH, 'wb') as f:
             pickle.dump(vectorizer, f)
@@ -40,14 +47,14 @@ def load_global_vectorizer():
             return True
         except Exception as e:
             logger.error(f"Error loading global vectorizer: {e}. Will use a new unfitted instance.", exc_info=True)
-            vectorizer = TfidfVectorizer(stop_words='english', max_df=0.95, min_df=2) # Fallback
+            vectorizer = new_vectorizer() # Fallback
             return False
     else:
         logger.warning(f"Vectorizer file {VECTORIZER_PATH} not found. Using a new unfitted instance. Fit it soon.")
-        vectorizer = TfidfVectorizer(stop_words='english', max_df=0.95, min_df=2) # Fallback
+        vectorizer = new_vectorizer() # Fallback
         return False
 
-def get_global_vectorizer() -> TfidfVectorizer:
+def get_global_vectorizer():
     """Returns the global vectorizer instance. Loads if not already loaded."""
     # Ensure it's loaded (or a new instance is ready if loading fails)
     if not hasattr(vectorizer, 'vocabulary_') or not vectorizer.vocabulary_:
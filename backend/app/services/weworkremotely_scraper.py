@@ -1,19 +1,14 @@
-import requests
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime, timezone
-import time
-import random
 from typing import List, Dict, Any, Optional
 import logging
 from sqlalchemy.orm import Session
 from urllib.parse import urljoin
 
-from firecrawl import FirecrawlApp
 from app.core.config import settings
 from app.services.db_utils import save_jobs_to_db 
+from app.services.scrape_fixtures import firecrawl_html, firecrawl_scrape, polite_delay, replaying
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 WWR_BASE_URL = "https://weworkremotely.com"
@@ -29,38 +24,21 @@ async def scrape_weworkremotely_jobs(max_jobs_param: int = 30) -> List[Dict[str,
     logger.info(f"Starting to scrape WeWorkRemotely jobs (param max: {max_jobs_param}, effective max: {effective_max_jobs}) from {WWR_JOBS_PAGE_URL}")
     jobs_data: List[Dict[str, Any]] = []
 
-    if not settings.FIRECRAWL_API_KEY:
+    if not settings.FIRECRAWL_API_KEY and not replaying():
         logger.error("FIRECRAWL_API_KEY not configured. Aborting WeWorkRemotely scraping.")
         return jobs_data
     
-    firecrawl_app = FirecrawlApp(api_key=settings.FIRECRAWL_API_KEY)
-    
     try:
         # Matching the log: "Attempting to scrape ... explicitly requesting HTML"
         # This implies 'formats' parameter might have been used.
         logger.info(f"Attempting to scrape WeWorkRemotely URL with Firecrawl SDK, explicitly requesting HTML via formats=['html']: {WWR_JOBS_PAGE_URL}")
         
-        scraped_data = firecrawl_app.scrape_url(
+        scraped_data = firecrawl_scrape(
             WWR_JOBS_PAGE_URL,
             formats=['html'], # Explicitly request HTML format
             timeout=60000 
         )
-
-        html_content = None
-        if scraped_data:
-            if hasattr(scraped_data, 'html') and scraped_data.html:
-                html_content = scraped_data.html
-                logger.info("Successfully obtained HTML from scraped_data.html")
-            elif hasattr(scraped_data, 'source_html') and scraped_data.source_html: 
-                 html_content = scraped_data.source_html
-                 logger.info("Successfully obtained HTML from scraped_data.source_html")
-            elif hasattr(scraped_data, 'data'): 
-                if isinstance(scraped_data.data, dict) and scraped_data.data.get('html'):
-                    html_content = scraped_data.data.get('html')
-                    logger.info("Successfully obtained HTML from scraped_data.data['html']")
-                elif isinstance(scraped_data.data, str) and scraped_data.data.strip().startswith("<"): # Check if data itself is HTML
-                    html_content = scraped_data.data
-                    logger.info("Interpreting scraped_data.data as HTML string")
+        html_content = firecrawl_html(scraped_data)
         
         if not html_content:
             logger.error(f"Firecrawl: Failed to extract usable HTML content (formats=['html'] used). Markdown might be in scraped_data.markdown. Full response: {vars(scraped_data) if scraped_data and hasattr(scraped_data, '__dict__') else scraped_data}")
@@ -68,6 +46,8 @@ async def scrape_weworkremotely_jobs(max_jobs_param: int = 30) -> List[Dict[str,
             
         logger.info(f"Successfully fetched HTML content for WWR. Length: {len(html_content)}")
         
+        from bs4 import BeautifulSoup # Deferred: only scraping processes pay for bs4
+
         soup = BeautifulSoup(html_content, "html.parser")
         
         job_elements_found = []
@@ -105,16 +85,16 @@ async def scrape_weworkremotely_jobs(max_jobs_param: int = 30) -> List[Dict[str,
                     if link_container: link_tag = link_container.find_parent("a", href=re.compile(r"(/listings/|/remote-jobs/)[^/]+"))
                 
                 if not title or not company or not link_tag or not link_tag.get('href'):
-                    logger.warning(f"Skipping WWR job item due to missing title, company, or link: {str(job_elem)[:150]}")
+                    logger.debug("Skipping WWR job item due to missing title, company, or link: %.150s", job_elem)
                     continue
 
                 absolute_url = urljoin(WWR_BASE_URL, link_tag['href'])
                 description = f"{title} at {company}. Location/Type: {job_location_info}."
                 jobs_data.append({"title": title, "company": company, "location": job_location_info, "description": description, "url": absolute_url, "source": "weworkremotely", "posted_date": datetime.now(timezone.utc)})
-                logger.info(f"Scraped WWR job (from HTML): {title} at {company}")
+                logger.debug("Scraped WWR job (from HTML): %s at %s", title, company)
             except Exception as e_parse:
-                logger.error(f"Error parsing WWR HTML job item: {e_parse} - Item: {str(job_elem)[:200]}", exc_info=True)
-            if i < len(job_elements_found) - 1: time.sleep(random.uniform(0.2, 0.5))
+                logger.error("Error parsing WWR HTML job item: %s - Item: %.200s", e_parse, job_elem, exc_info=True)
+            if i < len(job_elements_found) - 1: polite_delay(0.2, 0.5)
             
     except Exception as e_outer:
         logger.error(f"Outer error during WeWorkRemotely scraping: {e_outer}", exc_info=True)
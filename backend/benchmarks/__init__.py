@@ -0,0 +1,10 @@
+"""
+Performance benchmarks.
+
+    python -m benchmarks.bench_matching --help   matcher latency and ranking quality
+    python -m benchmarks.bench_scrapers --help   offline scraper replay (jobs/sec, loop blocking)
+    python -m benchmarks.bench_startup --help    import time and RSS of the API vs worker processes
+
+corpus.py generates the synthetic jobs/profiles (with ground-truth relevance
+labels) and metrics.py holds the timing and ranking-metric helpers.
+"""
@@ -0,0 +1,236 @@
+"""
+Match-quality and latency benchmark for the job matcher.
+
+Generates a synthetic corpus (benchmarks/corpus.py) at the requested scale and
+measures, per stage:
+
+  in-memory (always)
+    generate        corpus generation (not part of the app, for reference)
+    fit_vectorizer  TF-IDF fit on --fit-docs job texts (same params as the app)
+    job_vectors     cold get_job_vectors() over every job
+    profile_text    prepare_profile_text() per evaluated user
+    score           calculate_job_matches() per user (profile transform,
+                    cosine similarity against all jobs, top-k)
+    role_boost      apply_role_boost() per user
+
+  database (--database-url / --sqlite)
+    load            bulk insert of users, profiles, skills, experiences, jobs
+    match_user      match_jobs_for_user() end to end per evaluated user
+                    (profile aggregate load, newest MATCH_JOB_LIMIT jobs,
+                    scoring and the match upserts), or one
+    match_all       match_jobs_for_all_users() run with --all-users
+
+and reports throughput, peak RSS (plus per-stage tracemalloc peaks with
+--trace-memory) and NDCG@10 / recall@k of the rankings against the corpus'
+ground-truth labels. The database ranking is scored against the whole corpus,
+so jobs outside the matcher's MATCH_JOB_LIMIT window count as misses.
+
+Usage (from backend/):
+    python -m benchmarks.bench_matching --jobs 10000 --users 100
+    python -m benchmarks.bench_matching --jobs 1000000 --users 100000 --eval-users 200
+    python -m benchmarks.bench_matching --jobs 20000 --users 50 --sqlite
+    python -m benchmarks.bench_matching --database-url postgresql://localhost/bench --json out.json
+
+The database is dropped and recreated, so it must not be the app's configured
+DATABASE_URL. SQLite needs aiosqlite (requirements-dev.txt).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from sqlalchemy import insert, select
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal, Base, create_app_async_engine
+from app.db.models import Experience, Job, Profile, Skill, User, UserJobMatch
+from app.services import job_matcher, vectorizer as vectorizer_module
+from benchmarks.corpus import generate_jobs, generate_profiles, ideal_grades, label_counts, relevance, total_relevant
+from benchmarks.metrics import StageTimer, mean, ndcg_at_k, peak_rss_mb, print_report, recall_at_k
+
+INSERT_BATCH = 5000
+
+
+def _quality(rankings, jobs, profiles, counts, k_ndcg: int, k_recall: int):
+    """Mean NDCG@k_ndcg and recall@k_recall over {profile index: [job ids in rank order]}."""
+    ndcgs, recalls = [], []
+    for index, job_ids in rankings.items():
+        profile = profiles[index]
+        grades = [relevance(profile, jobs[job_id - 1]) for job_id in job_ids]
+        ndcgs.append(ndcg_at_k(grades, ideal_grades(profile, counts, k_ndcg), k_ndcg))
+        recalls.append(recall_at_k(grades, total_relevant(profile, counts), k_recall))
+    return {f"ndcg@{k_ndcg}": mean(ndcgs), f"recall@{k_recall}": mean(recalls), "users": len(rankings)}
+
+
+def run_in_memory(args, jobs, profiles, counts, timer: StageTimer):
+    with timer.stage("fit_vectorizer"):
+        fit_docs = jobs if not args.fit_docs else jobs[:args.fit_docs]
+        fitted = vectorizer_module.new_vectorizer()
+        fitted.fit([f"{job.title} {job.company} {job.location} {job.description}" for job in fit_docs])
+    # The app's matcher reads the module-level vectorizer via get_global_vectorizer()
+    vectorizer_module.vectorizer = fitted
+
+    with timer.stage("job_vectors"):
+        job_matcher.get_job_vectors(jobs, fitted)
+
+    titles = {job.id: job.title for job in jobs}
+    raw_rankings, boosted_rankings = {}, {}
+    started = time.perf_counter()
+    for index, profile in enumerate(profiles[:args.eval_users]):
+        with timer.stage("profile_text"):
+            profile_text = job_matcher.prepare_profile_text(profile, profile.skills, profile.experiences)
+        with timer.stage("score"):
+            matches = job_matcher.calculate_job_matches(profile_text, jobs, top_n=args.top_n)
+        with timer.stage("role_boost"):
+            boosted = job_matcher.apply_role_boost(matches, profile.desired_roles, titles)
+        raw_rankings[index] = [job_id for job_id, _score in matches]
+        boosted_rankings[index] = [job_id for job_id, _score in boosted]
+    elapsed = time.perf_counter() - started
+
+    return {
+        "users_per_sec": len(raw_rankings) / elapsed if elapsed else None,
+        "quality_raw": _quality(raw_rankings, jobs, profiles, counts, args.ndcg_k, args.top_n),
+        "quality_boosted": _quality(boosted_rankings, jobs, profiles, counts, args.ndcg_k, args.top_n),
+    }
+
+
+async def _bulk_insert(conn, model, rows):
+    for start in range(0, len(rows), INSERT_BATCH):
+        await conn.execute(insert(model), rows[start:start + INSERT_BATCH])
+
+
+async def run_database(args, jobs, profiles, counts, timer: StageTimer):
+    engine = create_app_async_engine(args.database_url)
+    try:
+        with timer.stage("load"):
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await conn.run_sync(Base.metadata.create_all)
+                await _bulk_insert(conn, Job, [
+                    {"id": job.id, "title": job.title, "company": job.company, "location": job.location,
+                     "description": job.description, "url": job.url, "source": "benchmark", "scraped_at": job.scraped_at}
+                    for job in jobs
+                ])
+                await _bulk_insert(conn, User, [
+                    {"supabase_id": p.id, "email": p.email, "is_active": True} for p in profiles
+                ])
+                await _bulk_insert(conn, Profile, [
+                    {"id": p.id, "first_name": p.first_name, "desired_roles": p.desired_roles,
+                     "desired_locations": p.desired_locations} for p in profiles
+                ])
+                await _bulk_insert(conn, Skill, [
+                    {"profile_id": p.id, "name": skill.name} for p in profiles for skill in p.skills
+                ])
+                await _bulk_insert(conn, Experience, [
+                    {"profile_id": p.id, "title": e.title, "company": e.company, "description": e.description}
+                    for p in profiles for e in p.experiences
+                ])
+        rows = len(jobs) + 2 * len(profiles) + sum(len(p.skills) + len(p.experiences) for p in profiles)
+        load_seconds = timer.samples["load"][-1]
+
+        # Point the app's session factory at the benchmark database
+        AsyncSessionLocal.configure(bind=engine)
+        evaluated = profiles[:args.eval_users]
+        started = time.perf_counter()
+        if args.all_users:
+            with timer.stage("match_all"):
+                await job_matcher.match_jobs_for_all_users()
+            evaluated = profiles
+        else:
+            for profile in evaluated:
+                with timer.stage("match_user"):
+                    await job_matcher.match_jobs_for_user(user_id=profile.id)
+        elapsed = time.perf_counter() - started
+
+        rankings = {}
+        async with AsyncSessionLocal() as db:
+            for index, profile in enumerate(evaluated[:args.eval_users]):
+                rankings[index] = list((await db.execute(
+                    select(UserJobMatch.job_id)
+                    .where(UserJobMatch.user_id == profile.id)
+                    .order_by(UserJobMatch.relevance_score.desc())
+                    .limit(args.top_n)
+                )).scalars().all())
+        return {
+            "load_rows_per_sec": rows / load_seconds if load_seconds else None,
+            "users_per_sec": len(evaluated) / elapsed if elapsed else None,
+            "match_job_limit": job_matcher.MATCH_JOB_LIMIT,
+            "quality": _quality(rankings, jobs, profiles, counts, args.ndcg_k, args.top_n),
+        }
+    finally:
+        await engine.dispose()
+
+
+def _print_quality(label: str, quality):
+    values = "  ".join(f"{key}={value:.4f}" if isinstance(value, float) else f"{key}={value}" for key, value in quality.items())
+    print(f"  {label:<24}{values}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=10000, help="Synthetic jobs (1k-1M)")
+    parser.add_argument("--users", type=int, default=100, help="Synthetic users/profiles (10-100k)")
+    parser.add_argument("--eval-users", type=int, default=200, help="Users scored and evaluated (0 = all)")
+    parser.add_argument("--fit-docs", type=int, default=50000, help="Job texts the vectorizer is fitted on (0 = all)")
+    parser.add_argument("--top-n", type=int, default=50, help="Matches kept per user; also the recall cutoff")
+    parser.add_argument("--ndcg-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", help="Also benchmark the DB-backed matcher against this (scratch) database")
+    parser.add_argument("--sqlite", action="store_true", help="Use a temporary SQLite database for the DB stage")
+    parser.add_argument("--all-users", action="store_true",
+                        help="Run match_jobs_for_all_users() (includes its 1s pause per user) instead of per-user matching")
+    parser.add_argument("--trace-memory", action="store_true", help="Record tracemalloc peaks per stage (slower)")
+    parser.add_argument("--json", dest="json_path", help="Write the results to this file")
+    args = parser.parse_args()
+
+    if not args.eval_users:
+        args.eval_users = args.users
+    if args.sqlite and not args.database_url:
+        args.database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='intelliapply-bench-'), 'bench.db')}"
+    if args.database_url and args.database_url == settings.DATABASE_URL:
+        parser.error("--database-url is the app's DATABASE_URL; the benchmark drops and recreates every table")
+
+    logging.basicConfig(level=logging.WARNING)
+    timer = StageTimer(trace_memory=args.trace_memory)
+    with timer.stage("generate"):
+        jobs = list(generate_jobs(args.jobs, args.seed))
+        profiles = list(generate_profiles(args.users, args.seed))
+        counts = label_counts(jobs)
+    print(f"Corpus: {len(jobs)} jobs, {len(profiles)} users (seed {args.seed}); evaluating {min(args.eval_users, len(profiles))} users")
+
+    results = {"config": vars(args), "in_memory": run_in_memory(args, jobs, profiles, counts, timer)}
+    if args.database_url:
+        print(f"Database stage: {args.database_url}")
+        results["database"] = await run_database(args, jobs, profiles, counts, timer)
+    results["stages"] = timer.report()
+    results["peak_rss_mb"] = peak_rss_mb()
+
+    print_report("Stage latency", results["stages"])
+    print("\nThroughput / quality")
+    print(f"  {'in-memory':<24}{results['in_memory']['users_per_sec']:.1f} users/sec")
+    _print_quality("in-memory (raw)", results["in_memory"]["quality_raw"])
+    _print_quality("in-memory (boosted)", results["in_memory"]["quality_boosted"])
+    if "database" in results:
+        database = results["database"]
+        print(f"  {'database load':<24}{database['load_rows_per_sec']:.0f} rows/sec")
+        print(f"  {'database match':<24}{database['users_per_sec']:.2f} users/sec (MATCH_JOB_LIMIT={database['match_job_limit']})")
+        _print_quality("database", database["quality"])
+    print(f"\nPeak RSS: {results['peak_rss_mb']:.1f} MB")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+        print(f"Results written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+"""
+Offline scrape benchmark: replays recorded fixtures through the Hacker News
+and WeWorkRemotely scrapers with simulated fetch latency and measures jobs/sec
+per source and how long the event loop was blocked while they ran.
+
+Fixtures come from SCRAPER_FIXTURE_DIR (record them with
+scripts/scrape_fixtures.py) or, with --synthetic, are generated into a
+temporary directory so the benchmark runs with no recordings and no network.
+
+Event-loop blocking is measured by a heartbeat task that wakes every
+--tick-ms; any lateness beyond one tick is time the loop spent stuck in a
+synchronous call (a fetch, a BeautifulSoup parse, a politeness sleep).
+
+Usage (from backend/):
+    python -m benchmarks.bench_scrapers --synthetic --latency-ms 200 --runs 3
+    python -m benchmarks.bench_scrapers --dir ./scrape_fixtures --latency-ms 150 --jitter-ms 50
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from app.core.config import settings
+from app.services import scrape_fixtures
+from app.services.hackernews_scraper import HN_JOBS_URL, scrape_hackernews_jobs
+from app.services.weworkremotely_scraper import WWR_JOBS_PAGE_URL, scrape_weworkremotely_jobs
+from benchmarks.metrics import mean, peak_rss_mb
+
+SCRAPERS = {
+    "hackernews": scrape_hackernews_jobs,
+    "weworkremotely": scrape_weworkremotely_jobs,
+}
+
+
+def write_synthetic_fixtures(directory: str, count: int = 30):
+    """Listing + detail pages shaped like the live sites, enough for each scraper's job cap."""
+    rows, items = [], []
+    for index in range(count):
+        item_url = f"https://news.ycombinator.com/item?id={40000000 + index}"
+        rows.append(f'<tr class="athing" id="{40000000 + index}"><td class="title">'
+                    f'<a href="item?id={40000000 + index}">Company{index} (YC S2{index % 10}) is hiring a senior engineer (Remote)</a>'
+                    f'</td></tr><tr><td class="subtext">{index} hours ago</td></tr>')
+        items.append((item_url, f"<html><body><div class='toptext'>Company{index} is hiring engineers in San Francisco, CA. "
+                                f"We use Python, React, Postgres and Kubernetes. " * 20 + "</div></body></html>"))
+    scrape_fixtures.save_fixture(scrape_fixtures.HTTP, HN_JOBS_URL,
+                                 f"<html><body><table>{''.join(rows)}</table></body></html>", directory=directory)
+    for url, body in items:
+        scrape_fixtures.save_fixture(scrape_fixtures.HTTP, url, body, directory=directory)
+
+    listings = "".join(
+        f'<li class="new-listing-container feature"><a href="/remote-jobs/company{index}-backend-engineer">'
+        f'<div class="new-listing"><h4 class="new-listing__header__title">Backend Engineer {index}</h4>'
+        f'<p class="new-listing__company-name">Company{index}</p>'
+        f'<p class="new-listing__company-headquarters">Remote, Anywhere</p>'
+        f'<div class="new-listing__categories"><p class="new-listing__categories__category">Full-Time</p>'
+        f'<p class="new-listing__categories__category">Anywhere in the World</p></div></div></a></li>'
+        for index in range(count)
+    )
+    scrape_fixtures.save_fixture(scrape_fixtures.FIRECRAWL, WWR_JOBS_PAGE_URL,
+                                 f'<html><body><section class="jobs" id="category-2"><ul>{listings}</ul></section></body></html>',
+                                 directory=directory)
+
+
+async def _heartbeat(tick: float, stalls: list, stop: asyncio.Event):
+    expected = time.perf_counter() + tick
+    while not stop.is_set():
+        await asyncio.sleep(tick)
+        now = time.perf_counter()
+        lateness = now - expected
+        if lateness > tick:
+            stalls.append(lateness)
+        expected = now + tick
+
+
+async def _timed(name: str, scraper, max_jobs: int, results: dict):
+    started = time.perf_counter()
+    jobs = await scraper(max_jobs)
+    results[name] = {"jobs": len(jobs), "seconds": time.perf_counter() - started}
+
+
+async def run_once(sources, max_jobs: int, tick: float):
+    stalls, results = [], {}
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(_heartbeat(tick, stalls, stop))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await asyncio.gather(*[_timed(name, SCRAPERS[name], max_jobs, results) for name in sources])
+    wall = time.perf_counter() - started
+    stop.set()
+    await monitor
+    return {"wall_seconds": wall, "sources": results, "blocked_seconds": sum(stalls),
+            "max_stall_ms": max(stalls, default=0.0) * 1000, "stalls": len(stalls)}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", help="Fixture directory (default SCRAPER_FIXTURE_DIR)")
+    parser.add_argument("--synthetic", action="store_true", help="Generate fixtures into a temporary directory")
+    parser.add_argument("--sources", default="hackernews,weworkremotely")
+    parser.add_argument("--max-jobs", type=int, default=30)
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Simulated latency per fetch")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--tick-ms", type=float, default=5.0, help="Heartbeat interval for stall detection")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.synthetic:
+        settings.SCRAPER_FIXTURE_DIR = tempfile.mkdtemp(prefix="intelliapply-fixtures-")
+        write_synthetic_fixtures(settings.SCRAPER_FIXTURE_DIR)
+    elif args.dir:
+        settings.SCRAPER_FIXTURE_DIR = args.dir
+    settings.SCRAPER_FIXTURE_MODE = "replay"
+    settings.SCRAPER_REPLAY_LATENCY_MS = args.latency_ms
+    settings.SCRAPER_REPLAY_JITTER_MS = args.jitter_ms
+    sources = [source.strip() for source in args.sources.split(",") if source.strip() in SCRAPERS]
+
+    print(f"Replaying {', '.join(sources)} from {settings.SCRAPER_FIXTURE_DIR} "
+          f"({args.latency_ms:.0f}±{args.jitter_ms:.0f} ms per fetch, {args.runs} runs)")
+    runs = [await run_once(sources, args.max_jobs, args.tick_ms / 1000) for _ in range(args.runs)]
+
+    for name in sources:
+        jobs = mean(run["sources"][name]["jobs"] for run in runs)
+        seconds = mean(run["sources"][name]["seconds"] for run in runs)
+        print(f"  {name:<16}{jobs:>6.0f} jobs  {seconds:>8.2f} s  {jobs / seconds if seconds else 0:>8.1f} jobs/sec")
+    wall = mean(run["wall_seconds"] for run in runs)
+    blocked = mean(run["blocked_seconds"] for run in runs)
+    print(f"  {'all (concurrent)':<16}{'':>6}       {wall:>8.2f} s")
+    print(f"\nEvent loop blocked: {blocked:.2f} s of {wall:.2f} s ({100 * blocked / wall if wall else 0:.0f}%), "
+          f"longest stall {max(run['max_stall_ms'] for run in runs):.0f} ms")
+    print(f"Peak RSS: {peak_rss_mb():.1f} MB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
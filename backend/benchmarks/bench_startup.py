@@ -0,0 +1,144 @@
+"""
+Startup benchmark: import time and memory of the API process versus worker
+processes.
+
+Each target is imported in a fresh interpreter (--runs times) and reports:
+
+  import s     wall time of the imports
+  RSS MB       resident set size right after importing
+  peak MB      peak RSS (ru_maxrss)
+  modules      sys.modules entries
+  heavy        which of the heavy optional dependencies ended up imported
+
+Targets:
+  api          app.main (what uvicorn imports)
+  worker       run_task_worker (task handlers, scrapers, matcher)
+  worker-warm  run_task_worker plus the dependencies a worker loads on its
+               first scrape/match/resume parse (the cost deferred by lazy imports)
+
+With --importtime the packages that cost the most import time are listed
+(self time from `python -X importtime`, summed per top-level package).
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10 --importtime --json startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+HEAVY_MODULES = ("sklearn", "scipy", "numpy", "google.generativeai", "firecrawl", "bs4", "requests", "pypdf", "docx")
+
+TARGETS = {
+    "api": ["app.main"],
+    "worker": ["run_task_worker"],
+    "worker-warm": ["run_task_worker", "sklearn.feature_extraction.text", "sklearn.metrics.pairwise",
+                    "scipy.sparse", "bs4", "requests", "firecrawl", "google.generativeai"],
+}
+
+# Runs in the child interpreter; prints one JSON line
+PROBE = """
+import importlib, json, os, resource, sys, time
+modules = sys.argv[1:]
+started = time.perf_counter()
+missing = []
+for name in modules:
+    try:
+        importlib.import_module(name)
+    except ImportError as e:
+        if name == modules[0]:
+            raise
+        missing.append(name)
+elapsed = time.perf_counter() - started
+rss_kb = 0
+if os.path.exists("/proc/self/status"):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss_kb = int(line.split()[1])
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+heavy = sorted(name for name in HEAVY if name in sys.modules)
+print(json.dumps({"seconds": elapsed, "rss_mb": rss_kb / 1024 or peak_mb, "peak_mb": peak_mb,
+                  "modules": len(sys.modules), "heavy": heavy, "missing": missing}))
+"""
+
+
+def _child_env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [backend_dir, env.get("PYTHONPATH")]))
+    # Keep the probe's stdout clean and skip work that isn't import cost
+    env.setdefault("LOG_LEVEL", "ERROR")
+    env.setdefault("TRACING_EXPORTER", "")
+    return env
+
+
+def probe(modules, env) -> dict:
+    code = f"HEAVY = {HEAVY_MODULES!r}\n" + PROBE
+    result = subprocess.run([sys.executable, "-c", code, *modules], cwd=backend_dir, env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {modules[0]} failed:\n{result.stderr.strip()[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(modules, env, top: int = 15):
+    """(seconds, top-level package) of the packages with the most import self time, from -X importtime."""
+    code = "import importlib, sys\nfor name in sys.argv[1:]:\n    try: importlib.import_module(name)\n    except ImportError: pass\n"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code, *modules], cwd=backend_dir, env=env,
+                            capture_output=True, text=True)
+    per_package = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _cumulative_us, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        per_package[package] = per_package.get(package, 0) + int(self_us) / 1e6
+    return sorted(((seconds, package) for package, seconds in per_package.items()), reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", default=",".join(TARGETS))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true", help="List the slowest imports per target")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    env = _child_env()
+    results = {}
+    print(f"{'target':<14}{'import s':>10}{'RSS MB':>10}{'peak MB':>10}{'modules':>10}  heavy")
+    for target in [name.strip() for name in args.targets.split(",") if name.strip() in TARGETS]:
+        runs = [probe(TARGETS[target], env) for _ in range(args.runs)]
+        summary = {
+            "seconds_median": statistics.median(run["seconds"] for run in runs),
+            "seconds_min": min(run["seconds"] for run in runs),
+            "rss_mb": statistics.median(run["rss_mb"] for run in runs),
+            "peak_mb": statistics.median(run["peak_mb"] for run in runs),
+            "modules": runs[-1]["modules"],
+            "heavy": runs[-1]["heavy"],
+            "missing": runs[-1]["missing"],
+        }
+        results[target] = summary
+        print(f"{target:<14}{summary['seconds_median']:>10.2f}{summary['rss_mb']:>10.1f}{summary['peak_mb']:>10.1f}"
+              f"{summary['modules']:>10}  {', '.join(summary['heavy']) or '-'}"
+              + (f"  (not installed: {', '.join(summary['missing'])})" if summary["missing"] else ""))
+        if args.importtime:
+            summary["slowest_imports"] = slowest_imports(TARGETS[target], env)
+            for seconds, name in summary["slowest_imports"]:
+                print(f"    {seconds:>8.3f} s  {name}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Synthetic job and profile corpora with ground-truth relevance.
+
+Every job and profile is drawn from one role family (backend, data science,
+design, ...) at one seniority level. A job is relevant to a profile when they
+share a family (grade 1) and more so when the seniority matches too (grade 2),
+which gives NDCG/recall something to measure without hand-labelled data.
+Descriptions mix family vocabulary with generic filler and a few terms from
+other families so the ranking isn't trivially separable.
+
+Generation is deterministic for a given seed, so runs at the same scale are
+comparable across commits.
+"""
+
+import random
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, List
+
+FAMILIES = {
+    "backend": {
+        "titles": ["Backend Engineer", "Software Engineer", "Python Developer", "API Engineer"],
+        "skills": ["python", "django", "fastapi", "postgresql", "redis", "docker", "kubernetes", "rest", "grpc", "aws"],
+        "phrases": ["design and operate scalable services", "own our public API", "improve database performance",
+                    "build distributed systems", "write well-tested server code"],
+    },
+    "frontend": {
+        "titles": ["Frontend Engineer", "React Developer", "UI Engineer", "Web Developer"],
+        "skills": ["javascript", "typescript", "react", "nextjs", "css", "html", "redux", "webpack", "accessibility", "jest"],
+        "phrases": ["build responsive user interfaces", "ship features across the web app",
+                    "own the component library", "improve page load performance", "work closely with designers"],
+    },
+    "data": {
+        "titles": ["Data Scientist", "Machine Learning Engineer", "Data Analyst", "ML Researcher"],
+        "skills": ["python", "pandas", "numpy", "scikit-learn", "pytorch", "tensorflow", "sql", "statistics", "spark", "airflow"],
+        "phrases": ["train and evaluate models", "build data pipelines", "run experiments and a/b tests",
+                    "turn data into product insight", "deploy machine learning to production"],
+    },
+    "devops": {
+        "titles": ["DevOps Engineer", "Site Reliability Engineer", "Platform Engineer", "Cloud Engineer"],
+        "skills": ["terraform", "kubernetes", "docker", "aws", "gcp", "linux", "prometheus", "ansible", "ci/cd", "bash"],
+        "phrases": ["keep production reliable", "automate infrastructure", "run the on-call rotation",
+                    "own our observability stack", "reduce cloud spend"],
+    },
+    "mobile": {
+        "titles": ["iOS Engineer", "Android Engineer", "Mobile Developer", "React Native Developer"],
+        "skills": ["swift", "kotlin", "objective-c", "java", "react native", "flutter", "xcode", "gradle", "firebase", "graphql"],
+        "phrases": ["ship our mobile apps", "build native features", "improve app startup time",
+                    "own the release process for the app stores", "polish the mobile experience"],
+    },
+    "design": {
+        "titles": ["Product Designer", "UX Designer", "UI Designer", "Design Lead"],
+        "skills": ["figma", "sketch", "prototyping", "user research", "design systems", "illustrator", "wireframing",
+                   "usability testing", "interaction design", "typography"],
+        "phrases": ["craft delightful experiences", "run user research", "own the design system",
+                    "prototype new product ideas", "partner with engineering and product"],
+    },
+    "product": {
+        "titles": ["Product Manager", "Technical Product Manager", "Product Owner", "Group Product Manager"],
+        "skills": ["roadmapping", "analytics", "jira", "stakeholder management", "sql", "user stories", "okrs",
+                   "market research", "prioritization", "experimentation"],
+        "phrases": ["own the product roadmap", "define and track success metrics", "talk to customers every week",
+                    "lead cross-functional teams", "write clear product specs"],
+    },
+    "security": {
+        "titles": ["Security Engineer", "Application Security Engineer", "Penetration Tester", "Security Analyst"],
+        "skills": ["threat modeling", "owasp", "siem", "incident response", "cryptography", "burp suite", "iam",
+                   "vulnerability management", "soc2", "network security"],
+        "phrases": ["secure our platform", "respond to security incidents", "review code for vulnerabilities",
+                    "run the bug bounty program", "harden cloud infrastructure"],
+    },
+}
+
+SENIORITIES = ["Junior", "Mid-level", "Senior", "Staff"]
+LOCATIONS = ["Remote", "New York, NY", "San Francisco, CA", "London, UK", "Berlin, Germany", "Toronto, Canada",
+             "Austin, TX", "Bangalore, India"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises", "Vandelay",
+             "Soylent", "Tyrell", "Cyberdyne", "Wonka"]
+FILLER = ["we are a fast-growing team", "competitive salary and equity", "flexible working hours",
+          "great benefits and learning budget", "join a mission-driven company", "collaborative culture",
+          "hybrid or remote options", "inclusive and diverse workplace"]
+
+
+@dataclass
+class SyntheticJob:
+    id: int
+    title: str
+    company: str
+    location: str
+    description: str
+    scraped_at: datetime
+    url: str
+    family: str
+    seniority: str
+
+
+@dataclass
+class SyntheticSkill:
+    name: str
+
+
+@dataclass
+class SyntheticExperience:
+    title: str
+    company: str
+    description: str
+
+
+@dataclass
+class SyntheticProfile:
+    id: uuid.UUID
+    email: str
+    first_name: str
+    desired_roles: str
+    desired_locations: str
+    family: str
+    seniority: str
+    skills: List[SyntheticSkill] = field(default_factory=list)
+    experiences: List[SyntheticExperience] = field(default_factory=list)
+
+
+def _description(rng: random.Random, family: str, seniority: str) -> str:
+    spec = FAMILIES[family]
+    others = [name for name in FAMILIES if name != family]
+    noise_family = FAMILIES[rng.choice(others)]
+    parts = [f"We are hiring a {seniority.lower()} engineer to {rng.choice(spec['phrases'])}."]
+    parts.append("Requirements: " + ", ".join(rng.sample(spec["skills"], 5)) + ".")
+    parts.append(f"You will {rng.choice(spec['phrases'])} and {rng.choice(spec['phrases'])}.")
+    parts.append("Nice to have: " + ", ".join(rng.sample(noise_family["skills"], 2)) + ".")
+    parts.append(" ".join(rng.sample(FILLER, 3)) + ".")
+    return " ".join(parts)
+
+
+def generate_jobs(count: int, seed: int = 0) -> Iterator[SyntheticJob]:
+    """Yield `count` jobs, newest first (ids 1..count, scraped_at descending)."""
+    rng = random.Random(seed)
+    families = list(FAMILIES)
+    newest = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for index in range(count):
+        family = rng.choice(families)
+        seniority = rng.choice(SENIORITIES)
+        job_id = index + 1
+        yield SyntheticJob(
+            id=job_id,
+            title=f"{seniority} {rng.choice(FAMILIES[family]['titles'])}",
+            company=rng.choice(COMPANIES),
+            location=rng.choice(LOCATIONS),
+            description=_description(rng, family, seniority),
+            scraped_at=newest - timedelta(seconds=index),
+            url=f"https://jobs.example.com/{job_id}",
+            family=family,
+            seniority=seniority,
+        )
+
+
+def generate_profiles(count: int, seed: int = 0) -> Iterator[SyntheticProfile]:
+    rng = random.Random(seed + 1)
+    families = list(FAMILIES)
+    for index in range(count):
+        family = rng.choice(families)
+        seniority = rng.choice(SENIORITIES)
+        spec = FAMILIES[family]
+        noise_family = FAMILIES[rng.choice(families)]
+        skills = rng.sample(spec["skills"], rng.randint(4, 8)) + rng.sample(noise_family["skills"], 1)
+        experiences = [
+            SyntheticExperience(
+                title=rng.choice(spec["titles"]),
+                company=rng.choice(COMPANIES),
+                description=f"{rng.choice(spec['phrases']).capitalize()} using {', '.join(rng.sample(spec['skills'], 3))}.",
+            )
+            for _ in range(rng.randint(1, 3))
+        ]
+        yield SyntheticProfile(
+            id=uuid.UUID(int=rng.getrandbits(128), version=4),
+            email=f"bench-user-{index}@example.com",
+            first_name=f"User{index}",
+            desired_roles=f"{seniority} {rng.choice(spec['titles'])}",
+            desired_locations=rng.choice(LOCATIONS),
+            family=family,
+            seniority=seniority,
+            skills=[SyntheticSkill(name=name) for name in dict.fromkeys(skills)],
+            experiences=experiences,
+        )
+
+
+def relevance(profile: SyntheticProfile, job: SyntheticJob) -> int:
+    """Ground-truth grade: 2 same family and seniority, 1 same family, 0 otherwise."""
+    if job.family != profile.family:
+        return 0
+    return 2 if job.seniority == profile.seniority else 1
+
+
+def label_counts(jobs: Iterable[SyntheticJob]) -> Counter:
+    """Jobs per (family, seniority), enough to derive any profile's ideal ranking."""
+    return Counter((job.family, job.seniority) for job in jobs)
+
+
+def ideal_grades(profile: SyntheticProfile, counts: Counter, k: int) -> List[int]:
+    """Best achievable grades for the top k, in descending order."""
+    exact = counts[(profile.family, profile.seniority)]
+    same_family = sum(n for (family, _seniority), n in counts.items() if family == profile.family) - exact
+    return ([2] * min(exact, k) + [1] * min(same_family, k))[:k]
+
+
+def total_relevant(profile: SyntheticProfile, counts: Counter) -> int:
+    return sum(n for (family, _seniority), n in counts.items() if family == profile.family)
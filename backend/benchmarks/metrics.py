@@ -0,0 +1,103 @@
+"""Timing, memory and ranking-metric helpers for the benchmarks."""
+
+import math
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence
+
+
+def ndcg_at_k(ranked_grades: Sequence[int], ideal_grades: Sequence[int], k: int) -> float:
+    """
+    NDCG@k with graded relevance (gain 2^grade - 1). `ranked_grades` are the
+    grades of the returned jobs in rank order, `ideal_grades` the best possible
+    grades in descending order. 0.0 when nothing is relevant.
+    """
+    dcg = sum((2 ** grade - 1) / math.log2(rank + 2) for rank, grade in enumerate(ranked_grades[:k]))
+    idcg = sum((2 ** grade - 1) / math.log2(rank + 2) for rank, grade in enumerate(ideal_grades[:k]))
+    return dcg / idcg if idcg else 0.0
+
+
+def recall_at_k(ranked_grades: Sequence[int], total_relevant: int, k: int, min_grade: int = 1) -> float:
+    """Fraction of relevant jobs (grade >= min_grade) found in the top k, out of at most k."""
+    if not total_relevant:
+        return 0.0
+    found = sum(1 for grade in ranked_grades[:k] if grade >= min_grade)
+    return found / min(total_relevant, k)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+    return {
+        "count": len(ordered),
+        "total_s": sum(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+class StageTimer:
+    """
+    Collects wall-clock samples per named stage. With trace_memory, also records
+    the tracemalloc peak (Python allocations only) inside each stage.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.samples: Dict[str, List[float]] = {}
+        self.memory_peaks_mb: Dict[str, float] = {}
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples.setdefault(name, []).append(time.perf_counter() - started)
+            if self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+                self.memory_peaks_mb[name] = max(peak, self.memory_peaks_mb.get(name, 0.0))
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        report = {name: summarize(samples) for name, samples in self.samples.items()}
+        for name, peak in self.memory_peaks_mb.items():
+            report[name]["peak_traced_mb"] = peak
+        return report
+
+
+def mean(values: Iterable[float]) -> Optional[float]:
+    values = list(values)
+    return statistics.fmean(values) if values else None
+
+
+def print_report(title: str, report: Dict[str, Dict[str, float]]):
+    print(f"\n{title}")
+    print(f"  {'stage':<24}{'count':>8}{'total s':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak MB':>10}")
+    for name, stats in report.items():
+        if not stats.get("count"):
+            continue
+        peak = stats.get("peak_traced_mb")
+        print(f"  {name:<24}{stats['count']:>8}{stats['total_s']:>10.2f}{stats['mean_ms']:>10.2f}"
+              f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+              f"{(f'{peak:.1f}' if peak is not None else '-'):>10}")
@@ -0,0 +1,74 @@
+"""
+Script to bulk-ingest resumes (e.g. onboarding a cohort of users).
+Parses every .pdf/.docx in a directory or .zip/.tar(.gz) archive and stores the
+extracted name, skills and experiences on the matching profiles.
+
+Each resume is matched to a profile via --manifest (CSV with `file` and
+`profile_id` columns), or else its file name must be the profile UUID
+(e.g. 3f1c...e2.pdf). The profile must already exist (it is created when the
+user signs up); resumes for unknown profiles are reported as unknown_profile.
+
+Usage:
+    python ingest_resumes.py <dir-or-archive> [--manifest cohort.csv]
+        [--concurrency 4] [--rpm 60] [--retries 3] [--batch-size 50]
+        [--no-cache] [--stub-llm [--stub-latency 0.5]]
+
+--stub-llm replaces Gemini with a local stub, for dry runs and load tests.
+"""
+
+import argparse
+import asyncio
+
+from app.core.logging_config import configure_logging
+from app.services.resume_ingest import IngestReport, StubLLM, collect_resumes, ingest_resumes, load_manifest
+from app.services.text_extraction import shutdown_extraction_pool
+
+async def main():
+    """Ingest a directory or archive of resumes"""
+    parser = argparse.ArgumentParser(description="Bulk-ingest resumes into profiles.")
+    parser.add_argument("path", help="Directory, .zip or .tar(.gz) of resumes")
+    parser.add_argument("--manifest", help="CSV mapping file -> profile_id")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent LLM calls")
+    parser.add_argument("--rpm", type=float, default=60, help="LLM requests per minute")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per LLM call")
+    parser.add_argument("--batch-size", type=int, default=50, help="Profiles per DB write batch")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the parsed-resume cache")
+    parser.add_argument("--stub-llm", action="store_true", help="Use a local stub instead of Gemini")
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="Simulated stub latency (seconds)")
+    args = parser.parse_args()
+
+    report = IngestReport()
+    manifest = load_manifest(args.manifest) if args.manifest else None
+    resumes = collect_resumes(args.path, manifest, report)
+    print(f"Ingesting resumes from {args.path}...")
+
+    try:
+        await ingest_resumes(
+            resumes,
+            report,
+            generate=StubLLM(latency=args.stub_latency) if args.stub_llm else None,
+            concurrency=args.concurrency,
+            requests_per_minute=args.rpm,
+            max_retries=args.retries,
+            batch_size=args.batch_size,
+            use_cache=not args.no_cache,
+        )
+    finally:
+        shutdown_extraction_pool()
+
+    summary = report.as_dict()
+    print(
+        f"\nIngested {summary['succeeded']}/{summary['total']} resumes in {summary['seconds']}s "
+        f"({summary['resumes_per_sec']} resumes/sec); cache hits: {summary['cache_hits']}, "
+        f"LLM calls: {summary['llm_calls']} ({summary['llm_retries']} retries)"
+    )
+    if summary["failures"]:
+        print("Failures by reason:")
+        for reason, count in sorted(summary["failures"].items(), key=lambda x: -x[1]):
+            print(f"  {reason:<20} {count}")
+        for source, reason in report.failed_sources[:20]:
+            print(f"    {reason:<18} {source}")
+
+if __name__ == "__main__":
+    configure_logging()
+    asyncio.run(main())
@@ -1,15 +1,56 @@
 """
 Database initialization script for IntelliApply.
-Run this script to create all required tables in the SQLite database.
+Brings the configured database (DATABASE_URL) to the latest Alembic revision,
+i.e. `alembic upgrade head`. Run it on deploy (the Dockerfile does); the API
+never touches the schema unless AUTO_CREATE_SCHEMA=true (local development).
+
+Databases created before the switch to Alembic (by the old create_all here or
+supabase_schema.sql) have tables but no alembic_version. They are brought up
+to the baseline by hand and then stamped, so only later migrations run
+against them: missing tables are created, duplicate skills are removed (as in
+supabase_schema.sql) and any index of the baseline that an existing table
+lacks, such as uq_skills_profile_lower_name, is created.
 """
 
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, text
+
 from app.db.database import Base, engine
 from app.db.models import User, Profile, Skill, Experience, Job, UserJobMatch
 
+BASELINE_REVISION = "0001"
+
+def alembic_config() -> Config:
+    return Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini"))
+
+def adopt_existing_schema():
+    """Make a pre-Alembic database match the baseline revision (idempotent)."""
+    Base.metadata.create_all(bind=engine) # Only creates tables that don't exist yet
+    with engine.begin() as conn:
+        # The unique (profile_id, lower(name)) index can't be built over duplicates; keep the oldest row
+        removed = conn.execute(text(
+            "DELETE FROM skills WHERE id NOT IN (SELECT MIN(id) FROM skills GROUP BY profile_id, lower(name))"
+        )).rowcount
+        if removed:
+            print(f"Removed {removed} duplicate skills.")
+        # create_all skips existing tables, indexes included
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
 def init_db():
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("Database tables created successfully!")
+    config = alembic_config()
+    tables = set(inspect(engine).get_table_names())
+    if "alembic_version" not in tables and "users" in tables:
+        print("Existing schema without Alembic history; bringing it to the baseline and stamping it...")
+        adopt_existing_schema()
+        command.stamp(config, BASELINE_REVISION)
+    print("Upgrading database schema to the latest revision...")
+    command.upgrade(config, "head")
+    print("Database schema is up to date!")
 
 if __name__ == "__main__":
     init_db()
@@ -0,0 +1,30 @@
+"""
+Script to run the job matching pass for all users across several processes.
+Users are partitioned into shards by id; each shard process memory-maps a shared
+snapshot of the job vectors. Reports throughput in users/sec.
+
+Usage: python run_sharded_matching.py [--shards N]
+"""
+
+import argparse
+import asyncio
+
+from app.core.logging_config import configure_logging
+from app.services.sharded_matcher import match_jobs_for_all_users_sharded
+
+async def main():
+    """Run sharded job matching for all users"""
+    parser = argparse.ArgumentParser(description="Run sharded job matching for all users.")
+    parser.add_argument("--shards", type=int, default=None, help="Number of shard processes (default: MATCH_SHARDS or CPU count)")
+    args = parser.parse_args()
+
+    print("Starting sharded job matching process...")
+    result = await match_jobs_for_all_users_sharded(args.shards)
+    print(
+        f"Sharded job matching completed: {result['users']} users in {result['seconds']}s "
+        f"({result['users_per_sec']} users/sec across {result['shards']} shards, {result['errors']} errors)"
+    )
+
+if __name__ == "__main__":
+    configure_logging()
+    asyncio.run(main())
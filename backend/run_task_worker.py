@@ -0,0 +1,35 @@
+"""
+Script to run a background task worker.
+Processes queued refresh tasks (scrape + match) outside the API process, so heavy
+work never competes with request latency. Run as many as needed; workers share
+the queue safely. Set TASK_QUEUE_EMBEDDED_WORKER=false on the API when using this.
+"""
+
+import asyncio
+import signal
+
+from app.core.logging_config import configure_logging
+configure_logging()
+
+from app.core.tracing import instrument_engine_tracing, shutdown_tracing
+from app.db.database import async_engine
+from app.services.task_queue import TaskWorker
+from app.services.tasks import TASK_HANDLERS
+
+async def main():
+    """Run a task worker until interrupted"""
+    instrument_engine_tracing(async_engine.sync_engine)
+    worker = TaskWorker(TASK_HANDLERS)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError: # Windows
+            pass
+    print("Starting task worker...")
+    await worker.run()
+    shutdown_tracing()
+    print("Task worker stopped.")
+
+if __name__ == "__main__":
+    asyncio.run(main())
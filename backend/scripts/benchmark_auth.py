@@ -0,0 +1,108 @@
+"""
+Benchmark the per-request overhead of the auth dependency (get_current_user).
+
+Signs a token locally with a throwaway RSA key and serves the public key from a
+temporary JWKS file (so no Neon Auth round trip is involved) for an existing
+user in the configured database, then times:
+  - cold: claims + user caches cleared before every call (old behaviour:
+    key lookup, signature verification and a users-table query per request)
+  - warm: caches left in place (repeated dashboard calls with the same token)
+
+Usage:
+    python scripts/benchmark_auth.py [--iterations 500] [--supabase-id <uuid>]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.core import supabase_auth
+from app.core.jwks import JWKSKeyStore
+from app.db.database import SessionLocal, AsyncSessionLocal
+from app.db.models import User
+
+
+class _FakeRequest:
+    def __init__(self, token: str):
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+
+async def _time_calls(request, iterations: int, clear_caches: bool) -> list[float]:
+    timings = []
+    for _ in range(iterations):
+        if clear_caches:
+            supabase_auth._claims_cache.clear()
+            supabase_auth._user_cache.clear()
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            await supabase_auth.get_current_user(request, db)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _report(label: str, timings: list[float]):
+    timings_ms = sorted(t * 1000 for t in timings)
+    p95 = timings_ms[int(len(timings_ms) * 0.95) - 1]
+    print(
+        f"{label:<6} mean={statistics.mean(timings_ms):.3f}ms "
+        f"median={statistics.median(timings_ms):.3f}ms p95={p95:.3f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--supabase-id", help="User to authenticate as (defaults to the first user with a supabase_id)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        query = db.query(User).filter(User.supabase_id.isnot(None))
+        if args.supabase_id:
+            query = query.filter(User.supabase_id == args.supabase_id)
+        user = query.first()
+    finally:
+        db.close()
+    if not user:
+        print("No user with a supabase_id found in the database. Log in once through the app first.")
+        return
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": "benchmark", "alg": "RS256", "use": "sig"})
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as jwks_file:
+        json.dump({"keys": [jwk]}, jwks_file)
+
+    token = jwt.encode(
+        {"sub": str(user.supabase_id), "email": user.email, "exp": int(time.time()) + 3600},
+        private_key,
+        algorithm="RS256",
+        headers={"kid": "benchmark"},
+    )
+    supabase_auth.jwks_store = JWKSKeyStore(supabase_auth.JWKS_URL, file_path=jwks_file.name)
+    await supabase_auth.jwks_store.refresh()
+    request = _FakeRequest(token)
+
+    print(f"Benchmarking get_current_user for {user.email} over {args.iterations} iterations")
+    cold = await _time_calls(request, args.iterations, clear_caches=True)
+    warm = await _time_calls(request, args.iterations, clear_caches=False)
+    _report("cold", cold)
+    _report("warm", warm)
+    print(f"speedup (mean): {statistics.mean(cold) / statistics.mean(warm):.1f}x")
+    os.unlink(jwks_file.name)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
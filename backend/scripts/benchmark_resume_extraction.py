@@ -0,0 +1,104 @@
+"""
+Benchmark resume text extraction (pypdf / python-docx) through the process pool.
+
+Runs every .pdf/.docx in the corpus directories (default: the repo's sample
+resume.pdf and backend/uploads) through extract_resume_text, repeated
+--repeat times to build a larger corpus, with --concurrency extractions in
+flight. Reports files/sec, pages/sec and peak RSS of this process and of the
+pool workers.
+
+Usage:
+    python scripts/benchmark_resume_extraction.py [corpus_dir ...] [--repeat 20]
+        [--concurrency 8] [--workers 2] [--inline]
+
+--inline runs the extractor in this process on the event loop thread (the
+old behaviour) for comparison.
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import time
+
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from app.core.config import settings
+from app.services import text_extraction
+
+DEFAULT_CORPUS = [os.path.join(backend_dir, "..", "resume.pdf"), os.path.join(backend_dir, "uploads")]
+
+
+def _collect(paths):
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            files.append(path)
+            continue
+        for root, _dirs, names in os.walk(path):
+            files.extend(os.path.join(root, name) for name in names if name.lower().endswith((".pdf", ".docx")))
+    return sorted(set(os.path.abspath(f) for f in files))
+
+
+def _peak_rss_mb(who) -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="*", default=DEFAULT_CORPUS)
+    parser.add_argument("--repeat", type=int, default=20, help="Passes over the corpus")
+    parser.add_argument("--concurrency", type=int, default=8, help="Extractions in flight")
+    parser.add_argument("--workers", type=int, default=None, help="Override RESUME_EXTRACT_WORKERS")
+    parser.add_argument("--inline", action="store_true", help="Extract on the event loop thread instead of the pool")
+    args = parser.parse_args()
+
+    files = _collect(args.corpus)
+    if not files:
+        parser.error("No .pdf/.docx files found in the corpus")
+    if args.workers:
+        settings.RESUME_EXTRACT_WORKERS = args.workers
+    corpus = [(path, open(path, "rb").read(), path.rsplit(".", 1)[-1].lower()) for path in files]
+    jobs = corpus * args.repeat
+
+    pages = 0
+    chars = 0
+    failures = 0
+    lock = asyncio.Semaphore(args.concurrency)
+
+    async def run_one(file_bytes: bytes, ext: str):
+        nonlocal pages, chars, failures
+        async with lock:
+            if args.inline:
+                try:
+                    text, n = text_extraction.extract_text_sync(file_bytes, ext, settings.RESUME_MAX_PAGES, 0)
+                except Exception:
+                    text, n = "", 0
+            else:
+                text, n = await text_extraction.extract_resume_text_with_pages(file_bytes, ext)
+        if not text:
+            failures += 1
+        pages += n
+        chars += len(text)
+
+    mode = "inline" if args.inline else f"pool ({settings.RESUME_EXTRACT_WORKERS} workers)"
+    print(f"Extracting {len(jobs)} files ({len(corpus)} unique x {args.repeat}) in {mode}, concurrency {args.concurrency}")
+    started = time.perf_counter()
+    await asyncio.gather(*[run_one(file_bytes, ext) for _path, file_bytes, ext in jobs])
+    elapsed = time.perf_counter() - started
+    text_extraction.shutdown_extraction_pool()
+
+    print(f"\nFiles:    {len(jobs)} in {elapsed:.2f}s -> {len(jobs) / elapsed:.1f} files/sec ({failures} failed)")
+    print(f"Pages:    {pages} -> {pages / elapsed:.1f} pages/sec")
+    print(f"Text:     {chars / 1e6:.1f}M chars")
+    print(f"Peak RSS: {_peak_rss_mb(resource.RUSAGE_SELF):.1f} MB (this process), "
+          f"{_peak_rss_mb(resource.RUSAGE_CHILDREN):.1f} MB (largest pool worker)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
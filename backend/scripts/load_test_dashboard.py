@@ -0,0 +1,98 @@
+"""
+Load test for the dashboard read path.
+
+Simulates concurrent dashboard renders against a running API: each virtual
+user repeatedly fetches /api/profile, /api/jobs/matched and /api/jobs/counts
+(the calls the dashboard makes on load) and the script reports requests per
+second and latency percentiles per route.
+
+Pass --no-cache-headers to skip If-None-Match, so every response carries a
+full body (the 304 path is measured by default, as a browser would use it).
+
+Usage:
+    python scripts/load_test_dashboard.py --token <JWT> [--base-url http://localhost:8000]
+        [--concurrency 50] [--duration 30]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections import defaultdict
+
+import httpx
+
+DASHBOARD_ROUTES = ["/api/profile", "/api/jobs/matched", "/api/jobs/counts"]
+
+
+async def _virtual_user(client: httpx.AsyncClient, deadline: float, use_etags: bool, latencies: dict, errors: dict):
+    etags = {}
+    while time.perf_counter() < deadline:
+        for route in DASHBOARD_ROUTES:
+            headers = {"If-None-Match": etags[route]} if use_etags and route in etags else {}
+            start = time.perf_counter()
+            try:
+                response = await client.get(route, headers=headers)
+            except httpx.HTTPError as e:
+                errors[type(e).__name__] += 1
+                continue
+            latencies[route].append(time.perf_counter() - start)
+            if response.status_code not in (200, 304):
+                errors[f"HTTP {response.status_code}"] += 1
+            elif "etag" in response.headers:
+                etags[route] = response.headers["etag"]
+
+
+def _percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct))]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=os.getenv("API_BASE_URL", "http://localhost:8000"))
+    parser.add_argument("--token", default=os.getenv("API_TOKEN"), help="Bearer token for a test user")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--no-cache-headers", action="store_true", help="Don't send If-None-Match")
+    args = parser.parse_args()
+
+    if not args.token:
+        parser.error("--token (or API_TOKEN) is required")
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.base_url,
+        headers={"Authorization": f"Bearer {args.token}"},
+        limits=limits,
+        timeout=30.0,
+    ) as client:
+        print(f"Running {args.concurrency} virtual users for {args.duration:.0f}s against {args.base_url}")
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*[
+            _virtual_user(client, deadline, not args.no_cache_headers, latencies, errors)
+            for _ in range(args.concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"\nTotal: {total} requests in {elapsed:.1f}s -> {total / elapsed:.1f} req/s")
+    for route in DASHBOARD_ROUTES:
+        values = sorted(t * 1000 for t in latencies[route])
+        if not values:
+            print(f"{route:<20} no successful requests")
+            continue
+        print(
+            f"{route:<20} n={len(values):<6} rps={len(values) / elapsed:7.1f} "
+            f"mean={statistics.mean(values):7.1f}ms p50={_percentile(values, 0.50):7.1f}ms "
+            f"p95={_percentile(values, 0.95):7.1f}ms p99={_percentile(values, 0.99):7.1f}ms"
+        )
+    if errors:
+        print("Errors:", dict(errors))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""
+Manage scraper fixtures for SCRAPER_FIXTURE_MODE=replay.
+
+  record  run the enabled scrapers live with recording on (needs network and,
+          for WeWorkRemotely, FIRECRAWL_API_KEY)
+  import  store an existing HTML capture as the fixture for a URL, e.g. the
+          saved WeWorkRemotely page:
+              python scripts/scrape_fixtures.py import temp_wwr_content.html \\
+                  --kind firecrawl --url https://weworkremotely.com/categories/remote-programming-jobs
+  list    show the recorded fixtures
+
+Fixtures go to SCRAPER_FIXTURE_DIR unless --dir is given.
+
+Usage:
+    python scripts/scrape_fixtures.py {record,import,list} [--dir DIR] ...
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from app.core.config import settings
+from app.services import scrape_fixtures
+
+
+async def record(args):
+    from app.services.hackernews_scraper import scrape_hackernews_jobs
+    from app.services.weworkremotely_scraper import scrape_weworkremotely_jobs
+
+    settings.SCRAPER_FIXTURE_MODE = "record"
+    sources = [source.strip().lower() for source in (args.sources or settings.SCRAPER_SOURCES).split(",")]
+    if "hackernews" in sources:
+        jobs = await scrape_hackernews_jobs(args.max_jobs)
+        print(f"hackernews: {len(jobs)} jobs recorded")
+    if "weworkremotely" in sources:
+        jobs = await scrape_weworkremotely_jobs(args.max_jobs)
+        print(f"weworkremotely: {len(jobs)} jobs recorded")
+
+
+def import_capture(args):
+    with open(args.file, "r", encoding="utf-8", errors="replace") as f:
+        body = f.read()
+    path = scrape_fixtures.save_fixture(args.kind, args.url, body, status_code=args.status)
+    print(f"{args.file} -> {path} ({len(body)} chars)")
+
+
+def list_fixtures(_args):
+    directory = settings.SCRAPER_FIXTURE_DIR
+    for kind in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+        for name in sorted(os.listdir(os.path.join(directory, kind))):
+            with open(os.path.join(directory, kind, name), "r", encoding="utf-8") as f:
+                record_data = json.load(f)
+            print(f"{kind:<10}{record_data['status_code']:>5}  {len(record_data['body']):>8} chars  "
+                  f"{record_data['recorded_at'][:19]}  {record_data['url']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", help="Fixture directory (default SCRAPER_FIXTURE_DIR)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="Scrape live and record every response")
+    record_parser.add_argument("--sources", help="Comma-separated sources (default SCRAPER_SOURCES)")
+    record_parser.add_argument("--max-jobs", type=int, default=30)
+
+    import_parser = commands.add_parser("import", help="Store an HTML file as the fixture for a URL")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--url", required=True)
+    import_parser.add_argument("--kind", choices=[scrape_fixtures.HTTP, scrape_fixtures.FIRECRAWL], default=scrape_fixtures.HTTP)
+    import_parser.add_argument("--status", type=int, default=200)
+
+    commands.add_parser("list", help="List recorded fixtures")
+    args = parser.parse_args()
+
+    if args.dir:
+        settings.SCRAPER_FIXTURE_DIR = args.dir
+    if args.command == "record":
+        asyncio.run(record(args))
+    elif args.command == "import":
+        import_capture(args)
+    else:
+        list_fixtures(args)
+
+
+if __name__ == "__main__":
+    main()
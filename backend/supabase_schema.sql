@@ -71,6 +71,10 @@ CREATE TABLE IF NOT EXISTS public.skills (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     UNIQUE (profile_id, name)
 );
+-- One skill per name per profile (case-insensitive); drop existing duplicates first
+DELETE FROM public.skills a USING public.skills b
+    WHERE a.profile_id = b.profile_id AND lower(a.name) = lower(b.name) AND a.id > b.id;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_skills_profile_lower_name ON public.skills(profile_id, lower(name));
 
 -- Create experiences table
 CREATE TABLE IF NOT EXISTS experiences (
@@ -97,6 +101,38 @@ CREATE TABLE IF NOT EXISTS user_job_matches (
     UNIQUE (user_id, job_id)
 );
 
+-- Composite index for the dashboard status counts (single GROUP BY per user)
+CREATE INDEX IF NOT EXISTS idx_user_job_matches_user_status ON public.user_job_matches(user_id, status);
+
+-- Durable background task queue (claimed by workers with FOR UPDATE SKIP LOCKED)
+CREATE TABLE IF NOT EXISTS public.task_queue (
+    id VARCHAR(32) PRIMARY KEY,
+    kind TEXT NOT NULL,
+    user_id UUID,
+    payload JSON,
+    state TEXT NOT NULL DEFAULT 'queued' CHECK (state IN ('queued', 'running', 'done')),
+    status TEXT NOT NULL DEFAULT 'pending',
+    message TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_after TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    locked_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE
+);
+CREATE INDEX IF NOT EXISTS idx_task_queue_kind ON public.task_queue(kind);
+CREATE INDEX IF NOT EXISTS idx_task_queue_user_id ON public.task_queue(user_id);
+CREATE INDEX IF NOT EXISTS idx_task_queue_state_run_after ON public.task_queue(state, run_after);
+
+-- Last run of each periodic job (shared across scheduler replicas)
+CREATE TABLE IF NOT EXISTS public.scheduler_runs (
+    name TEXT PRIMARY KEY,
+    owner TEXT,
+    started_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE,
+    status TEXT
+);
+
 -- Row Level Security Policies
 
 -- RLS for profiles (users can only read/modify their own profile)
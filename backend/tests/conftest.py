@@ -0,0 +1,44 @@
+"""
+Test setup: the app is pointed at a throwaway SQLite database (via aiosqlite)
+before anything under app/ is imported, and every test starts from empty tables.
+
+Run from backend/:
+    python -m pytest tests
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, backend_dir)
+
+_db_dir = tempfile.mkdtemp(prefix="intelliapply-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.setdefault("TRACING_EXPORTER", "")
+
+from sqlalchemy import event  # noqa: E402
+
+from app.db.database import Base, async_engine, engine  # noqa: E402
+import app.db.models  # noqa: E402,F401  (registers the tables on Base)
+
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def _sqlite_connect(dbapi_connection, _record):
+    # Let SQLAlchemy emit BEGIN itself so SAVEPOINTs (begin_nested) behave as on Postgres
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(async_engine.sync_engine, "begin")
+def _sqlite_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture(autouse=True)
+def database():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield
+    Base.metadata.drop_all(engine)
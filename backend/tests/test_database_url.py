@@ -0,0 +1,31 @@
+"""DATABASE_URL -> async engine URL and connect_args."""
+
+import ssl
+
+import pytest
+
+from app.db.database import _to_async_url
+
+
+@pytest.mark.parametrize("sslmode", ["disable", "prefer", "require", "verify-ca", "verify-full"])
+def test_sslmode_is_passed_through(sslmode):
+    url, connect_args = _to_async_url(f"postgresql://user:pw@db.example.com/app?sslmode={sslmode}&channel_binding=require")
+
+    assert url.render_as_string(hide_password=False) == "postgresql+asyncpg://user:pw@db.example.com/app"
+    assert connect_args == {"ssl": sslmode}
+
+
+def test_verify_full_with_root_cert_checks_hostname():
+    certifi = pytest.importorskip("certifi") # Any PEM bundle will do as the root cert
+    _url, connect_args = _to_async_url(f"postgresql://db.example.com/app?sslmode=verify-full&sslrootcert={certifi.where()}")
+
+    context = connect_args["ssl"]
+    assert context.verify_mode == ssl.CERT_REQUIRED
+    assert context.check_hostname
+
+
+def test_sqlite_path_keeps_its_slashes():
+    url, connect_args = _to_async_url("sqlite:////tmp/bench/bench.db")
+
+    assert str(url) == "sqlite+aiosqlite:////tmp/bench/bench.db"
+    assert connect_args == {}
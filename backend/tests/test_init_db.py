@@ -0,0 +1,46 @@
+"""init_db() adopts a database created by the pre-Alembic create_all."""
+
+import pytest
+from sqlalchemy import inspect, text
+
+import init_db
+from app.db.database import Base, engine
+
+
+@pytest.fixture
+def old_schema():
+    # What the old init_db.py produced before the case-insensitive skill index existed
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX uq_skills_profile_lower_name"))
+        conn.execute(text("DROP INDEX idx_user_job_matches_user_status"))
+        conn.execute(text("INSERT INTO profiles (id) VALUES ('0000000000000000000000000000000a')"))
+        for name in ("Python", "python ", "python", "SQL"):
+            conn.execute(text("INSERT INTO skills (profile_id, name) VALUES ('0000000000000000000000000000000a', :name)"), {"name": name})
+    Base.metadata.tables["scheduler_runs"].drop(engine)
+    yield
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+
+
+def test_init_db_adopts_old_schema(old_schema):
+    init_db.init_db()
+
+    inspector = inspect(engine)
+    assert "scheduler_runs" in inspector.get_table_names()
+    with engine.connect() as conn:
+        # SQLite reflection skips expression indexes, so look in the catalog
+        indexes = set(conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+        assert {"uq_skills_profile_lower_name", "idx_user_job_matches_user_status"} <= indexes
+        assert conn.execute(text("SELECT version_num FROM alembic_version")).scalar() == init_db.BASELINE_REVISION
+        # The oldest of the case-insensitive duplicates survives; "python " differs by whitespace and stays
+        assert sorted(conn.execute(text("SELECT name FROM skills")).scalars()) == ["Python", "SQL", "python "]
+        with pytest.raises(Exception, match="UNIQUE"):
+            conn.execute(text("INSERT INTO skills (profile_id, name) VALUES ('0000000000000000000000000000000a', 'sql')"))
+
+
+def test_init_db_is_idempotent(old_schema):
+    init_db.init_db()
+    init_db.init_db()
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT version_num FROM alembic_version")).scalar() == init_db.BASELINE_REVISION
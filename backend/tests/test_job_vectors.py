@@ -0,0 +1,31 @@
+"""Old job vector snapshots are removed without touching another process's build."""
+
+import json
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.services import job_vectors
+
+
+@pytest.fixture
+def vector_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_VECTOR_DIR", str(tmp_path))
+    for name in ("published", "ours", "other"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "meta.json").write_text("{}")
+    (tmp_path / "current.json").write_text(json.dumps({"dir": "published"}))
+    return tmp_path
+
+
+def test_cleanup_without_build_lock_keeps_recent_directories(vector_dir):
+    job_vectors._remove_old_snapshots(keep=str(vector_dir / "ours"), exclusive=False)
+
+    assert sorted(os.listdir(vector_dir)) == ["current.json", "other", "ours", "published"]
+
+
+def test_cleanup_under_build_lock_keeps_only_published_and_new(vector_dir):
+    job_vectors._remove_old_snapshots(keep=str(vector_dir / "ours"), exclusive=True)
+
+    assert sorted(os.listdir(vector_dir)) == ["current.json", "ours", "published"]
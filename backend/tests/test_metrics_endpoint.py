@@ -0,0 +1,44 @@
+"""/metrics is off by default, needs METRICS_TOKEN as a bearer token when set, and caches queue depth."""
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.main import app
+from app.services import task_queue
+
+
+async def _get_metrics(headers=None) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get("/metrics", headers=headers or {})
+
+
+@pytest.mark.asyncio
+async def test_metrics_disabled_by_default():
+    assert settings.METRICS_ENABLED is False
+    assert (await _get_metrics()).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_metrics_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+
+    assert (await _get_metrics()).status_code == 401
+    assert (await _get_metrics({"Authorization": "Bearer wrong"})).status_code == 401
+    response = await _get_metrics({"Authorization": "Bearer s3cret"})
+    assert response.status_code == 200
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+
+
+@pytest.mark.asyncio
+async def test_queue_depth_is_cached(mocker):
+    depth = mocker.patch.object(task_queue, "queue_depth", mocker.AsyncMock(return_value={"queued": 3}))
+    task_queue._queue_metrics.update(at=0.0, families=None)
+
+    first = await task_queue.collect_queue_metrics()
+    second = await task_queue.collect_queue_metrics()
+
+    assert depth.await_count == 1
+    assert second is first
+    assert first[0].samples == [("task_queue_depth", {"state": "queued"}, 3)]
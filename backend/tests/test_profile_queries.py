@@ -0,0 +1,78 @@
+"""GET /api/profile loads the profile aggregate in a fixed number of statements."""
+
+import uuid
+from datetime import datetime
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+
+from app.core.cache import response_cache
+from app.core.supabase_auth import get_current_active_user
+from app.db.database import AsyncSessionLocal, async_engine
+from app.db.models import Experience, Profile, Skill, User
+from app.main import app
+from app.services.db_utils import PROFILE_AGGREGATE_STATEMENTS
+
+PROFILE_ID = uuid.UUID("00000000-0000-0000-0000-0000000000aa")
+
+
+@pytest_asyncio.fixture
+async def client():
+    app.dependency_overrides[get_current_active_user] = lambda: User(id=1, supabase_id=PROFILE_ID, email="ada@example.com", is_active=True)
+    await response_cache.invalidate_user(PROFILE_ID)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+    await response_cache.invalidate_user(PROFILE_ID)
+
+
+@pytest_asyncio.fixture
+async def seeded_profile():
+    async with AsyncSessionLocal() as db:
+        db.add(Profile(id=PROFILE_ID, first_name="Ada", last_name="Lovelace"))
+        db.add_all([Skill(profile_id=PROFILE_ID, name=f"skill-{i}") for i in range(40)])
+        db.add_all([
+            Experience(profile_id=PROFILE_ID, title=f"Engineer {i}", company=f"Company {i}",
+                       start_date=datetime(2010 + i, 1, 1), description="Built things.")
+            for i in range(12)
+        ])
+        await db.commit()
+
+
+@pytest.fixture
+def statements():
+    issued = []
+
+    def count(_conn, _cursor, statement, _parameters, _context, _executemany):
+        # The SQLite test engine emits BEGIN itself (see conftest); Postgres drivers don't go through a cursor for it
+        if statement != "BEGIN":
+            issued.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count)
+    yield issued
+    event.remove(async_engine.sync_engine, "before_cursor_execute", count)
+
+
+@pytest.mark.asyncio
+async def test_get_profile_statement_count(client, seeded_profile, statements):
+    response = await client.get("/api/profile")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["skills"]) == 40
+    assert len(body["experiences"]) == 12
+    # A lazy load sneaking back in shows up as an extra statement per collection (or per row)
+    assert len(statements) == PROFILE_AGGREGATE_STATEMENTS, "\n".join(statements)
+
+
+@pytest.mark.asyncio
+async def test_cached_profile_issues_no_statements(client, seeded_profile, statements):
+    await client.get("/api/profile")
+    statements.clear()
+
+    response = await client.get("/api/profile")
+
+    assert response.status_code == 200
+    assert statements == []
@@ -0,0 +1,89 @@
+"""In-process response cache: generation checks on write, and invalidation over the task_events channel."""
+
+import json
+import time
+
+import pytest
+
+from app.core.cache import CachedResponse, InMemoryResponseCache
+from app.services import task_events
+from app.services.task_events import CACHE_INVALIDATE_EVENT, TaskEventHub
+
+USER = "00000000-0000-0000-0000-0000000000aa"
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = InMemoryResponseCache(max_entries=10, ttl_seconds=60)
+    monkeypatch.setattr(task_events, "response_cache", cache)
+    return cache
+
+
+def _notify(hub: TaskEventHub, event: str, data: dict, task_id: str = ""):
+    hub._on_notify(None, 0, task_events.CHANNEL, json.dumps({"task_id": task_id, "event": event, "data": data}))
+
+
+@pytest.mark.asyncio
+async def test_notified_invalidation_drops_cached_responses(cache):
+    await _store(cache, USER, "jobs:counts")
+    await _store(cache, "someone-else", "jobs:counts")
+
+    _notify(TaskEventHub(), CACHE_INVALIDATE_EVENT, {"user_id": USER})
+
+    assert (await cache.get(USER, "jobs:counts"))[0] is None
+    assert (await cache.get("someone-else", "jobs:counts"))[0] is not None
+
+
+@pytest.mark.asyncio
+async def test_invalidation_is_not_delivered_to_task_subscribers(cache):
+    hub = TaskEventHub()
+    queue = await _subscribe_without_listening(hub, "")
+
+    _notify(hub, CACHE_INVALIDATE_EVENT, {"user_id": USER})
+
+    assert queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_local_invalidation_skips_notify_off_postgres(cache):
+    # The SQLite test database has no NOTIFY; invalidating must still work locally without raising
+    await _store(cache, USER, "profile")
+
+    await cache.invalidate_user(USER)
+
+    assert (await cache.get(USER, "profile"))[0] is None
+
+
+@pytest.mark.asyncio
+async def test_response_computed_before_an_invalidation_is_not_stored(cache):
+    _miss, generation = await cache.get(USER, "jobs:matched")
+    # A match run commits and invalidates while the request is still building its response
+    await cache.invalidate_user(USER)
+    await cache.set(USER, "jobs:matched", CachedResponse(body=b"[]", etag='"stale"'), generation)
+
+    assert (await cache.get(USER, "jobs:matched"))[0] is None
+
+
+@pytest.mark.asyncio
+async def test_generations_are_forgotten_after_a_ttl(cache, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    for i in range(5):
+        cache.apply_invalidation(f"user-{i}")
+    clock[0] += cache.ttl_seconds + 1
+    cache.apply_invalidation(USER)
+
+    assert list(cache._generations) == [USER]
+
+
+async def _store(cache: InMemoryResponseCache, user_id: str, name: str):
+    _miss, generation = await cache.get(user_id, name)
+    await cache.set(user_id, name, CachedResponse(body=b"{}", etag='"a"'), generation)
+
+
+async def _subscribe_without_listening(hub: TaskEventHub, task_id: str):
+    async def _no_listen():
+        return None
+
+    hub._ensure_listening = _no_listen
+    return await hub.subscribe(task_id)
@@ -0,0 +1,161 @@
+"""Bulk resume ingestion end to end against SQLite, with StubLLM in place of Gemini."""
+
+import io
+import os
+import tarfile
+import uuid
+
+import docx
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from app.db.database import AsyncSessionLocal
+from app.db.models import Profile, Skill
+from app.services import resume_ingest
+from app.services.resume_ingest import IngestReport, StubLLM, collect_resumes, ingest_resumes
+from app.services.text_extraction import shutdown_extraction_pool
+
+ADA = uuid.UUID("00000000-0000-0000-0000-00000000000a")
+GRACE = uuid.UUID("00000000-0000-0000-0000-00000000000b")
+UNKNOWN = uuid.UUID("00000000-0000-0000-0000-00000000000c")
+
+
+def _resume_docx(*lines: str) -> bytes:
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+RESUMES = {
+    f"{ADA}.docx": _resume_docx("Ada Lovelace", "Skills: Python, SQL, python"),
+    f"{GRACE}.docx": _resume_docx("Grace Hopper", "Skills: COBOL"),
+    f"{UNKNOWN}.docx": _resume_docx("Nobody Here", "Skills: Go"),
+    "notes.docx": _resume_docx("Not named after a profile"),
+}
+
+
+@pytest.fixture(autouse=True)
+def extraction_pool():
+    # Each test runs on its own event loop; the pool's slot semaphore is bound to one
+    yield
+    shutdown_extraction_pool()
+
+
+@pytest.fixture
+def rematch(mocker):
+    return mocker.patch.object(resume_ingest, "schedule_rematch", mocker.AsyncMock())
+
+
+@pytest_asyncio.fixture
+async def profiles():
+    async with AsyncSessionLocal() as db:
+        db.add_all([Profile(id=ADA), Profile(id=GRACE)])
+        await db.commit()
+
+
+def _write_directory(path) -> str:
+    for name, file_bytes in RESUMES.items():
+        (path / name).write_bytes(file_bytes)
+    return str(path)
+
+
+def _write_tarball(path) -> str:
+    archive_path = str(path / "cohort.tar.gz")
+    with tarfile.open(archive_path, "w:gz") as archive:
+        for name, file_bytes in RESUMES.items():
+            info = tarfile.TarInfo(f"cohort/{name}")
+            info.size = len(file_bytes)
+            archive.addfile(info, io.BytesIO(file_bytes))
+    return archive_path
+
+
+async def _skills(profile_id) -> set:
+    async with AsyncSessionLocal() as db:
+        return set((await db.execute(select(Skill.name).where(Skill.profile_id == profile_id))).scalars())
+
+
+async def _ingest(path: str, **kwargs) -> IngestReport:
+    report = IngestReport()
+    resumes = collect_resumes(path, None, report)
+    return await ingest_resumes(resumes, report, generate=StubLLM(), use_cache=False, **kwargs)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("source", [_write_directory, _write_tarball])
+async def test_ingest_writes_existing_profiles(tmp_path, profiles, rematch, source):
+    report = await _ingest(source(tmp_path))
+
+    summary = report.as_dict()
+    assert summary["total"] == 4
+    assert summary["succeeded"] == 2
+    assert summary["failures"] == {"unmapped_profile": 1, "unknown_profile": 1}
+    assert summary["llm_calls"] == 3
+    assert sorted(os.path.basename(source) for source, _ in report.failed_sources) == [f"{UNKNOWN}.docx", "notes.docx"]
+
+    async with AsyncSessionLocal() as db:
+        stored = {profile.id: profile for profile in (await db.execute(select(Profile))).scalars()}
+    assert set(stored) == {ADA, GRACE} # unknown profiles are not created
+    assert (stored[ADA].first_name, stored[ADA].last_name) == ("Ada", "Lovelace")
+    assert (stored[GRACE].first_name, stored[GRACE].last_name) == ("Grace", "Hopper")
+    assert await _skills(ADA) == {"Python", "SQL"}
+    assert await _skills(GRACE) == {"COBOL"}
+    assert {call.args[0] for call in rematch.await_args_list} == {ADA, GRACE}
+
+
+@pytest.mark.asyncio
+async def test_ingest_replaces_previous_skills(tmp_path, profiles, rematch):
+    async with AsyncSessionLocal() as db:
+        db.add(Skill(profile_id=ADA, name="Fortran"))
+        await db.commit()
+
+    await _ingest(_write_directory(tmp_path))
+
+    assert await _skills(ADA) == {"Python", "SQL"}
+
+
+@pytest.mark.asyncio
+async def test_failing_row_does_not_fail_its_batch(tmp_path, profiles, rematch, mocker):
+    write_rows = resume_ingest._write_rows
+
+    async def fail_for_grace(db, batch):
+        # Fail after writing, so the savepoint has to undo the batch's statements
+        await write_rows(db, batch)
+        if any(resume.profile_id == GRACE for resume, _ in batch):
+            raise RuntimeError("simulated constraint violation")
+
+    mocker.patch.object(resume_ingest, "_write_rows", fail_for_grace)
+    report = await _ingest(_write_directory(tmp_path), batch_size=10)
+
+    assert report.succeeded == 1
+    assert report.failures == {"unmapped_profile": 1, "unknown_profile": 1, "db_error": 1}
+    assert await _skills(ADA) == {"Python", "SQL"}
+    assert await _skills(GRACE) == set()
+    assert [call.args[0] for call in rematch.await_args_list] == [ADA]
+
+
+@pytest.mark.asyncio
+async def test_resumes_are_read_as_slots_free_up(tmp_path, profiles, rematch):
+    report = IngestReport()
+    read = []
+
+    def tracked():
+        for resume in collect_resumes(_write_directory(tmp_path), None, report):
+            read.append(resume.source)
+            yield resume
+
+    stub = StubLLM()
+    read_at_call = []
+
+    async def generate(payload_content):
+        read_at_call.append(len(read))
+        return await stub(payload_content)
+
+    # concurrency=1 allows two resumes in flight; the third is read once one finishes
+    await ingest_resumes(tracked(), report, generate=generate, use_cache=False, concurrency=1)
+
+    assert read_at_call[0] == 2
+    assert report.succeeded == 2
@@ -0,0 +1,42 @@
+"""TaskWorker puts a task interrupted by shutdown back in the queue instead of marking it done."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app.db.database import AsyncSessionLocal
+from app.db.models import TaskRecord
+from app.services import task_queue
+from app.services.task_queue import TaskWorker
+
+
+@pytest.mark.asyncio
+async def test_cancelled_task_is_requeued(mocker):
+    # SQLite has no pg_notify
+    mocker.patch.object(task_queue, "notify_task_event", mocker.AsyncMock())
+    async with AsyncSessionLocal() as db:
+        db.add(TaskRecord(id="t1", kind="slow", state="queued", status="pending", message="Task queued."))
+        await db.commit()
+
+    started = asyncio.Event()
+
+    async def slow(task, statuses):
+        statuses[task.id] = {"status": "processing", "message": "Halfway."}
+        started.set()
+        await asyncio.sleep(60)
+
+    worker = TaskWorker({"slow": slow}, concurrency=1)
+    await worker._slots.acquire()
+    task = await worker._claim()
+    runner = asyncio.create_task(worker._execute(task))
+    await started.wait()
+    runner.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await runner
+
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(select(TaskRecord).where(TaskRecord.id == "t1"))).scalar_one()
+    assert row.state == "queued"
+    assert row.status == "pending"
+    assert row.finished_at is None